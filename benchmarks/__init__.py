@@ -0,0 +1,6 @@
+"""
+Benchmarks for cam_manager, runnable without physical cams.
+
+    python -m benchmarks                     # the JSON suite, see benchmarks/suite.py
+    python -m benchmarks.bench_effects       # a single focused benchmark
+"""
@@ -0,0 +1,85 @@
+"""
+Throughput benchmark for CamAIMixin on CPU, comparing one model call per frame against one batched call per tick.
+
+    python -m benchmarks.bench_ai_batch --cams 4 --ticks 10 --modes detection pose
+"""
+
+import time
+import argparse
+
+import cv2
+
+from cam_manager.cam_ai import CamAIMixin
+from cam_manager.cam_sources import SyntheticCapture
+
+def make_frames(cams: int, width: int, height: int) -> list:
+    """
+    Produce one synthetic frame per cam.
+
+    Parameters:
+        cams (int): The number of cams.
+        width (int): The width of the frames.
+        height (int): The height of the frames.
+
+    Returns:
+        list: The frames.
+    """
+
+    frames = []
+    for i in range(cams):
+        cap = SyntheticCapture(width, height, realtime=False)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, i * 10)
+        frames.append(cap.read()[1])
+
+    return frames
+
+def measure(ai: CamAIMixin, frames: list, ticks: int, batched: bool) -> dict:
+    """
+    Run AI processing over the frames for a number of ticks.
+
+    Parameters:
+        ai (CamAIMixin): The AI processor.
+        frames (list): The frames of one tick, one per cam.
+        ticks (int): The number of ticks.
+        batched (bool): Whether to use one batched call per tick.
+
+    Returns:
+        dict: The frames per second and the mean tick latency in milliseconds.
+    """
+
+    def tick():
+        if batched: ai.add_ai_to_frames([frame.copy() for frame in frames])
+        else:
+            for frame in frames: ai.add_ai_to_frame(frame.copy())
+
+    tick()
+    start = time.perf_counter()
+    for _ in range(ticks): tick()
+    elapsed = time.perf_counter() - start
+
+    return {"fps": ticks * len(frames) / elapsed, "tick_ms": elapsed / ticks * 1000}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cams", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--modes", nargs="+", default=["detection", "segmentation", "classify", "pose"])
+    args = parser.parse_args()
+
+    frames = make_frames(args.cams, args.width, args.height)
+
+    for mode in args.modes:
+        ai = CamAIMixin(mode, device="cpu")
+        ai.warmup((args.height, args.width, 3))
+
+        single = measure(ai, frames, args.ticks, batched=False)
+        batch = measure(ai, frames, args.ticks, batched=True)
+
+        print(f"{mode:>12}: per-frame {single['fps']:6.1f} fps ({single['tick_ms']:7.1f} ms/tick)  "
+              f"batched {batch['fps']:6.1f} fps ({batch['tick_ms']:7.1f} ms/tick)  "
+              f"speedup {batch['fps'] / single['fps']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Capture loop stall comparison between the synchronous capture_image and the encoder pool behind capture_image_async.
+
+Reads frames from a synthetic source, saves every --every-th frame as a JPEG into a temporary directory, and reports
+the mean and worst time per loop iteration for each mode.
+
+    python -m benchmarks.bench_capture --frames 120 --width 3840 --height 2160
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from cam_manager import CamManager
+from cam_manager.cam_sources import SyntheticCapture
+
+def run(mode: str, args, directory: str) -> dict:
+    """
+    Run a capture loop saving frames.
+
+    Parameters:
+        mode (str): 'sync' for capture_image or 'async' for capture_image_async.
+        args (argparse.Namespace): The command line arguments.
+        directory (str): The directory to save the images to.
+
+    Returns:
+        dict: The mean and max loop iteration time in milliseconds and the captures dropped.
+    """
+
+    manager = CamManager(encoder_workers=args.workers)
+    manager.add_cam(0, cap=SyntheticCapture(args.width, args.height, 30.0, None, False))
+
+    times = []
+    for index in range(args.frames):
+        start = time.perf_counter()
+
+        if index % args.every: manager.get_frame()
+        elif mode == "sync": manager.capture_image(filename=os.path.join(directory, f"{mode}_{index:04d}.jpg"))
+        else: manager.capture_image_async(filename=os.path.join(directory, f"{mode}_{index:04d}.jpg"))
+
+        times.append(time.perf_counter() - start)
+
+    dropped = manager.dropped_captures
+    manager.release_all_cams()
+
+    return {"mean_ms": sum(times) / len(times) * 1000, "max_ms": max(times) * 1000, "dropped": dropped}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--every", type=int, default=5)
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("sync", "async"):
+            result = run(mode, args, directory)
+            print(f"{mode:>5}: mean {result['mean_ms']:7.2f} ms  max {result['max_ms']:7.2f} ms  dropped {result['dropped']}")
+
+if __name__ == "__main__":
+    main()
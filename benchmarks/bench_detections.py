@@ -0,0 +1,106 @@
+"""
+Microbenchmark for detection post-processing in scenes with many boxes.
+
+Compares the former per-box loop against the vectorized process_detections, with and without drawing.
+No model is loaded, the results are built from random boxes.
+
+    python -m benchmarks.bench_detections --boxes 50 300 1000
+"""
+
+import math
+import time
+import argparse
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+from cam_manager.cam_ai import CamAIMixin
+
+def make_result(count: int, width: int = 1280, height: int = 720) -> Results:
+    """
+    Build a detection result holding random boxes.
+
+    Parameters:
+        count (int): The number of boxes.
+        width (int, optional): The width of the frame. Default is 1280.
+        height (int, optional): The height of the frame. Default is 720.
+
+    Returns:
+        Results: The detection result.
+    """
+
+    rng = np.random.default_rng(0)
+    x1 = rng.uniform(0, width - 50, count)
+    y1 = rng.uniform(0, height - 50, count)
+    data = np.stack([x1, y1, x1 + rng.uniform(10, 50, count), y1 + rng.uniform(10, 50, count),
+        rng.uniform(0.25, 1.0, count), rng.integers(0, 80, count)], axis=1)
+
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    names = {i: f"class{i}" for i in range(80)}
+    return Results(frame, path="", names=names, boxes=torch.tensor(data, dtype=torch.float32))
+
+def legacy_process_detections(result, frame, names: list, ai_data: list) -> None:
+    """
+    Process detections one box at a time, as process_detections did before vectorization.
+
+    Parameters:
+        result (Results): The result of the detection.
+        frame (ndarray): The frame to draw the bounding boxes on.
+        names (list): The names of the classes.
+        ai_data (list): The list to store the AI data.
+    """
+
+    for box in result.boxes:
+        x1, y1, x2, y2 = box.xyxy[0]
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 255), 3)
+        confidence = math.ceil((box.conf[0] * 100)) / 100
+        cls = int(box.cls[0])
+
+        label = f"{names[cls]} {confidence}"
+        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        ai_data.append({"class": cls, "confidence": confidence, "box": [x1, y1, x2, y2]})
+
+def measure(func, result, repeats: int) -> float:
+    """
+    Time a post-processing function.
+
+    Parameters:
+        func (callable): The function, taking the result, frame, names and AI data list.
+        result (Results): The result to process.
+        repeats (int): The number of calls.
+
+    Returns:
+        float: The mean time per call in milliseconds.
+    """
+
+    frame = result.orig_img.copy()
+    start = time.perf_counter()
+    for _ in range(repeats): func(result, frame, result.names, [])
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", type=int, nargs="+", default=[50, 300, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    ai = CamAIMixin.__new__(CamAIMixin)
+    ai.mode = "detection"
+
+    for count in args.boxes:
+        result = make_result(count)
+        timings = {"legacy": measure(legacy_process_detections, result, args.repeats)}
+
+        for draw in (True, False):
+            ai.draw = draw
+            timings["vectorized" if draw else "headless"] = measure(ai.process_detections, result, args.repeats)
+
+        print(f"{count:>5} boxes: " + "  ".join(f"{name} {ms:8.3f} ms" for name, ms in timings.items()))
+
+if __name__ == "__main__":
+    main()
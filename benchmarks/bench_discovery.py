@@ -0,0 +1,50 @@
+"""
+Cam discovery timing comparison between opening every index with cv2.VideoCapture and the cached V4L2 node query.
+
+    python -m benchmarks.bench_discovery --max-index 10
+"""
+
+import time
+import argparse
+
+import cv2
+
+from cam_manager.cam_devices import CamDiscovery
+
+def open_every_index(max_index: int) -> list:
+    """
+    Find the cams by opening every index in turn, like the original discovery.
+
+    Parameters:
+        max_index (int): The number of indices to open.
+
+    Returns:
+        list: The indices that opened.
+    """
+
+    found = []
+    for index in range(max_index):
+        cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+        if cap.isOpened(): found.append(index)
+        cap.release()
+
+    return found
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-index", type=int, default=10)
+    parser.add_argument("--dev-dir", default="/dev")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    found = open_every_index(args.max_index)
+    print(f"  VideoCapture per index: {(time.perf_counter() - start) * 1000:8.2f} ms  {found}")
+
+    discovery = CamDiscovery(args.dev_dir)
+    for label in ("V4L2 query (cold)", "V4L2 query (cached)"):
+        start = time.perf_counter()
+        devices = discovery.discover()
+        print(f"{label:>24}: {(time.perf_counter() - start) * 1000:8.2f} ms  {[device['index'] for device in devices]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-effect and per-chain benchmark for CamEffectsMixin at 720p and 4K.
+
+Each effect is timed allocating its output and writing into a preallocated dst buffer. Each chain is timed as
+separate effect calls and as a compiled EffectChain.
+
+    python -m benchmarks.bench_effects --repeats 50
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from cam_manager.cam_effects import CamEffectsMixin, EffectChain
+
+RESOLUTIONS = {"720p": (720, 1280), "4K": (2160, 3840)}
+
+EFFECTS = {
+    "gray": ((), True),
+    "canny": ((), True),
+    "sepia": ((), False),
+    "emboss": ((), False),
+    "negative": ((), False),
+    "gamma": ((2.0,), False),
+    "brightness_contrast": ((1.2, 10), False) }
+
+CHAINS = {
+    "sepia+negative+gamma": ["sepia", "negative", ("gamma", {"gamma": 2.0})],
+    "negative+brightness_contrast+gamma": ["negative", ("brightness_contrast", {"alpha": 1.2, "beta": 10}), ("gamma", {"gamma": 0.8})],
+    "gray+emboss+negative": ["gray", "emboss", "negative"] }
+
+def measure(func, repeats: int) -> float:
+    """
+    Time a function.
+
+    Parameters:
+        func (callable): The function to time.
+        repeats (int): The number of calls.
+
+    Returns:
+        float: The mean time per call in milliseconds.
+    """
+
+    func()
+    start = time.perf_counter()
+    for _ in range(repeats): func()
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+def run_effects(effects: CamEffectsMixin, frame, repeats: int) -> dict:
+    """
+    Time every single effect with and without a dst buffer.
+
+    Parameters:
+        effects (CamEffectsMixin): The effects provider.
+        frame (ndarray): The input frame.
+        repeats (int): The number of calls per measurement.
+
+    Returns:
+        dict: The allocating and dst timings in milliseconds, keyed by effect.
+    """
+
+    results = {}
+
+    for name, (args, gray) in EFFECTS.items():
+        method = getattr(effects, f"apply_{name}")
+        dst = np.empty(frame.shape[:2] if gray else frame.shape, dtype=np.uint8)
+
+        results[name] = {
+            "alloc_ms": measure(lambda method=method, args=args: method(frame, *args), repeats),
+            "dst_ms": measure(lambda method=method, args=args, dst=dst: method(frame, *args, dst=dst), repeats) }
+
+    return results
+
+def run_chains(effects: CamEffectsMixin, frame, repeats: int) -> dict:
+    """
+    Time every chain as separate effect calls and as a compiled EffectChain.
+
+    Parameters:
+        effects (CamEffectsMixin): The effects provider.
+        frame (ndarray): The input frame.
+        repeats (int): The number of calls per measurement.
+
+    Returns:
+        dict: The sequential and compiled timings in milliseconds, keyed by chain.
+    """
+
+    results = {}
+
+    for name, chain in CHAINS.items():
+        def sequential(chain=chain):
+            current = frame
+            for effect in chain:
+                effect_name, params = (effect, {}) if isinstance(effect, str) else effect
+                current = getattr(effects, f"apply_{effect_name}")(current, **params)
+            return current
+
+        compiled = EffectChain(chain)
+        results[name] = {
+            "sequential_ms": measure(sequential, repeats),
+            "chain_ms": measure(lambda compiled=compiled: compiled.apply(frame), repeats),
+            "passes": len(compiled.steps) }
+
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    effects = CamEffectsMixin()
+    rng = np.random.default_rng(0)
+
+    for resolution, shape in RESOLUTIONS.items():
+        frame = rng.integers(0, 256, (*shape, 3), dtype=np.uint8)
+        print(f"[{resolution}]")
+
+        for name, timing in run_effects(effects, frame, args.repeats).items():
+            print(f"  {name:>36}: alloc {timing['alloc_ms']:7.2f} ms  dst {timing['dst_ms']:7.2f} ms")
+        for name, timing in run_chains(effects, frame, args.repeats).items():
+            print(f"  {name:>36}: sequential {timing['sequential_ms']:7.2f} ms  chain {timing['chain_ms']:7.2f} ms ({timing['passes']} passes)")
+
+if __name__ == "__main__":
+    main()
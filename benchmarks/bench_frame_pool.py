@@ -0,0 +1,107 @@
+"""
+Allocation and RSS comparison between get_frame and the pooled borrow_frame/release_frame path.
+
+Reads frames from a synthetic source or a video file, once allocating a new frame per read and once reading into
+pooled buffers, and reports frame allocations, peak traced memory and RSS growth for each.
+
+    python -m benchmarks.bench_frame_pool --frames 600 --width 1920 --height 1080
+    python -m benchmarks.bench_frame_pool --video footage.mp4
+"""
+
+import time
+import argparse
+import tracemalloc
+
+import cv2
+
+from cam_manager import CamManager
+from cam_manager.cam_sources import SyntheticCapture
+
+def rss_mb() -> float:
+    """
+    Get the resident set size of the process.
+
+    Returns:
+        float: The resident set size in MB, or 0.0 where /proc is not available.
+    """
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"): return int(line.split()[1]) / 1024
+    except OSError: pass
+    return 0.0
+
+def open_source(args) -> any:
+    """
+    Open the capture source selected on the command line.
+
+    Parameters:
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        any: The capture object.
+    """
+
+    if args.video: return cv2.VideoCapture(args.video)
+    return SyntheticCapture(args.width, args.height, realtime=False)
+
+def run(args, pooled: bool) -> dict:
+    """
+    Read frames through one of the two paths and measure memory use.
+
+    Parameters:
+        args (argparse.Namespace): The command line arguments.
+        pooled (bool): Whether to use borrow_frame and release_frame.
+
+    Returns:
+        dict: The frames read, the fps, the frame allocations, the peak traced memory in MB and the RSS growth in MB.
+    """
+
+    manager = CamManager()
+    manager.add_cam("bench", cap=open_source(args))
+
+    rss_before = rss_mb()
+    tracemalloc.start()
+
+    frames = 0
+    start = time.perf_counter()
+
+    for _ in range(args.frames):
+        try:
+            if pooled:
+                frame = manager.borrow_frame("bench")
+                manager.release_frame(frame, "bench")
+            else: frame = manager.get_frame("bench")
+        except Exception: break
+        frames += 1
+
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stats = {
+        "frames": frames,
+        "fps": frames / elapsed if elapsed else 0.0,
+        "allocations": manager.frame_pools["bench"].allocations if pooled else frames,
+        "peak_mb": peak / 2 ** 20,
+        "rss_growth_mb": rss_mb() - rss_before }
+    manager.release_all_cams()
+
+    return stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--video", default=None)
+    args = parser.parse_args()
+
+    for name, pooled in (("get_frame", False), ("borrow_frame", True)):
+        stats = run(args, pooled)
+        print(f"{name:>12}: {stats['frames']} frames  {stats['fps']:7.1f} fps  {stats['allocations']} frame allocations  "
+              f"peak traced {stats['peak_mb']:7.1f} MB  rss growth {stats['rss_growth_mb']:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Import-time budget check for the base CamManager import.
+
+Imports cam_manager in fresh interpreters, reports the median import time, and fails when it exceeds --budget-ms or
+when any heavy dependency (cv2, numpy, mss, Xlib, pygetwindow, ultralytics, torch) was imported with it.
+
+    python -m benchmarks.bench_import --runs 5 --budget-ms 100
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ("cv2", "numpy", "mss", "Xlib", "pygetwindow", "ultralytics", "torch")
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import cam_manager
+from cam_manager import CamManager
+manager = CamManager()
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+def run_once() -> dict:
+    """
+    Import cam_manager in a fresh interpreter.
+
+    Returns:
+        dict: The import and construction time in milliseconds and the heavy modules that were loaded.
+    """
+
+    output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    median_ms = statistics.median(result["ms"] for result in results)
+    modules = sorted({name for result in results for name in result["modules"]})
+
+    print(f"import cam_manager + CamManager(): median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    if modules: print(f"heavy modules imported: {', '.join(modules)}")
+
+    if median_ms > args.budget_ms or modules:
+        print("Import budget exceeded.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Latency benchmark for CamAIMixin on high-resolution frames, comparing full frames handed to the model against frames
+downscaled once into a reused buffer with inference_size, and against a grid of ROI tiles.
+
+    python -m benchmarks.bench_inference_size --width 3840 --height 2160 --inference-size 640
+    python -m benchmarks.bench_inference_size --random-weights --modes detection pose
+"""
+
+import time
+import argparse
+
+from cam_manager.cam_ai import CamAIMixin
+from cam_manager.cam_sources import SyntheticCapture
+
+def make_tiles(width: int, height: int, columns: int, rows: int) -> list:
+    """
+    Split a frame into a grid of regions.
+
+    Parameters:
+        width (int): The width of the frame.
+        height (int): The height of the frame.
+        columns (int): The number of columns of the grid.
+        rows (int): The number of rows of the grid.
+
+    Returns:
+        list: The (x, y, width, height) regions.
+    """
+
+    tile_width, tile_height = width // columns, height // rows
+    return [(column * tile_width, row * tile_height, tile_width, tile_height) for row in range(rows) for column in range(columns)]
+
+def measure(ai: CamAIMixin, frame, repeats: int) -> float:
+    """
+    Time add_ai_to_frame on a frame.
+
+    Parameters:
+        ai (CamAIMixin): The AI processor.
+        frame (ndarray): The frame.
+        repeats (int): The number of timed calls.
+
+    Returns:
+        float: The mean latency in milliseconds.
+    """
+
+    ai.add_ai_to_frame(frame.copy())
+
+    start = time.perf_counter()
+    for _ in range(repeats): ai.add_ai_to_frame(frame.copy())
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--inference-size", type=int, default=640)
+    parser.add_argument("--tiles", type=int, nargs=2, default=[2, 2], metavar=("COLUMNS", "ROWS"))
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["detection", "segmentation", "classify", "pose"])
+    parser.add_argument("--random-weights", action="store_true", help="Build the models from their yaml configs, without downloading weights.")
+    args = parser.parse_args()
+
+    frame = SyntheticCapture(args.width, args.height, realtime=False).read()[1]
+    tiles = make_tiles(args.width, args.height, *args.tiles)
+
+    for mode in args.modes:
+        timings = {}
+        for name, options in (("full", {}), ("downscaled", {"inference_size": args.inference_size}),
+            ("tiles", {"inference_size": args.inference_size, "rois": tiles})):
+            ai = CamAIMixin(mode, device="cpu", **options)
+            if args.random_weights: ai.weights = ai.weights.replace(".pt", ".yaml")
+            timings[name] = measure(ai, frame, args.repeats)
+
+        print(f"{mode:>12}: full {timings['full']:8.1f} ms  downscaled {timings['downscaled']:8.1f} ms "
+              f"({timings['full'] / timings['downscaled']:.2f}x)  {len(tiles)} tiles {timings['tiles']:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Startup and first-frame latency of CamAIMixin with the shared model registry.
+
+Reports the cost of creating a CamManager with AI enabled, of loading the model, and of the first frame with and
+without an explicit warm-up, then shows that a second manager reuses the loaded weights.
+
+    python -m benchmarks.bench_model_startup --mode detection --device cpu
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from cam_manager import CamManager
+from cam_manager.cam_models import model_registry
+
+def first_frame_ms(manager: CamManager, frame) -> float:
+    """
+    Time the first AI frame of a manager.
+
+    Parameters:
+        manager (CamManager): The manager with AI enabled.
+        frame (ndarray): The frame to process.
+
+    Returns:
+        float: The processing time in milliseconds.
+    """
+
+    start = time.perf_counter()
+    manager.ai.add_ai_to_frame(frame.copy())
+    return (time.perf_counter() - start) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", default="detection")
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    ai_options = {"device": args.device}
+
+    start = time.perf_counter()
+    cold = CamManager(is_ai=True, ai_mode=args.mode, ai_options=ai_options)
+    print(f"CamManager startup: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    print(f"Cold first frame:   {first_frame_ms(cold, frame):8.1f} ms (includes model load)")
+
+    model_registry.clear()
+    warm = CamManager(is_ai=True, ai_mode=args.mode, ai_options=ai_options)
+    warm.ai.warmup(frame.shape)
+    print(f"Warm first frame:   {first_frame_ms(warm, frame):8.1f} ms")
+
+    shared = CamManager(is_ai=True, ai_mode=args.mode, ai_options=ai_options)
+    print(f"Shared model:       {shared.ai.model is warm.ai.model}")
+
+    for key, stats in model_registry.get_stats().items():
+        print(key, {name: round(value, 1) if value is not None else None for name, value in stats.items()})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Grab-rate benchmark for fake cams, comparing a per-call mss context against the persistent ScreenGrabber.
+
+Runs against an Xvfb server started for the run, or the current DISPLAY with --use-display:
+
+    python -m benchmarks.bench_screen_grab --width 1280 --height 720 --seconds 3
+"""
+
+import os
+import time
+import shutil
+import argparse
+import subprocess
+
+import cv2
+import mss
+import numpy as np
+from Xlib import X, display
+
+from cam_manager.cam_grabber import ScreenGrabber
+
+def start_xvfb(screen: str = "1920x1080x24", number: int = 99) -> subprocess.Popen:
+    """
+    Start an Xvfb server and point DISPLAY at it.
+
+    Parameters:
+        screen (str, optional): The screen geometry and depth. Default is '1920x1080x24'.
+        number (int, optional): The display number. Default is 99.
+
+    Returns:
+        subprocess.Popen: The Xvfb process.
+    """
+
+    if shutil.which("Xvfb") is None: raise Exception("Xvfb is not installed.")
+
+    process = subprocess.Popen(["Xvfb", f":{number}", "-screen", "0", screen, "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = f":{number}"
+
+    for _ in range(50):
+        try:
+            display.Display().close()
+            return process
+        except Exception: time.sleep(0.1)
+
+    process.terminate()
+    raise Exception("Xvfb did not start.")
+
+def create_window(width: int, height: int, title: str = "cam_manager_bench") -> any:
+    """
+    Create and map a plain window to grab.
+
+    Parameters:
+        width (int): The width of the window.
+        height (int): The height of the window.
+        title (str, optional): The title of the window. Default is 'cam_manager_bench'.
+
+    Returns:
+        any: The Xlib window.
+    """
+
+    d = display.Display()
+    root = d.screen().root
+    window = root.create_window(0, 0, width, height, 0, d.screen().root_depth, X.InputOutput, X.CopyFromParent,
+        background_pixel=d.screen().white_pixel)
+    window.set_wm_name(title)
+    window.map()
+    d.sync()
+
+    return window
+
+def grab_per_call(window) -> any:
+    """
+    Grab the window the way fake cams did before ScreenGrabber, with a new mss context per frame.
+
+    Parameters:
+        window (any): The Xlib window.
+
+    Returns:
+        any: The BGR frame.
+    """
+
+    geometry = window.get_geometry()
+    origin = geometry.root.translate_coords(window, 0, 0)
+
+    with mss.mss() as sct:
+        monitor = {"top": origin.y, "left": origin.x, "width": geometry.width, "height": geometry.height}
+        frame = np.array(sct.grab(monitor))
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+def measure(grab, seconds: float) -> dict:
+    """
+    Call a grab function repeatedly and measure its rate.
+
+    Parameters:
+        grab (callable): The function producing one frame per call.
+        seconds (float): The duration of the measurement.
+
+    Returns:
+        dict: The number of frames, the frames per second and the mean latency in milliseconds.
+    """
+
+    grab()
+    frames = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        grab()
+        frames += 1
+
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "fps": frames / elapsed, "mean_ms": elapsed / frames * 1000}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--use-display", action="store_true", help="Use the current DISPLAY instead of starting Xvfb.")
+    args = parser.parse_args()
+
+    xvfb = None if args.use_display else start_xvfb()
+
+    try:
+        window = create_window(args.width, args.height)
+
+        results = {"per_call_mss": measure(lambda: grab_per_call(window), args.seconds)}
+        for output in ("bgr", "bgra"):
+            grabber = ScreenGrabber(window, output)
+            results[f"grabber_{output}"] = measure(grabber.grab, args.seconds)
+            grabber.close()
+
+        for name, result in results.items():
+            print(f"{name:>16}: {result['fps']:8.1f} fps  {result['mean_ms']:7.2f} ms/frame")
+    finally:
+        if xvfb is not None: xvfb.terminate()
+
+if __name__ == "__main__":
+    main()
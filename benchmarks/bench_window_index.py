@@ -0,0 +1,153 @@
+"""
+Window lookup benchmark comparing a new X connection with a title query per window against the persistent WindowIndex.
+
+Starts an Xvfb server (or uses the current DISPLAY with --use-display), creates --windows client windows and publishes
+them in _NET_CLIENT_LIST the way a window manager would, then times lookups of the last window and how long a rename
+takes to reach the index.
+
+    python -m benchmarks.bench_window_index --windows 500
+"""
+
+import time
+import argparse
+
+from Xlib import X, Xatom, display
+
+from cam_manager.cam_windows import WindowIndex
+from benchmarks.bench_screen_grab import start_xvfb
+
+def create_clients(d, count: int) -> list:
+    """
+    Create client windows and publish them in _NET_CLIENT_LIST.
+
+    Parameters:
+        d (Xlib.display.Display): The display connection.
+        count (int): The number of windows.
+
+    Returns:
+        list: The created windows.
+    """
+
+    root = d.screen().root
+    windows = []
+
+    for index in range(count):
+        window = root.create_window(0, 0, 64, 64, 0, d.screen().root_depth, X.InputOutput, X.CopyFromParent)
+        window.set_wm_name(f"bench_window_{index}")
+        windows.append(window)
+
+    publish_clients(d, windows)
+    return windows
+
+def publish_clients(d, windows: list) -> None:
+    """
+    Write the client list property of the root window.
+
+    Parameters:
+        d (Xlib.display.Display): The display connection.
+        windows (list): The client windows.
+    """
+
+    d.screen().root.change_property(d.intern_atom("_NET_CLIENT_LIST"), Xatom.WINDOW, 32, [window.id for window in windows])
+    d.sync()
+
+def find_per_call(title: str) -> any:
+    """
+    Find a window the way get_window_by_title did before the index, with a new connection and a query per window.
+
+    Parameters:
+        title (str): The title of the window.
+
+    Returns:
+        any: The window, or None if not found.
+    """
+
+    d = display.Display()
+    root = d.screen().root
+    window_ids = root.get_full_property(d.intern_atom("_NET_CLIENT_LIST"), X.AnyPropertyType).value
+
+    for window_id in window_ids:
+        window = d.create_resource_object("window", window_id)
+        if window.get_wm_name() == title: return window
+    return None
+
+def measure(func, repeats: int) -> float:
+    """
+    Time a function.
+
+    Parameters:
+        func (callable): The function to time.
+        repeats (int): The number of calls.
+
+    Returns:
+        float: The mean time per call in milliseconds.
+    """
+
+    start = time.perf_counter()
+    for _ in range(repeats): func()
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+def wait_for(condition, timeout: float = 5.0) -> float:
+    """
+    Wait until a condition holds.
+
+    Parameters:
+        condition (callable): The condition to check.
+        timeout (float, optional): The maximum time to wait in seconds. Default is 5.0.
+
+    Returns:
+        float: The time waited in milliseconds, or -1.0 on timeout.
+    """
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if condition(): return (time.perf_counter() - start) * 1000
+        time.sleep(0.0005)
+
+    return -1.0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--use-display", action="store_true", help="Use the current DISPLAY instead of starting Xvfb.")
+    args = parser.parse_args()
+
+    xvfb = None if args.use_display else start_xvfb()
+
+    try:
+        d = display.Display()
+        windows = create_clients(d, args.windows)
+        title = f"bench_window_{args.windows - 1}"
+
+        per_call_ms = measure(lambda: find_per_call(title), max(args.repeats // 10, 1))
+
+        start = time.perf_counter()
+        index = WindowIndex()
+        index.start()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        index_ms = measure(lambda: index.find(title), args.repeats * 100)
+
+        windows[-1].set_wm_name("bench_window_renamed")
+        d.flush()
+        rename_ms = wait_for(lambda: index.find("bench_window_renamed") is not None)
+
+        publish_clients(d, windows[:-1])
+        remove_ms = wait_for(lambda: index.find("bench_window_renamed") is None)
+
+        print(f"{args.windows} windows")
+        print(f"  per-call lookup: {per_call_ms:10.3f} ms")
+        print(f"      index build: {build_ms:10.3f} ms (once)")
+        print(f"     index lookup: {index_ms:10.4f} ms")
+        print(f"   rename visible: {rename_ms:10.3f} ms")
+        print(f"   remove visible: {remove_ms:10.3f} ms")
+
+        index.close()
+        d.close()
+    finally:
+        if xvfb is not None: xvfb.terminate()
+
+if __name__ == "__main__":
+    main()
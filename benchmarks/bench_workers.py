@@ -0,0 +1,89 @@
+"""
+Multi-cam scaling benchmark comparing reader threads in one process with worker processes publishing through shared memory.
+
+Opens 1 to --max-cams synthetic sources producing frames as fast as they can, reads a new frame from every cam
+round-robin for --seconds, and reports the frames produced by the sources and the frames delivered to the consumer per
+second. Reader threads are read with wait_for_next_frame, worker processes with get_frame, which both wait for a frame
+newer than the last one returned.
+
+    python -m benchmarks.bench_workers --max-cams 4 --width 1920 --height 1080
+"""
+
+import time
+import argparse
+import functools
+
+from cam_manager import CamManager
+from cam_manager.cam_sources import SyntheticCapture
+from cam_manager.cam_workers import HEADER_LATEST, ProcessCapture
+
+def produced_frames(manager: CamManager) -> int:
+    """
+    Count the frames produced by the sources of a manager so far.
+
+    Parameters:
+        manager (CamManager): The manager reading the cams.
+
+    Returns:
+        int: The total number of frames produced.
+    """
+
+    if manager.readers: return sum(reader.seq for reader in manager.readers.values())
+    return sum(int(cap.ring.header[HEADER_LATEST]) for cap in manager.cams.values())
+
+def run(mode: str, cams: int, width: int, height: int, seconds: float) -> dict:
+    """
+    Read several synthetic cams for a fixed time.
+
+    Parameters:
+        mode (str): 'threads' for reader threads or 'processes' for worker processes.
+        cams (int): The number of cams.
+        width (int): The frame width.
+        height (int): The frame height.
+        seconds (float): The duration of the measurement.
+
+    Returns:
+        dict: The produced and delivered frames per second.
+    """
+
+    source = functools.partial(SyntheticCapture, width, height, 30.0, None, False)
+    manager = CamManager(threaded_capture=mode == "threads")
+
+    for cam_id in range(cams):
+        cap = source() if mode == "threads" else ProcessCapture(source)
+        manager.add_cam(cam_id, cap=cap)
+
+    for cam_id in range(cams): manager.get_frame(cam_id)
+
+    read = manager.wait_for_next_frame if mode == "threads" else manager.get_frame
+    delivered = 0
+    produced = produced_frames(manager)
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        for cam_id in range(cams):
+            if read(cam_id) is not None: delivered += 1
+
+    elapsed = time.perf_counter() - start
+    produced = produced_frames(manager) - produced
+    manager.release_all_cams()
+
+    return {"produced_fps": produced / elapsed, "delivered_fps": delivered / elapsed}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-cams", type=int, default=4)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    cams = 1
+    while cams <= args.max_cams:
+        for mode in ("threads", "processes"):
+            result = run(mode, cams, args.width, args.height, args.seconds)
+            print(f"{cams} cam(s) {mode:>9}: produced {result['produced_fps']:8.1f} fps  delivered {result['delivered_fps']:8.1f} fps")
+        cams *= 2
+
+if __name__ == "__main__":
+    main()
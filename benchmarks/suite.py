@@ -0,0 +1,225 @@
+"""
+Reproducible benchmark suite for CamManager, running without physical cams or a desktop.
+
+Measures get_frame on a synthetic source and a video file source, every CamEffectsMixin effect and every CamAIMixin
+mode on CPU, and emits fps and p50/p99 latency per case as JSON. With --baseline, cases slower than the baseline by
+more than --tolerance are reported and the run fails, so releases can be compared.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --skip-ai --baseline results.json --tolerance 0.15
+    python -m benchmarks --random-weights --ai-modes detection pose
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+
+import cv2
+import numpy as np
+
+from cam_manager import CamManager
+from cam_manager.cam_effects import CamEffectsMixin
+from cam_manager.cam_sources import FileCapture, SyntheticCapture, write_synthetic_video
+
+EFFECT_ARGS = {
+    "gamma": {"gamma": 2.0},
+    "brightness_contrast": {"alpha": 1.2, "beta": 10} }
+
+AI_MODES = ("detection", "segmentation", "classify", "pose")
+
+def percentile(values: list, q: float) -> float:
+    """
+    Get a percentile of sorted values by the nearest rank.
+
+    Parameters:
+        values (list): The sorted values.
+        q (float): The percentile between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+
+    if not values: return 0.0
+    return values[min(len(values), max(1, math.ceil(q / 100 * len(values)))) - 1]
+
+def measure(func, iterations: int, warmup: int = 3) -> dict:
+    """
+    Time a function call by call.
+
+    Parameters:
+        func (callable): The function to time.
+        iterations (int): The number of timed calls.
+        warmup (int, optional): The number of untimed calls first. Default is 3.
+
+    Returns:
+        dict: The iterations, the calls per second and the mean, p50 and p99 latency in milliseconds.
+    """
+
+    for _ in range(warmup): func()
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    total = sum(latencies)
+    latencies.sort()
+
+    return {
+        "iterations": iterations,
+        "fps": iterations / total if total > 0 else 0.0,
+        "mean_ms": total / iterations * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000 }
+
+def bench_get_frame(args, directory: str) -> dict:
+    """
+    Time get_frame on a synthetic source and a video file source.
+
+    Parameters:
+        args (argparse.Namespace): The command line arguments.
+        directory (str): The directory to write the generated video file to.
+
+    Returns:
+        dict: The results keyed by case name.
+    """
+
+    video = args.video or write_synthetic_video(os.path.join(directory, "bench.avi"), 120, args.width, args.height, args.fps)
+    sources = {
+        "synthetic": SyntheticCapture(args.width, args.height, args.fps, realtime=False),
+        "file": FileCapture(video, loop=True) }
+
+    results = {}
+    for name, source in sources.items():
+        manager = CamManager()
+        manager.add_cam(name, cap=source)
+        results[f"get_frame/{name}"] = measure(lambda manager=manager, name=name: manager.get_frame(name), args.iterations)
+        manager.release_all_cams()
+
+    return results
+
+def bench_effects(args) -> dict:
+    """
+    Time every CamEffectsMixin effect.
+
+    Parameters:
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        dict: The results keyed by case name.
+    """
+
+    effects = CamEffectsMixin()
+    frame = SyntheticCapture(args.width, args.height, realtime=False).read()[1]
+
+    names = sorted(name[len("apply_"):] for name in dir(CamEffectsMixin) if name.startswith("apply_") and name != "apply_effects")
+    return {f"effect/{name}": measure(lambda name=name: getattr(effects, f"apply_{name}")(frame, **EFFECT_ARGS.get(name, {})), args.iterations)
+        for name in names}
+
+def bench_ai(args) -> dict:
+    """
+    Time add_ai_to_frame of every selected AI mode on CPU.
+
+    Parameters:
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        dict: The results keyed by case name, with an 'error' entry for modes whose model could not be loaded.
+    """
+
+    from cam_manager.cam_ai import CamAIMixin
+
+    frame = SyntheticCapture(args.width, args.height, realtime=False).read()[1]
+    results = {}
+
+    for mode in args.ai_modes:
+        ai = CamAIMixin(mode, device="cpu")
+        if args.random_weights: ai.weights = ai.weights.replace(".pt", ".yaml")
+
+        try:
+            ai.warmup(frame.shape)
+            results[f"ai/{mode}"] = measure(lambda ai=ai: ai.add_ai_to_frame(frame.copy()), args.ai_iterations, warmup=1)
+        except Exception as e:
+            results[f"ai/{mode}"] = {"error": str(e)}
+
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Find the cases slower than a baseline.
+
+    Parameters:
+        results (dict): The results keyed by case name.
+        baseline (dict): The baseline results keyed by case name.
+        tolerance (float): The allowed relative fps loss.
+
+    Returns:
+        list: The (case, baseline fps, fps) tuples of the regressed cases.
+    """
+
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or "fps" not in reference or "fps" not in result: continue
+        if result["fps"] < reference["fps"] * (1 - tolerance): regressions.append((name, reference["fps"], result["fps"]))
+
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--ai-iterations", type=int, default=20)
+    parser.add_argument("--ai-modes", nargs="+", default=list(AI_MODES), choices=AI_MODES)
+    parser.add_argument("--skip-ai", action="store_true")
+    parser.add_argument("--random-weights", action="store_true", help="Build the models from their yaml configs, without downloading weights.")
+    parser.add_argument("--video", help="A video file to use as the file source instead of a generated one.")
+    parser.add_argument("--output", help="The file to write the JSON results to. Default is stdout.")
+    parser.add_argument("--baseline", help="A previous JSON results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {}
+    with contextlib.redirect_stdout(sys.stderr):
+        with tempfile.TemporaryDirectory() as directory:
+            results.update(bench_get_frame(args, directory))
+        results.update(bench_effects(args))
+        if not args.skip_ai: results.update(bench_ai(args))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "resolution": [args.width, args.height] },
+        "results": results }
+
+    if args.output:
+        with open(args.output, "w") as f: json.dump(report, f, indent=4)
+    else: print(json.dumps(report, indent=4))
+
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)
+
+        if baseline["meta"].get("resolution") != report["meta"]["resolution"]:
+            print(f"Baseline resolution {baseline['meta'].get('resolution')} differs from {report['meta']['resolution']}.", file=sys.stderr)
+
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for name, reference, fps in regressions:
+            print(f"Regression in [{name}]: {reference:.1f} -> {fps:.1f} fps", file=sys.stderr)
+        if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
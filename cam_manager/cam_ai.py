@@ -1,7 +1,12 @@
-import math
+import time
+import threading
 
 import cv2
-from ultralytics import YOLO
+import numpy as np
+
+from cam_manager.cam_models import model_registry
+from cam_manager.cam_results import AIResults
+from cam_manager.cam_telemetry import instrumented
 
 class CamAIMixin:
     """
@@ -9,15 +14,45 @@ class CamAIMixin:
 
     Attributes:
         mode (str): The mode of AI processing ('detection', 'segmentation', 'classify', 'pose').
-        model (YOLO): The YOLO model used for AI processing.
+        model (YOLO): The YOLO model used for AI processing, loaded from the shared model registry on first use.
+        weights (str): The weights file of the model.
+        device (str or None): The device to run the model on, or None for automatic.
+        precision (str): The precision to run the model at ('fp32', 'fp16').
+        first_frame_time (float or None): The time in seconds taken to process the first frame.
+        draw (bool): Whether to draw the AI results on the frames.
+        mask_format (str): The segmentation mask output format ('mask', 'polygon', 'rle', 'label_map').
+        top_k (int or None): The number of most probable classes kept by classification, or None for all.
+        min_confidence (float): The minimum confidence of the classes kept by classification.
+        inference_size (int, tuple or None): The longest side or (width, height) frames are resized to before inference, or None.
+        rois (list or None): The (x, y, width, height) regions of the frames to run the model on, or None for the whole frames.
+        resize_buffers (dict): The reused buffers the frames and regions are resized into, keyed by frame and region index.
+        result_format (str): The format of the AI data ('dicts' for a list of dicts, 'columnar' for AIResults).
+        frame_index (int): The index given to the next processed frame.
+        telemetry (Telemetry or None): The telemetry recording add_ai_to_frame, set by CamManager.
+        lock (threading.Lock): The lock guarding the resize buffers from resizing through inference, and the frame index.
     """
 
-    def __init__(self, mode: str = "detection") -> None:
+    def __init__(self, mode: str = "detection", draw: bool = True, mask_format: str = "mask", top_k: int = 5, min_confidence: float = 0.0,
+        device: str = None, precision: str = "fp32", inference_size=None, rois: list = None, result_format: str = "dicts") -> None:
         """
         Initialize the CamAIMixin class with a specified AI processing mode.
 
         Parameters:
             mode (str): The mode of AI processing.
+            draw (bool, optional): Whether to draw the AI results on the frames. Default is True.
+            mask_format (str, optional): The segmentation mask output format, 'mask' for one uint8 array per object,
+                'polygon' for contour points in frame coordinates, 'rle' for run-length encoding or 'label_map'
+                for a single array labelling all objects. Default is 'mask'.
+            top_k (int, optional): The number of most probable classes kept by classification, or None for all. Default is 5.
+            min_confidence (float, optional): The minimum confidence of the classes kept by classification. Default is 0.0.
+            device (str, optional): The device to run the model on, such as 'cpu' or 'cuda:0'. Default is automatic.
+            precision (str, optional): The precision to run the model at, 'fp32' or 'fp16'. Default is 'fp32'.
+            inference_size (int or tuple, optional): The longest side frames are downscaled to, or the exact (width, height)
+                they are resized to, before inference. Results are mapped back to frame coordinates. Default is None, no resize.
+            rois (list, optional): The (x, y, width, height) regions of the frames to run the model on as separate tiles,
+                each resized to inference_size. Results carry the index of their region as 'roi'. Default is None, the whole frame.
+            result_format (str, optional): The format of the AI data, 'dicts' for a list of dicts per object or 'columnar'
+                for an AIResults of NumPy arrays, which holds no masks. Default is 'dicts'.
         """
 
         mode_mmodel_map = {
@@ -26,13 +61,210 @@ class CamAIMixin:
             "classify": "yolov8n-cls.pt",
             "pose": "yolov8n-pose.pt" }
 
+        if mask_format not in ("mask", "polygon", "rle", "label_map"):
+            raise Exception(f"Invalid mask format [{mask_format}].")
+        if precision not in ("fp32", "fp16"):
+            raise Exception(f"Invalid precision [{precision}].")
+        if result_format not in ("dicts", "columnar"):
+            raise Exception(f"Invalid result format [{result_format}].")
+
+        self.draw = draw
+        self.mask_format = mask_format
+        self.top_k = top_k
+        self.min_confidence = min_confidence
+        self.device = device
+        self.precision = precision
+        self.first_frame_time = None
+        self.inference_size = inference_size
+        self.rois = rois
+        self.resize_buffers = {}
+        self.result_format = result_format
+        self.frame_index = 0
+        self.telemetry = None
+        self.lock = threading.Lock()
+
         if mode in mode_mmodel_map:
             self.mode = mode
-            self.model = YOLO(mode_mmodel_map[mode])
+            self.weights = mode_mmodel_map[mode]
         else:
             self.mode = "detection"
-            self.model = YOLO("yolov8n.pt")
+            self.weights = "yolov8n.pt"
+
+    @property
+    def model(self) -> any:
+        """
+        Get the YOLO model from the shared model registry, loading it on first use.
+
+        Returns:
+            any: The YOLO model.
+        """
+
+        return model_registry.get(self.weights, self.device, self.precision).model
+
+    def run_model(self, source, imgsz: int = None) -> list:
+        """
+        Run the model on one or several frames.
+
+        Parameters:
+            source (any): The frame or list of frames.
+            imgsz (int, optional): The size the model letterboxes the frames to. Default is the model default.
+
+        Returns:
+            list: The model results, one per frame.
+        """
+
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+
+        start = time.perf_counter()
+        results = model_registry.predict(source, self.weights, self.device, self.precision, **kwargs)
+
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - start
+            print(f"First AI frame processed in {self.first_frame_time * 1000:.1f} ms.")
+
+        return results
+
+    def warmup(self, shape: tuple = (480, 640, 3), runs: int = 2) -> float:
+        """
+        Load the model and run it on dummy frames so the first real frame does not pay the warm-up cost.
+
+        Parameters:
+            shape (tuple, optional): The shape of the dummy frames. Default is (480, 640, 3).
+            runs (int, optional): The number of dummy inferences. Default is 2.
+
+        Returns:
+            float: The warm-up time in seconds.
+        """
+
+        return model_registry.warmup(self.weights, self.device, self.precision, shape, runs)
+
+    def get_input_size(self, width: int, height: int) -> tuple:
+        """
+        Get the size a frame or region is resized to before inference.
+
+        Parameters:
+            width (int): The width of the frame or region.
+            height (int): The height of the frame or region.
+
+        Returns:
+            tuple: The (width, height) of the model input, never larger than the region for an int inference_size.
+        """
+
+        if self.inference_size is None: return width, height
+        if isinstance(self.inference_size, int):
+            scale = min(self.inference_size / max(width, height), 1.0)
+            return max(round(width * scale), 1), max(round(height * scale), 1)
+
+        return tuple(self.inference_size)
+
+    def prepare_inputs(self, frame, slot: int = 0) -> tuple:
+        """
+        Cut the regions of interest out of a frame and resize them to the inference size into reused buffers.
+
+        The buffers are shared by all callers, so the lock must be held until the model has read the inputs.
+
+        Parameters:
+            frame (ndarray): The frame.
+            slot (int, optional): The index of the frame in a batch, selecting its buffers. Default is 0.
+
+        Returns:
+            tuple: The model inputs and, for each, the transform mapping its coordinates back to the frame as a dict with
+                'scale', 'offset', 'size', 'input_size' and 'roi' keys, or None when the input is the frame itself.
+        """
+
+        if self.inference_size is None and not self.rois: return [frame], [None]
+
+        height, width = frame.shape[:2]
+        inputs = []
+        transforms = []
+
+        for index, (x, y, w, h) in enumerate(self.rois or [(0, 0, width, height)]):
+            x, y = max(int(x), 0), max(int(y), 0)
+            w, h = min(int(w), width - x), min(int(h), height - y)
+            if w <= 0 or h <= 0: continue
+
+            region = frame[y:y + h, x:x + w]
+            size = self.get_input_size(w, h)
 
+            if size != (w, h):
+                shape = (size[1], size[0]) + region.shape[2:]
+                buffer = self.resize_buffers.get((slot, index))
+                if buffer is None or buffer.shape != shape or buffer.dtype != region.dtype:
+                    buffer = self.resize_buffers[(slot, index)] = np.empty(shape, region.dtype)
+                region = cv2.resize(region, size, dst=buffer, interpolation=cv2.INTER_LINEAR)
+            elif not region.flags.c_contiguous: region = np.ascontiguousarray(region)
+
+            inputs.append(region)
+            transforms.append({
+                "scale": (w / size[0], h / size[1]),
+                "offset": (x, y),
+                "size": (w, h),
+                "input_size": size,
+                "roi": index if self.rois else None })
+
+        return inputs, transforms
+
+    def get_model_size(self, inputs: list) -> any:
+        """
+        Get the size the model should letterbox resized inputs to, so it does not scale them back up.
+
+        Parameters:
+            inputs (list): The model inputs.
+
+        Returns:
+            any: The longest input side rounded up to the model stride of 32, or None to keep the model default,
+                as for classification models and inputs that were not resized.
+        """
+
+        if self.inference_size is None or self.mode == "classify" or not inputs: return None
+
+        size = max(max(image.shape[:2]) for image in inputs)
+        return -(-size // 32) * 32
+
+    def map_points(self, points, transform: dict) -> any:
+        """
+        Map x, y coordinates from a model input back to the frame.
+
+        Parameters:
+            points (ndarray): The coordinates, with alternating x and y values along the last axis.
+            transform (dict): The transform of the model input, or None.
+
+        Returns:
+            any: The mapped coordinates as float64, or the points unchanged if there is no transform.
+        """
+
+        if transform is None: return points
+
+        repeats = points.shape[-1] // 2
+        scale = np.tile(transform["scale"], repeats)
+        offset = np.tile(transform["offset"], repeats)
+
+        return points.astype(np.float64) * scale + offset
+
+    def scale_masks(self, masks, transform: dict) -> any:
+        """
+        Map masks from the letterboxed model input back to the area of the frame the input covers.
+
+        Parameters:
+            masks (ndarray): The binary masks at the model resolution, padding included.
+            transform (dict): The transform of the model input.
+
+        Returns:
+            any: The binary masks at the size of the covered area, whose top left corner is the transform 'offset'.
+        """
+
+        input_width, input_height = transform["input_size"]
+        mask_height, mask_width = masks.shape[1:]
+
+        ratio = min(mask_height / input_height, mask_width / input_width)
+        unpad_width, unpad_height = round(input_width * ratio), round(input_height * ratio)
+        left = int(round((mask_width - unpad_width) / 2 - 0.1))
+        top = int(round((mask_height - unpad_height) / 2 - 0.1))
+
+        return np.stack([cv2.resize(mask[top:top + unpad_height, left:left + unpad_width], transform["size"], interpolation=cv2.INTER_NEAREST)
+            for mask in masks.astype(np.uint8)]).astype(bool)
+
+    @instrumented("add_ai_to_frame")
     def add_ai_to_frame(self, frame) -> tuple:
         """
         Add AI-based object detection, segmentation, classification, or pose estimation to the frame.
@@ -41,12 +273,182 @@ class CamAIMixin:
             frame (ndarray): The input frame for processing.
 
         Returns:
-            tuple: The processed frame and AI data.
+            tuple: The processed frame and AI data, a list of dicts or an AIResults depending on result_format.
         """
 
-        ai_data = []
         names = self.model.names
-        results = self.model(frame, stream=True)
+
+        with self.lock:
+            inputs, transforms = self.prepare_inputs(frame)
+            results = self.run_model(inputs[0] if len(inputs) == 1 else inputs, self.get_model_size(inputs)) if inputs else []
+
+        return frame, self.collect_results(results, transforms, frame, names)
+
+    def add_ai_to_frames(self, frames) -> any:
+        """
+        Add AI processing to several frames with a single batched model call.
+
+        The frames are passed to the model together so preprocessing, the forward pass and postprocessing run once per batch
+        instead of once per frame. Frames of different sizes are letterboxed by the model independently.
+
+        Parameters:
+            frames (list or dict): The input frames, as a list or a dict keyed by source (such as cam ID).
+
+        Returns:
+            any: The processed frame and AI data tuples, in a list or a dict matching the input.
+        """
+
+        keys = list(frames.keys()) if isinstance(frames, dict) else None
+        frame_list = list(frames.values()) if keys is not None else list(frames)
+        if not frame_list: return {} if keys is not None else []
+
+        names = self.model.names
+
+        inputs = []
+        owners = []
+        with self.lock:
+            for slot, frame in enumerate(frame_list):
+                frame_inputs, transforms = self.prepare_inputs(frame, slot)
+                inputs.extend(frame_inputs)
+                owners.extend((slot, transform) for transform in transforms)
+
+            results = self.run_model(inputs, self.get_model_size(inputs)) if inputs else []
+
+        frame_results = [([], []) for _ in frame_list]
+        for (slot, transform), r in zip(owners, results):
+            frame_results[slot][0].append(r)
+            frame_results[slot][1].append(transform)
+
+        outputs = [(frame, self.collect_results(rs, ts, frame, names)) for frame, (rs, ts) in zip(frame_list, frame_results)]
+
+        if keys is not None: return dict(zip(keys, outputs))
+        return outputs
+
+    def collect_results(self, results: list, transforms: list, frame, names: list) -> any:
+        """
+        Process the model results of one frame into its AI data, in the configured result format.
+
+        Parameters:
+            results (list): The model results of the frame, one per model input.
+            transforms (list): The transforms of the model inputs.
+            frame (ndarray): The frame the results belong to.
+            names (list): The names of the classes.
+
+        Returns:
+            any: The AI data, a list of dicts or an AIResults stamped with the frame index and time.
+        """
+
+        with self.lock:
+            frame_index = self.frame_index
+            self.frame_index += 1
+
+        if self.result_format == "columnar":
+            columns = AIResults.concatenate([self.process_columns(r, frame, names, transform) for r, transform in zip(results, transforms)], self.mode)
+            columns.frame_index[:] = frame_index
+            columns.timestamps[:] = time.time()
+            return columns
+
+        ai_data = []
+        for r, transform in zip(results, transforms):
+            self.process_result(r, frame, names, ai_data, transform)
+
+        return ai_data
+
+    def process_columns(self, result: dict, frame, names: list, transform: dict = None) -> AIResults:
+        """
+        Process a single model result into columnar AI data without building a dict per object, drawing it if enabled.
+
+        Parameters:
+            result (dict): The result of the model.
+            frame (ndarray): The frame the result belongs to.
+            names (list): The names of the classes.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
+
+        Returns:
+            AIResults: The rows of the result, with the frame index and time left to the caller.
+        """
+
+        roi = transform["roi"] if transform is not None and transform["roi"] is not None else -1
+
+        if self.mode == "classify":
+            probs = result.probs.data.cpu().numpy()
+            top = self.select_top_classes(probs)
+            columns = AIResults(self.mode, top, probs[top], rois=np.full(len(top), roi))
+        else:
+            data = result.boxes.data.cpu().numpy() if result.boxes is not None else np.empty((0, 6), np.float32)
+            keypoints = None
+
+            if self.mode == "pose":
+                keypoints = result.keypoints.xy.cpu().numpy() if result.keypoints is not None else np.empty((0, 0, 2), np.float32)
+                if transform is not None and keypoints.size:
+                    missing = (keypoints == 0).all(axis=2)
+                    keypoints = self.map_points(keypoints, transform)
+                    keypoints[missing] = 0
+
+            columns = AIResults(self.mode, data[:, -1], data[:, -2], self.map_points(data[:, :4], transform), keypoints,
+                rois=np.full(len(data), roi))
+
+        if self.draw:
+            if self.mode == "segmentation" and result.masks is not None:
+                polygons = [np.round(self.map_points(polygon, transform)).astype(np.int32) for polygon in result.masks.xy]
+                cv2.polylines(frame, [polygon for polygon in polygons if len(polygon)], True, (255, 0, 0), 2)
+            else: self.draw_columns(frame, columns, names)
+
+        return columns
+
+    def draw_columns(self, frame, columns: AIResults, names: list) -> None:
+        """
+        Draw columnar AI data on a frame. Segmentations cannot be drawn, since columnar data holds no masks.
+
+        Parameters:
+            frame (ndarray): The frame to draw on.
+            columns (AIResults): The AI data to draw.
+            names (list): The names of the classes.
+        """
+
+        if self.mode == "detection":
+            for (x1, y1, x2, y2), cls, confidence in zip(columns.boxes.astype(int).tolist(), columns.classes.tolist(), columns.confidences.tolist()):
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 255), 3)
+                cv2.putText(frame, f"{names[cls]} {confidence:.2f}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        elif self.mode == "classify":
+            rows = {}
+            for cls, confidence, roi in zip(columns.classes.tolist(), columns.confidences.tolist(), columns.rois.tolist()):
+                x, y = self.rois[roi][:2] if roi >= 0 else (0, 0)
+                row = rows[roi] = rows.get(roi, -1) + 1
+                cv2.putText(frame, f"{names[cls]} {confidence:.2f}", (int(x) + 10, int(y) + 30 + row * 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        elif self.mode == "pose" and columns.keypoints is not None:
+            for x, y in columns.keypoints[(columns.keypoints != 0).any(axis=2)].astype(int).tolist():
+                cv2.circle(frame, (x, y), 5, (0, 255, 0), -1)
+
+    def select_top_classes(self, probs) -> any:
+        """
+        Select the top_k most probable classes at or above min_confidence.
+
+        Parameters:
+            probs (ndarray): The probability of every class.
+
+        Returns:
+            any: The indices of the kept classes, ordered by confidence.
+        """
+
+        if self.top_k is not None and self.top_k < len(probs):
+            top = np.argpartition(probs, -self.top_k)[-self.top_k:]
+        else: top = np.arange(len(probs))
+
+        top = top[np.argsort(probs[top])[::-1]]
+        return top[probs[top] >= self.min_confidence]
+
+    def process_result(self, result: dict, frame, names: list, ai_data: list, transform: dict = None) -> None:
+        """
+        Process a single model result according to the AI processing mode.
+
+        Parameters:
+            result (dict): The result of the model for the frame.
+            frame (ndarray): The frame the result belongs to.
+            names (list): The names of the classes.
+            ai_data (list): The list to store the AI data.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
+        """
 
         mode_func_map = {
             "detection": self.process_detections,
@@ -54,95 +456,188 @@ class CamAIMixin:
             "classify": self.process_classifications,
             "pose": self.process_pose_estimations }
 
-        for r in results:
-            try: mode_func_map[self.mode](r, frame, names, ai_data)
-            except Exception as e: raise Exception(f"Error processing AI data - {e}") from e
+        start = len(ai_data)
+        try: mode_func_map[self.mode](result, frame, names, ai_data, transform)
+        except Exception as e: raise Exception(f"Error processing AI data - {e}") from e
+
+        if transform is not None and transform["roi"] is not None:
+            for entry in ai_data[start:]: entry["roi"] = transform["roi"]
+
+    def draw_ai_data(self, frame, ai_data: list, names: list = None) -> None:
+        """
+        Draw AI data produced earlier on a frame, such as results reused for a frame that was not processed.
+
+        Segmentations are only drawn when stored in the 'polygon' mask format.
+
+        Parameters:
+            frame (ndarray): The frame to draw on.
+            ai_data (list or AIResults): The AI data to draw.
+            names (list, optional): The names of the classes. Default is the class names of the model.
+        """
 
-        return frame, ai_data
+        if isinstance(ai_data, AIResults): return self.draw_columns(frame, ai_data, self.model.names if names is None else names)
+
+        if self.mode == "detection":
+            self.draw_detections(frame, ai_data, self.model.names if names is None else names)
+        elif self.mode == "segmentation":
+            polygons = [entry["polygon"] for entry in ai_data if len(entry.get("polygon", ()))]
+            cv2.polylines(frame, polygons, True, (255, 0, 0), 2)
+        elif self.mode == "classify":
+            rows = {}
+            for entry in ai_data:
+                roi = entry.get("roi", -1)
+                x, y = self.rois[roi][:2] if roi >= 0 else (0, 0)
+                row = rows[roi] = rows.get(roi, -1) + 1
+                cv2.putText(frame, entry["label"], (int(x) + 10, int(y) + 30 + row * 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        elif self.mode == "pose":
+            for entry in ai_data:
+                for x, y in entry["pose"]:
+                    cv2.circle(frame, (int(x), int(y)), 5, (0, 255, 0), -1)
 
-    def process_detections(self, result: dict, frame, names: list, ai_data: list) -> None:
+    def process_detections(self, result: dict, frame, names: list, ai_data: list, transform: dict = None) -> None:
         """
         Process detections and draw bounding boxes on the frame.
 
+        All boxes are moved to the host in a single transfer and converted with vectorized operations.
+
         Parameters:
             result (dict): The result of the detection.
             frame (ndarray): The frame to draw the bounding boxes on.
             names (list): The names of the classes.
             ai_data (list): The list to store the AI data.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
         """
 
         boxes = result.boxes
+        if boxes is None or len(boxes) == 0: return
 
-        for box in boxes:
-            x1, y1, x2, y2 = box.xyxy[0]
-            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        data = boxes.data.cpu().numpy()
+        xyxy = self.map_points(data[:, :4], transform).astype(int).tolist()
+        confidences = (np.ceil(data[:, -2].astype(np.float64) * 100) / 100).tolist()
+        classes = data[:, -1].astype(int).tolist()
 
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 255), 3)
-            confidence = math.ceil((box.conf[0] * 100)) / 100
-            cls = int(box.cls[0])
+        detections = [{
+            "class": cls,
+            "confidence": confidence,
+            "box": box } for cls, confidence, box in zip(classes, confidences, xyxy)]
 
-            org = (x1, y1 - 10)
-            label = f"{names[cls]} {confidence}"
-            cv2.putText(frame, label, org, cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        if self.draw: self.draw_detections(frame, detections, names)
+        ai_data.extend(detections)
 
-            ai_data.append({
-                "class": cls,
-                "confidence": confidence,
-                "box": [x1, y1, x2, y2] })
+    def draw_detections(self, frame, detections: list, names: list) -> None:
+        """
+        Draw bounding boxes and labels of detections on the frame.
 
-    def process_segmentations(self, result: dict, frame, names: list, ai_data: list) -> None:
+        Parameters:
+            frame (ndarray): The frame to draw the bounding boxes on.
+            detections (list): The detection AI data, with 'class', 'confidence' and 'box' keys.
+            names (list): The names of the classes.
+        """
+
+        for detection in detections:
+            x1, y1, x2, y2 = detection["box"]
+
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 255), 3)
+            label = f"{names[detection['class']]} {detection['confidence']}"
+            cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+
+    def process_segmentations(self, result: dict, frame, names: list, ai_data: list, transform: dict = None) -> None:
         """
         Process segmentations and draw masks on the frame.
 
+        The masks are moved to the host in a single transfer and stored in the configured mask format. With a transform,
+        masks are scaled to the area of the frame the model input covers, whose top left corner is stored as 'offset'.
+
         Parameters:
             result (dict): The result of the segmentation.
             frame (ndarray): The frame to draw the masks on.
             names (list): The names of the classes.
             ai_data (list): The list to store the AI data.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
         """
 
-        try: masks = result.masks.data
-        except AttributeError: return
+        if result.masks is None or len(result.masks) == 0: return
 
-        for i, mask in enumerate(masks):
-            mask = mask.cpu().numpy().astype("uint8") * 255
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        data = result.boxes.data.cpu().numpy()
+        confidences = (np.ceil(data[:, -2].astype(np.float64) * 100) / 100).tolist()
+        classes = data[:, -1].astype(int).tolist()
 
-            for contour in contours:
-                cv2.drawContours(frame, [contour], -1, (255, 0, 0), 2)
+        polygons = None
+        if self.draw or self.mask_format == "polygon":
+            polygons = [np.round(self.map_points(polygon, transform)).astype(np.int32) for polygon in result.masks.xy]
+        if self.draw:
+            cv2.polylines(frame, [polygon for polygon in polygons if len(polygon)], True, (255, 0, 0), 2)
 
-            confidence = math.ceil((result.boxes[i].conf[0] * 100)) / 100
-            cls = int(result.boxes[i].cls[0])
+        if self.mask_format == "polygon":
+            outputs = [{"polygon": polygon} for polygon in polygons]
+        else:
+            masks = result.masks.data.cpu().numpy() > 0.5
+            if transform is not None: masks = self.scale_masks(masks, transform)
+
+            if self.mask_format == "mask":
+                outputs = [{"mask": mask} for mask in masks.astype(np.uint8) * 255]
+            elif self.mask_format == "rle":
+                outputs = [{"rle": self.encode_mask_rle(mask)} for mask in masks]
+            else:
+                label_map = np.where(masks.any(axis=0), masks.argmax(axis=0) + 1, 0).astype(np.uint16)
+                outputs = [{"label": i + 1, "label_map": label_map} for i in range(len(masks))]
+
+            if transform is not None:
+                for output in outputs: output["offset"] = list(transform["offset"])
 
+        for cls, confidence, output in zip(classes, confidences, outputs):
             ai_data.append({
                 "class": cls,
                 "confidence": confidence,
-                "mask": mask })
+                **output })
 
-    def process_classifications(self, result: dict, frame, names: list, ai_data: list) -> None:
+    def encode_mask_rle(self, mask) -> dict:
         """
-        Process classifications and add labels to the frame.
+        Encode a binary mask with column-major run-length encoding, as used by COCO.
+
+        Parameters:
+            mask (ndarray): The binary mask.
+
+        Returns:
+            dict: The mask 'size' as [height, width] and the run 'counts', starting with a run of zeros.
+        """
+
+        flat = mask.ravel(order="F")
+        changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+        counts = np.diff(np.concatenate(([0], changes, [flat.size]))).tolist()
+        if flat.size and flat[0]: counts.insert(0, 0)
+
+        return {"size": list(mask.shape), "counts": counts}
+
+    def process_classifications(self, result: dict, frame, names: list, ai_data: list, transform: dict = None) -> None:
+        """
+        Process classifications and add labels of the top classes to the frame.
+
+        Only the top_k most probable classes at or above min_confidence are kept, ordered by confidence.
 
         Parameters:
             result (dict): The result of the classification.
             frame (ndarray): The frame to add the labels to.
             names (list): The names of the classes.
             ai_data (list): The list to store the AI data.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
         """
 
-        for i, prob in enumerate(result.probs[0]):
-            class_name = names[i]
-            confidence = math.ceil((prob * 100)) / 100
+        probs = result.probs.data.cpu().numpy()
+        top = self.select_top_classes(probs)
+        confidences = (np.ceil(probs[top].astype(np.float64) * 100) / 100).tolist()
+        x, y = transform["offset"] if transform is not None else (0, 0)
 
-            label = f"{class_name} {confidence}"
-            cv2.putText(frame, label, (10, 30 + i * 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        for row, (cls, confidence) in enumerate(zip(top.tolist(), confidences)):
+            label = f"{names[cls]} {confidence}"
+            if self.draw: cv2.putText(frame, label, (x + 10, y + 30 + row * 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
 
             ai_data.append({
-                "class": i,
+                "class": cls,
                 "confidence": confidence,
                 "label": label })
 
-    def process_pose_estimations(self, result: dict, frame, names: list, ai_data: list) -> None:
+    def process_pose_estimations(self, result: dict, frame, names: list, ai_data: list, transform: dict = None) -> None:
         """
         Process pose estimations and draw keypoints on the frame.
 
@@ -151,16 +646,22 @@ class CamAIMixin:
             frame (ndarray): The frame to draw the keypoints on.
             names (list): The names of the classes.
             ai_data (list): The list to store the AI data.
+            transform (dict, optional): The transform mapping the model input back to the frame. Default is None.
         """
 
         keypoints = result.keypoints.xy
 
         for keypoint in keypoints:
             keypoint = keypoint.cpu().numpy()
-
-            for kp in keypoint:
-                if len(kp) >= 2:
-                    x, y = kp[:2]
-                    cv2.circle(frame, (int(x), int(y)), 5, (0, 255, 0), -1)
+            if transform is not None:
+                missing = (keypoint == 0).all(axis=1)
+                keypoint = self.map_points(keypoint, transform)
+                keypoint[missing] = 0
+
+            if self.draw:
+                for kp in keypoint:
+                    if len(kp) >= 2:
+                        x, y = kp[:2]
+                        cv2.circle(frame, (int(x), int(y)), 5, (0, 255, 0), -1)
 
             ai_data.append({"pose": keypoint.tolist()})
@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+
+class FramePool:
+    """
+    A pool of preallocated frame buffers that capture objects read into, so steady-state capture allocates nothing.
+
+    Buffers are borrowed for a frame and must be given back once the frame is no longer used.
+
+    Attributes:
+        size (int): The number of buffers kept by the pool.
+        shape (tuple or None): The shape of the buffers, known after the first frame.
+        dtype (type): The data type of the buffers.
+        allocations (int): The number of buffers allocated so far.
+        borrowed (int): The number of buffers currently borrowed.
+    """
+
+    def __init__(self, size: int = 4, shape: tuple = None, dtype=np.uint8) -> None:
+        """
+        Initialize the FramePool class.
+
+        Parameters:
+            size (int, optional): The number of buffers kept by the pool. Default is 4.
+            shape (tuple, optional): The shape of the buffers, or None to take it from the first frame. Default is None.
+            dtype (type, optional): The data type of the buffers. Default is np.uint8.
+        """
+
+        self.size = size
+        self.shape = shape
+        self.dtype = dtype
+
+        self.free = []
+        self.allocations = 0
+        self.borrowed = 0
+        self.lock = threading.Lock()
+
+    def borrow(self) -> any:
+        """
+        Borrow a buffer, allocating one if none is free.
+
+        Returns:
+            any: A buffer of the pool shape, or None while the shape is not known yet.
+        """
+
+        with self.lock:
+            if self.shape is None: return None
+
+            if self.free: buffer = self.free.pop()
+            else:
+                buffer = np.empty(self.shape, dtype=self.dtype)
+                self.allocations += 1
+
+            self.borrowed += 1
+            return buffer
+
+    def give_back(self, buffer) -> None:
+        """
+        Give a borrowed buffer back to the pool.
+
+        Buffers of another shape are dropped, and so are buffers beyond the pool size.
+
+        Parameters:
+            buffer (ndarray): The buffer to give back.
+        """
+
+        with self.lock:
+            self.borrowed = max(self.borrowed - 1, 0)
+
+            if self.shape is None: self.shape = buffer.shape
+            if buffer.shape == self.shape and buffer.dtype == self.dtype and len(self.free) < self.size:
+                if not any(buffer is free for free in self.free): self.free.append(buffer)
+
+    def adopt(self, buffer) -> None:
+        """
+        Count a frame allocated outside the pool as a borrowed buffer of the pool, taking its shape if needed.
+
+        Parameters:
+            buffer (ndarray): The frame allocated by the capture object.
+        """
+
+        with self.lock:
+            if buffer.shape != self.shape or buffer.dtype != self.dtype:
+                self.shape = buffer.shape
+                self.dtype = buffer.dtype
+                self.free = []
+
+            self.allocations += 1
+            self.borrowed += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get the pool counters.
+
+        Returns:
+            dict: The buffer shape, the allocations so far, and the borrowed and free buffer counts.
+        """
+
+        with self.lock:
+            return {
+                "shape": self.shape,
+                "allocations": self.allocations,
+                "borrowed": self.borrowed,
+                "free": len(self.free) }
@@ -1,10 +1,14 @@
-import cv2
-import mss
+import time
 import platform
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
+from cam_manager.cam_reader import CamReader
+from cam_manager.cam_imports import LazyModule
+from cam_manager.cam_telemetry import cam_key, instrumented
 from cam_manager.cam_settings import CamSettingsMixin as Settings
 
+cv2 = LazyModule("cv2")
+
 class CamControlMixin:
     """
     A mixin class for managing cameras and capturing video frames, including support for fake cams (screen captures).
@@ -12,11 +16,20 @@ class CamControlMixin:
     Attributes:
         cams (dict): A dictionary to store opened camera objects.
         fake_cams (dict): A dictionary to store fake cam windows.
+        grabbers (dict): A dictionary to store the persistent screen grabbers of the fake cams.
         active_cam_id (int or str): The ID or title of the currently active camera.
         load_settings (bool): Whether to load camera settings from a file.
+        settings_file (str): The settings store shared by all cams.
+        settings_stats (dict): The counts and timing of the settings apply of each cam, None when no settings were stored.
+        threaded_capture (bool): Whether each cam is read continuously by a background reader thread.
+        readers (dict): A dictionary to store the background readers of the cams.
+        retrieve_pool (ThreadPoolExecutor or None): The thread pool decoding frames for synchronized multi-cam grabs.
+        frame_pools (dict): A dictionary to store the frame buffer pools of the cams.
+        frame_pool_size (int): The number of buffers kept by each frame buffer pool.
+        process_capture (bool): Whether each cam is read by a worker process publishing frames through shared memory.
     """
 
-    def add_cam(self, cam_id: int, capture_method = None, fake_window_title: str = None) -> None:
+    def add_cam(self, cam_id: int, capture_method = None, fake_window_title: str = None, cap = None, fake_cam_format: str = "bgr") -> None:
         """
         Add a cam by its ID or a fake cam by a window title.
 
@@ -24,6 +37,8 @@ class CamControlMixin:
             cam_id (int): The ID of the cam to be added.
             capture_method: The method used to capture the video stream.
             fake_window_title (str, optional): The title of the window to be used as a fake cam.
+            cap (optional): An already opened capture object to add under cam_id, such as a video file or a synthetic source.
+            fake_cam_format (str, optional): The frame format of a fake cam, 'bgr' or 'bgra' (no conversion). Default is 'bgr'.
         """
 
         os_method_map = {
@@ -39,7 +54,11 @@ class CamControlMixin:
                 window = self.get_window_by_title(fake_window_title)
 
                 if window:
-                    self.fake_cams[fake_window_title] = window[0]
+                    if isinstance(window, list): window = window[0]
+                    from cam_manager.cam_grabber import ScreenGrabber
+
+                    self.fake_cams[fake_window_title] = window
+                    self.grabbers[fake_window_title] = ScreenGrabber(window, fake_cam_format)
                     if self.active_cam_id is None:
                         self.active_cam_id = fake_window_title
                     print(f"Fake cam [{fake_window_title}] added successfully.")
@@ -47,14 +66,22 @@ class CamControlMixin:
             else: raise Exception(f"Window [{fake_window_title}] is already added as a fake cam.")
         else:
             if cam_id not in self.cams:
-                cap = cv2.VideoCapture(cam_id, capture_method)
+                if cap is None and self.process_capture:
+                    from cam_manager.cam_workers import ProcessCapture
+                    cap = ProcessCapture(cam_id, capture_method)
+                elif cap is None: cap = cv2.VideoCapture(cam_id, capture_method)
                 if not cap.isOpened(): raise Exception(f"Failed to open cam [{cam_id}].")
                 else:
                     self.cams[cam_id] = cap
 
                     if self.load_settings:
-                        cam_settings = Settings(f"cam_settings_{cam_id}.json")
+                        cam_settings = Settings(self.settings_file, cam_id)
                         cam_settings.load_settings(cap)
+                        self.settings_stats[cam_id] = cam_settings.last_apply
+
+                    if self.threaded_capture:
+                        self.readers[cam_id] = CamReader(cap, cam_id)
+                        self.readers[cam_id].start()
 
                     if self.active_cam_id is None:
                         self.active_cam_id = cam_id
@@ -72,6 +99,9 @@ class CamControlMixin:
 
         if fake_window_title:
             if fake_window_title in self.fake_cams:
+                if fake_window_title in self.recorders: self.stop_recording(fake_window_title=fake_window_title)
+                if self.streams: self.stop_streaming(fake_window_title=fake_window_title)
+                self.grabbers.pop(fake_window_title).close()
                 del self.fake_cams[fake_window_title]
                 if self.active_cam_id == fake_window_title:
                     self.active_cam_id = None
@@ -79,8 +109,14 @@ class CamControlMixin:
             else: raise Exception(f"Fake cam [{fake_window_title}] does not exist.")
         else:
             if cam_id in self.cams:
+                if cam_id in self.recorders: self.stop_recording(cam_id)
+                if self.streams: self.stop_streaming(cam_id=cam_id)
+                if cam_id in self.readers:
+                    self.readers.pop(cam_id).stop()
+
                 self.cams[cam_id].release()
                 del self.cams[cam_id]
+                self.frame_pools.pop(cam_id, None)
 
                 if self.active_cam_id == cam_id:
                     self.active_cam_id = None
@@ -95,8 +131,23 @@ class CamControlMixin:
         for fake_window_title in list(self.fake_cams.keys()):
             self.release_cam(fake_window_title=fake_window_title)
 
+        if self.retrieve_pool is not None:
+            self.retrieve_pool.shutdown()
+            self.retrieve_pool = None
+        self.wait_for_captures()
+
+        if self.window_index is not None:
+            self.window_index.close()
+            self.window_index = None
+
         print("All cams and fake cams released successfully.")
 
+    def close(self) -> None:
+        """Release all cams and stop the AI worker process, if AI runs in one."""
+
+        self.release_all_cams()
+        if self.ai is not None and hasattr(self.ai, "close"): self.ai.close()
+
     def switch_active_cam(self, cam_id: int = None, fake_window_title: str = None) -> None:
         """
         Switch the active cam to the specified ID or fake cam to the specified window title.
@@ -117,6 +168,7 @@ class CamControlMixin:
                 print(f"Active cam switched to [{cam_id}].")
             else: raise Exception(f"Cam [{cam_id}] does not exist.")
 
+    @instrumented("get_frame", cam_key)
     def get_frame(self, cam_id: int = None, fake_window_title: str = None) -> any:
         """
         Get a frame from a specific cam or fake cam.
@@ -127,6 +179,7 @@ class CamControlMixin:
 
         Returns:
             any: The captured frame from the specified or active cam/fake cam, or None if failed.
+                 Fake cam frames reuse their buffer on the next call, copy them if they must be kept.
         """
 
         if cam_id is None and fake_window_title is None:
@@ -134,29 +187,176 @@ class CamControlMixin:
                 print("No active cam.")
                 return None
 
-            if isinstance(self.active_cam_id, int):
+            if self.active_cam_id in self.cams:
                 cam_id = self.active_cam_id
             else: fake_window_title = self.active_cam_id
 
         if fake_window_title:
             if fake_window_title in self.fake_cams:
-                window = self.fake_cams[fake_window_title]
-
-                with mss.mss() as sct:
-                    monitor = {"top": window.top, "left": window.left, "width": window.width, "height": window.height}
-                    frame = np.array(sct.grab(monitor))
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+                frame = self.grabbers[fake_window_title].grab()
+                if self.recorders: self.record_frame(fake_window_title, frame)
+                if self.streams: self.publish_frame(fake_window_title, frame)
 
-                    return frame
+                return frame
             else: raise Exception(f"Fake cam [{fake_window_title}] does not exist.")
         else:
             if cam_id in self.cams:
-                ret, frame = self.cams[cam_id].read()
-                if not ret: raise Exception(f"Failed to read frame from cam [{cam_id}].")
+                if cam_id in self.readers:
+                    frame, _, _ = self.get_tagged_frame(cam_id)
+                else:
+                    ret, frame = self.cams[cam_id].read()
+                    if not ret: raise Exception(f"Failed to read frame from cam [{cam_id}].")
 
+                if self.recorders: self.record_frame(cam_id, frame)
+                if self.streams: self.publish_frame(cam_id, frame)
                 return frame
             else: raise Exception(f"Cam [{cam_id}] does not exist.")
 
+    def borrow_frame(self, cam_id: int = None) -> any:
+        """
+        Read a frame from a cam into a buffer borrowed from the cam's frame pool.
+
+        Once the pool is warm no memory is allocated per frame. The frame must be given back with release_frame when it is
+        no longer used, after which its content is overwritten by a later read.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to read from. Default is the active cam.
+
+        Returns:
+            any: The frame, held in a pooled buffer.
+        """
+
+        if cam_id is None: cam_id = self.active_cam_id
+        if cam_id not in self.cams: raise Exception(f"Cam [{cam_id}] does not exist.")
+        if cam_id in self.readers: raise Exception(f"Cam [{cam_id}] is read by a background thread, use get_frame instead.")
+
+        if cam_id not in self.frame_pools:
+            from cam_manager.cam_buffers import FramePool
+            self.frame_pools[cam_id] = FramePool(self.frame_pool_size)
+        pool = self.frame_pools[cam_id]
+
+        buffer = pool.borrow()
+        ret, frame = self.cams[cam_id].read(buffer) if buffer is not None else self.cams[cam_id].read()
+
+        if not ret:
+            if buffer is not None: pool.give_back(buffer)
+            raise Exception(f"Failed to read frame from cam [{cam_id}].")
+
+        if frame is not buffer:
+            if buffer is not None: pool.give_back(buffer)
+            pool.adopt(frame)
+
+        return frame
+
+    def release_frame(self, frame, cam_id: int = None) -> None:
+        """
+        Give a frame obtained with borrow_frame back to the cam's frame pool.
+
+        Parameters:
+            frame (ndarray): The borrowed frame.
+            cam_id (int, optional): The ID of the cam the frame was read from. Default is the active cam.
+        """
+
+        if cam_id is None: cam_id = self.active_cam_id
+        if cam_id not in self.frame_pools: raise Exception(f"Cam [{cam_id}] has no frame pool.")
+
+        self.frame_pools[cam_id].give_back(frame)
+
+    def get_frames(self, cam_ids: list = None) -> dict:
+        """
+        Get time-aligned frames from several cams at once.
+
+        All cams are grabbed back to back first, then their frames are retrieved (decoded) in parallel on a thread pool,
+        so the capture instants are not skewed by the decode time of the other cams.
+        Cams read by a background thread contribute their newest frame and its capture timestamp instead.
+
+        Parameters:
+            cam_ids (list, optional): The IDs of the cams to get frames from. Default is all added cams.
+
+        Returns:
+            dict: The 'frames' and time.monotonic() 'timestamps' keyed by cam ID, and the 'skew' in seconds
+                  between the earliest and latest capture.
+        """
+
+        if cam_ids is None: cam_ids = list(self.cams.keys())
+
+        for cam_id in cam_ids:
+            if cam_id not in self.cams: raise Exception(f"Cam [{cam_id}] does not exist.")
+
+        frames = {}
+        timestamps = {}
+        grabbed = [cam_id for cam_id in cam_ids if cam_id not in self.readers]
+
+        for cam_id in grabbed:
+            if not self.cams[cam_id].grab(): raise Exception(f"Failed to grab frame from cam [{cam_id}].")
+            timestamps[cam_id] = time.monotonic()
+
+        if len(grabbed) > 1:
+            if self.retrieve_pool is None:
+                self.retrieve_pool = ThreadPoolExecutor(thread_name_prefix="CamRetrieve")
+            futures = {cam_id: self.retrieve_pool.submit(self.cams[cam_id].retrieve) for cam_id in grabbed}
+            retrieved = {cam_id: future.result() for cam_id, future in futures.items()}
+        else: retrieved = {cam_id: self.cams[cam_id].retrieve() for cam_id in grabbed}
+
+        for cam_id, (ret, frame) in retrieved.items():
+            if not ret: raise Exception(f"Failed to retrieve frame from cam [{cam_id}].")
+            frames[cam_id] = frame
+
+        for cam_id in cam_ids:
+            if cam_id in self.readers:
+                frames[cam_id], _, timestamps[cam_id] = self.get_tagged_frame(cam_id)
+
+        skew = max(timestamps.values()) - min(timestamps.values()) if timestamps else 0.0
+        return {"frames": frames, "timestamps": timestamps, "skew": skew}
+
+    def get_tagged_frame(self, cam_id: int = None, timeout: float = 1.0) -> tuple:
+        """
+        Get the newest frame of a threaded cam along with its sequence number and capture timestamp.
+
+        The call does not block unless the reader has not produced its first frame yet.
+        The returned frame is shared with other consumers of the same cam, copy it before drawing on it if needed.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to get the frame from. Default is the active cam.
+            timeout (float, optional): The time to wait for the first frame in seconds. Default is 1.0.
+
+        Returns:
+            tuple: The frame, its sequence number and its time.monotonic() timestamp.
+        """
+
+        if cam_id is None: cam_id = self.active_cam_id
+        if cam_id not in self.readers: raise Exception(f"Cam [{cam_id}] is not read by a background thread.")
+
+        reader = self.readers[cam_id]
+        frame, seq, timestamp = reader.latest()
+        if frame is None: frame, seq, timestamp = reader.wait_for_next(seq, timeout)
+        if frame is None: raise Exception(f"Failed to read frame from cam [{cam_id}].")
+
+        return frame, seq, timestamp
+
+    def wait_for_next_frame(self, cam_id: int = None, timeout: float = 1.0) -> any:
+        """
+        Block until a new frame is read from a cam.
+
+        For cams without a background reader this is the same as a direct read.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to get the frame from. Default is the active cam.
+            timeout (float, optional): The maximum time to wait in seconds. Default is 1.0.
+
+        Returns:
+            any: The next frame from the cam.
+        """
+
+        if cam_id is None: cam_id = self.active_cam_id
+        if cam_id not in self.readers: return self.get_frame(cam_id)
+
+        frame, _, _ = self.readers[cam_id].wait_for_next(timeout=timeout)
+        if frame is None: raise Exception(f"Timed out waiting for a frame from cam [{cam_id}].")
+
+        return frame
+
+    @instrumented("capture_image", cam_key)
     def capture_image(self, cam_id: int = None, fake_window_title: str = None, filename: str = "capture.jpg") -> None:
         """
         Capture an image from a specific cam or fake cam and save it to a file.
@@ -172,3 +372,32 @@ class CamControlMixin:
             cv2.imwrite(filename, frame)
             print(f"Image captured and saved as [{filename}].")
         else: raise Exception("Failed to capture image from cam.")
+
+    def process_video(self, path: str, ai_mode: str = None, ai_options: dict = None, workers: int = None, chunk_frames: int = None,
+        batch_size: int = 1, progress=None) -> dict:
+        """
+        Run AI processing over a recorded video file offline, as fast as possible instead of at live speed.
+
+        The file is split into keyframe-aligned chunks that are decoded and processed in a pool of worker processes,
+        and the results are merged in frame order.
+
+        Parameters:
+            path (str): The path of the video file.
+            ai_mode (str, optional): The AI mode to use. Default is the mode of the manager AI, or 'detection'.
+            ai_options (dict, optional): Extra keyword arguments for CamAIMixin, such as result_format. Default is no drawing.
+            workers (int, optional): The number of worker processes. Default is the number of CPUs.
+            chunk_frames (int, optional): The minimum number of frames per chunk. Default is about four chunks per worker.
+            batch_size (int, optional): The number of frames per model call. Default is 1.
+            progress (callable, optional): A function called with (frames done, frame count) after each chunk. Default is None.
+
+        Returns:
+            dict: The AI data of each frame in order, the frames processed, the chunks, the elapsed and video durations in
+                seconds, the frames per second and the speedup over realtime.
+        """
+
+        from cam_manager.cam_offline import VideoBatchProcessor
+
+        if ai_mode is None: ai_mode = self.ai.mode if self.ai is not None else "detection"
+
+        processor = VideoBatchProcessor(path, ai_mode, ai_options, workers, chunk_frames, batch_size)
+        return processor.run(progress)
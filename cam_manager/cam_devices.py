@@ -0,0 +1,201 @@
+import os
+import re
+import errno
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+VIDIOC_QUERYCAP = 0x80685600
+VIDIOC_ENUM_FMT = 0xC0405602
+
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+
+QUERYCAP_FORMAT = "16s32s32sIII12x"
+ENUM_FMT_FORMAT = "III32sI16x"
+
+def decode_string(raw: bytes) -> str:
+    """
+    Decode a NUL terminated string of a V4L2 structure.
+
+    Parameters:
+        raw (bytes): The raw string field.
+
+    Returns:
+        str: The decoded string.
+    """
+
+    return raw.split(b"\0", 1)[0].decode(errors="replace")
+
+def probe_v4l2_device(path: str) -> any:
+    """
+    Query the capabilities and capture formats of a V4L2 device node without starting a stream.
+
+    Parameters:
+        path (str): The path of the device node, such as '/dev/video0'.
+
+    Returns:
+        any: A dict with the 'driver', 'card', 'bus_info', 'capture' flag and 'formats' of the device,
+             or None if the node cannot be opened or is not a V4L2 device.
+    """
+
+    import fcntl
+
+    try: fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError: return None
+
+    try:
+        buffer = bytearray(struct.calcsize(QUERYCAP_FORMAT))
+        try: fcntl.ioctl(fd, VIDIOC_QUERYCAP, buffer)
+        except OSError: return None
+
+        driver, card, bus_info, _, capabilities, device_caps = struct.unpack(QUERYCAP_FORMAT, buffer)
+        if capabilities & V4L2_CAP_DEVICE_CAPS: capabilities = device_caps
+
+        formats = []
+        while True:
+            buffer = bytearray(struct.pack(ENUM_FMT_FORMAT, len(formats), V4L2_BUF_TYPE_VIDEO_CAPTURE, 0, b"", 0))
+            try: fcntl.ioctl(fd, VIDIOC_ENUM_FMT, buffer)
+            except OSError as e:
+                if e.errno != errno.EINVAL: print(f"Failed to enumerate formats of [{path}] - {e}")
+                break
+
+            _, _, _, description, pixelformat = struct.unpack(ENUM_FMT_FORMAT, buffer)
+            formats.append({"fourcc": pixelformat.to_bytes(4, "little").decode(errors="replace"), "description": decode_string(description)})
+
+        return {
+            "driver": decode_string(driver),
+            "card": decode_string(card),
+            "bus_info": decode_string(bus_info),
+            "capture": bool(capabilities & (V4L2_CAP_VIDEO_CAPTURE | V4L2_CAP_VIDEO_CAPTURE_MPLANE)),
+            "formats": formats }
+    finally: os.close(fd)
+
+class CamDiscovery:
+    """
+    Cam discovery on Linux by enumerating the /dev/video* nodes and querying them in parallel with V4L2 ioctls.
+
+    Results are cached and reused until a device node is added or removed. The device directory, the sysfs
+    directory and the probe function can be replaced, for example with fake nodes and a mocked probe in tests.
+
+    Attributes:
+        dev_dir (str): The directory holding the video device nodes.
+        sysfs_dir (str): The sysfs directory holding the names of the video devices.
+        probe (callable): The function querying a device node, returning a dict like probe_v4l2_device or None.
+        max_workers (int): The maximum number of nodes probed in parallel.
+        devices (list or None): The cached capture devices.
+        signature (tuple or None): The device nodes the cache was built from.
+    """
+
+    node_pattern = re.compile(r"^video(\d+)$")
+
+    def __init__(self, dev_dir: str = "/dev", sysfs_dir: str = "/sys/class/video4linux", probe=probe_v4l2_device, max_workers: int = 8) -> None:
+        """
+        Initialize the CamDiscovery class.
+
+        Parameters:
+            dev_dir (str, optional): The directory holding the video device nodes. Default is '/dev'.
+            sysfs_dir (str, optional): The sysfs directory holding the device names. Default is '/sys/class/video4linux'.
+            probe (callable, optional): The function querying a device node. Default is probe_v4l2_device.
+            max_workers (int, optional): The maximum number of nodes probed in parallel. Default is 8.
+        """
+
+        self.dev_dir = dev_dir
+        self.sysfs_dir = sysfs_dir
+        self.probe = probe
+        self.max_workers = max_workers
+
+        self.devices = None
+        self.signature = None
+
+    def list_nodes(self) -> list:
+        """
+        List the video device nodes.
+
+        Returns:
+            list: The (index, path, identity) tuples of the nodes sorted by index, where the identity changes when a
+                  node is replaced.
+        """
+
+        nodes = []
+
+        try: entries = list(os.scandir(self.dev_dir))
+        except OSError: return nodes
+
+        for entry in entries:
+            match = self.node_pattern.match(entry.name)
+            if not match: continue
+
+            try: stat = entry.stat()
+            except OSError: continue
+            nodes.append((int(match.group(1)), entry.path, (stat.st_ino, stat.st_rdev, stat.st_ctime_ns)))
+
+        return sorted(nodes)
+
+    def read_name(self, index: int) -> any:
+        """
+        Read the name of a video device from sysfs.
+
+        Parameters:
+            index (int): The index of the device.
+
+        Returns:
+            any: The device name, or None if it is not available.
+        """
+
+        try:
+            with open(os.path.join(self.sysfs_dir, f"video{index}", "name")) as f: return f.read().strip() or None
+        except OSError: return None
+
+    def probe_node(self, node: tuple) -> any:
+        """
+        Probe a single device node.
+
+        Parameters:
+            node (tuple): The (index, path, identity) tuple of the node.
+
+        Returns:
+            any: The device dict, or None if the node is not a capture device.
+        """
+
+        index, path, _ = node
+
+        info = self.probe(path)
+        if not info or not info.get("capture", True): return None
+
+        device = {"index": index, "path": path, "name": self.read_name(index) or info.get("card") or f"video{index}"}
+        device.update({key: value for key, value in info.items() if key != "capture"})
+        device.setdefault("formats", [])
+
+        return device
+
+    def discover(self, refresh: bool = False) -> list:
+        """
+        Get the capture devices, probing the nodes again only when the set of nodes changed.
+
+        Parameters:
+            refresh (bool, optional): Whether to probe the nodes even if they did not change. Default is False.
+
+        Returns:
+            list: The capture devices sorted by index, each a dict with 'index', 'path', 'name' and 'formats' keys.
+        """
+
+        nodes = self.list_nodes()
+        signature = tuple(nodes)
+        if not refresh and self.devices is not None and signature == self.signature: return self.devices
+
+        if nodes:
+            with ThreadPoolExecutor(min(self.max_workers, len(nodes)), thread_name_prefix="CamProbe") as pool:
+                devices = [device for device in pool.map(self.probe_node, nodes) if device is not None]
+        else: devices = []
+
+        self.devices = devices
+        self.signature = signature
+        return devices
+
+    def invalidate(self) -> None:
+        """Drop the cached devices."""
+
+        self.devices = None
+        self.signature = None
@@ -1,5 +1,105 @@
-import cv2
-import numpy as np
+from functools import lru_cache
+
+from cam_manager.cam_imports import LazyModule
+from cam_manager.cam_telemetry import instrumented
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+MAX_EFFECT_CHAINS = 16
+
+@lru_cache(maxsize=1)
+def sepia_kernel() -> any:
+    """
+    Build the color transform matrix of the sepia effect.
+
+    Returns:
+        any: The 3x3 float64 matrix.
+    """
+
+    kernel = np.array(
+        [[0.272, 0.534, 0.131],
+        [0.349, 0.686, 0.168],
+        [0.393, 0.769, 0.189]])
+    kernel.flags.writeable = False
+    return kernel
+
+@lru_cache(maxsize=1)
+def emboss_kernel() -> any:
+    """
+    Build the convolution kernel of the emboss effect.
+
+    Returns:
+        any: The 3x3 float32 kernel.
+    """
+
+    kernel = np.array(
+        [[0, -1, -1],
+        [1, 0, -1],
+        [1, 1, 0]], dtype=np.float32)
+    kernel.flags.writeable = False
+    return kernel
+
+@lru_cache(maxsize=1)
+def negative_lut() -> any:
+    """
+    Build the lookup table of the negative effect.
+
+    Returns:
+        any: The 256 entry uint8 lookup table.
+    """
+
+    lut = np.arange(255, -1, -1, dtype=np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+@lru_cache(maxsize=64)
+def gamma_lut(gamma: float) -> any:
+    """
+    Build the lookup table of a gamma correction, cached per gamma value.
+
+    Parameters:
+        gamma (float): The gamma value, above 1 brightens and below 1 darkens.
+
+    Returns:
+        any: The 256 entry uint8 lookup table.
+    """
+
+    lut = np.clip(((np.arange(256) / 255.0) ** (1.0 / gamma)) * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+@lru_cache(maxsize=64)
+def brightness_contrast_lut(alpha: float, beta: float) -> any:
+    """
+    Build the lookup table of a brightness and contrast adjustment, cached per parameter pair.
+
+    Parameters:
+        alpha (float): The contrast gain.
+        beta (float): The brightness offset.
+
+    Returns:
+        any: The 256 entry uint8 lookup table.
+    """
+
+    lut = np.clip(np.arange(256) * alpha + beta + 0.5, 0, 255).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+def chain_key(self, frame, effects: list, *args, **kwargs) -> str:
+    """
+    Get the telemetry key of an effect chain.
+
+    Parameters:
+        self (CamEffectsMixin): The object applying the chain.
+        frame (any): The input frame.
+        effects (list): The effects in order, as names or (name, parameters dict) tuples.
+
+    Returns:
+        str: The effect names joined by '+'.
+    """
+
+    return "+".join(effect if isinstance(effect, str) else effect[0] for effect in effects)
 
 class CamEffectsMixin:
     """
@@ -11,22 +111,30 @@ class CamEffectsMixin:
         apply_emboss(frame): Apply emboss effect to the frame.
         apply_negative(frame): Apply negative effect to the frame.
         apply_canny(frame, threshold1, threshold2): Apply Canny edge detection to the frame.
+        apply_gamma(frame, gamma): Apply gamma correction to the frame.
+        apply_brightness_contrast(frame, alpha, beta): Adjust brightness and contrast of the frame.
+        apply_effects(frame, effects): Apply a chain of effects to the frame.
+
+    All methods accept an optional dst buffer of the output shape, which is filled and returned instead of a new array.
     """
 
-    def apply_gray(self, frame) -> any:
+    @instrumented("effect", "gray")
+    def apply_gray(self, frame, dst=None) -> any:
         """
         Convert frame to grayscale.
 
         Parameters:
             frame (any): The input frame to be converted.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
 
         Returns:
             any: The grayscaled frame.
         """
 
-        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
 
-    def apply_canny(self, frame, threshold1: int = 100, threshold2: int = 200) -> any:
+    @instrumented("effect", "canny")
+    def apply_canny(self, frame, threshold1: int = 100, threshold2: int = 200, dst=None) -> any:
         """
         Apply Canny edge detection to the frame.
 
@@ -34,57 +142,270 @@ class CamEffectsMixin:
             frame (any): The input frame to be processed.
             threshold1 (int, optional): The first threshold for the hysteresis procedure. Default is 100.
             threshold2 (int, optional): The second threshold for the hysteresis procedure. Default is 200.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
 
         Returns:
             any: The frame with Canny edge detection applied.
         """
 
-        return cv2.Canny(frame, threshold1, threshold2)
+        return cv2.Canny(frame, threshold1, threshold2, edges=dst)
 
-    def apply_sepia(self, frame) -> any:
+    @instrumented("effect", "sepia")
+    def apply_sepia(self, frame, dst=None) -> any:
         """
         Apply sepia effect to the frame.
 
         Parameters:
             frame (any): The input frame to be converted.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
 
         Returns:
             any: The frame with sepia effect applied.
         """
-        sepia_filter = np.array(
-            [[0.272, 0.534, 0.131],
-            [0.349, 0.686, 0.168],
-            [0.393, 0.769, 0.189]])
 
-        sepia_frame = cv2.transform(frame, sepia_filter)
-        return cv2.convertScaleAbs(sepia_frame)
+        return cv2.transform(frame, sepia_kernel(), dst=dst)
 
-    def apply_emboss(self, frame) -> any:
+    @instrumented("effect", "emboss")
+    def apply_emboss(self, frame, dst=None) -> any:
         """
         Apply emboss effect to the frame.
 
         Parameters:
             frame (any): The input frame to be converted.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
 
         Returns:
             any: The frame with emboss effect applied.
         """
-        kernel = np.array(
-            [[0, -1, -1],
-            [1, 0, -1],
-            [1, 1, 0]])
 
-        return cv2.filter2D(frame, -1, kernel)
+        return cv2.filter2D(frame, -1, emboss_kernel(), dst=dst)
 
-    def apply_negative(self, frame) -> any:
+    @instrumented("effect", "negative")
+    def apply_negative(self, frame, dst=None) -> any:
         """
         Apply negative effect to the frame.
 
         Parameters:
             frame (any): The input frame to be converted.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
 
         Returns:
             any: The frame with negative effect applied.
         """
 
-        return cv2.bitwise_not(frame)
+        return cv2.bitwise_not(frame, dst=dst)
+
+    @instrumented("effect", "gamma")
+    def apply_gamma(self, frame, gamma: float = 1.5, dst=None) -> any:
+        """
+        Apply gamma correction to the frame.
+
+        Parameters:
+            frame (any): The input frame to be converted.
+            gamma (float, optional): The gamma value, above 1 brightens and below 1 darkens. Default is 1.5.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
+
+        Returns:
+            any: The gamma corrected frame.
+        """
+
+        return cv2.LUT(frame, gamma_lut(gamma), dst=dst)
+
+    @instrumented("effect", "brightness_contrast")
+    def apply_brightness_contrast(self, frame, alpha: float = 1.0, beta: float = 0.0, dst=None) -> any:
+        """
+        Adjust brightness and contrast of the frame.
+
+        Parameters:
+            frame (any): The input frame to be converted.
+            alpha (float, optional): The contrast gain. Default is 1.0.
+            beta (float, optional): The brightness offset. Default is 0.0.
+            dst (ndarray, optional): The buffer to write the result to. Default is None.
+
+        Returns:
+            any: The adjusted frame.
+        """
+
+        return cv2.LUT(frame, brightness_contrast_lut(alpha, beta), dst=dst)
+
+    def create_effect_chain(self, effects: list) -> "EffectChain":
+        """
+        Create a reusable chain of effects.
+
+        Parameters:
+            effects (list): The effects in order, as names or (name, parameters dict) tuples.
+
+        Returns:
+            EffectChain: The compiled chain.
+        """
+
+        return EffectChain(effects)
+
+    @instrumented("effect", chain_key)
+    def apply_effects(self, frame, effects: list, dst=None) -> any:
+        """
+        Apply a chain of effects to the frame, compiling and caching the chain on first use.
+
+        Only the MAX_EFFECT_CHAINS most recently used chains are kept, so effects with changing parameters do not pile up buffers.
+        The cached chains are shared by all threads, so calls are serialized. For no allocation per frame, pass dst or keep
+        a chain from create_effect_chain.
+
+        Parameters:
+            frame (any): The input frame to be processed.
+            effects (list): The effects in order, as names or (name, parameters dict) tuples.
+            dst (ndarray, optional): The buffer to write the result to. Default is a new array.
+
+        Returns:
+            any: The processed frame.
+        """
+
+        key = repr(effects)
+
+        with self.effect_lock:
+            chain = self.effect_chains.pop(key, None)
+            if chain is None: chain = EffectChain(effects)
+
+            self.effect_chains[key] = chain
+            if len(self.effect_chains) > MAX_EFFECT_CHAINS: self.effect_chains.pop(next(iter(self.effect_chains)))
+
+            if dst is None: dst = np.empty(chain.result_shape(frame.shape), dtype=np.uint8)
+            return chain.apply(frame, dst)
+
+class EffectChain:
+    """
+    A compiled chain of effects with precomputed constants and reused intermediate buffers.
+
+    Adjacent lookup table effects (negative, gamma, brightness_contrast) are merged into a single lookup table pass,
+    and a lone negative runs as a bitwise not.
+    Intermediate results go to buffers kept between calls, so a chain allocates nothing once warm.
+
+    Attributes:
+        effects (list): The effects of the chain as (name, parameters) tuples.
+        steps (list): The compiled passes as (kind, constant, parameters) tuples.
+        buffers (dict): The intermediate buffers keyed by pass index and shape.
+    """
+
+    lut_effects = {
+        "negative": negative_lut,
+        "gamma": gamma_lut,
+        "brightness_contrast": brightness_contrast_lut }
+
+    gray_effects = ("gray", "canny")
+
+    def __init__(self, effects: list) -> None:
+        """
+        Initialize the EffectChain class.
+
+        Parameters:
+            effects (list): The effects in order, as names or (name, parameters dict) tuples.
+        """
+
+        self.effects = [(effect, {}) if isinstance(effect, str) else (effect[0], dict(effect[1])) for effect in effects]
+        self.steps = []
+        self.buffers = {}
+
+        gray = False
+        for name, params in self.effects:
+            if name in self.lut_effects:
+                lut = self.lut_effects[name](**params)
+
+                if self.steps and self.steps[-1][0] == "lut":
+                    self.steps[-1] = ("lut", lut[self.steps[-1][1]], {})
+                else: self.steps.append(("lut", lut, {}))
+            elif name == "sepia":
+                if gray: raise Exception("Effect [sepia] needs a color frame.")
+                self.steps.append(("sepia", sepia_kernel(), params))
+            elif name == "emboss":
+                self.steps.append(("emboss", emboss_kernel(), params))
+            elif name in self.gray_effects:
+                if name == "gray" and gray: raise Exception("Effect [gray] needs a color frame.")
+                self.steps.append((name, None, params))
+                gray = True
+            else: raise Exception(f"Unknown effect [{name}].")
+
+        self.steps = [("negative", None, {}) if kind == "lut" and np.array_equal(constant, negative_lut()) else (kind, constant, params)
+            for kind, constant, params in self.steps]
+
+    def output_shape(self, shape: tuple, kind: str) -> tuple:
+        """
+        Get the output shape of a pass.
+
+        Parameters:
+            shape (tuple): The input shape.
+            kind (str): The kind of pass.
+
+        Returns:
+            tuple: The output shape.
+        """
+
+        return shape[:2] if kind in self.gray_effects else shape
+
+    def result_shape(self, shape: tuple) -> tuple:
+        """
+        Get the shape of the frames the chain produces.
+
+        Parameters:
+            shape (tuple): The input shape.
+
+        Returns:
+            tuple: The output shape.
+        """
+
+        for step in self.steps: shape = self.output_shape(shape, step[0])
+        return shape
+
+    def run_step(self, step: tuple, src, dst) -> any:
+        """
+        Run a single pass.
+
+        Parameters:
+            step (tuple): The compiled pass.
+            src (ndarray): The input of the pass.
+            dst (ndarray): The buffer to write the output to.
+
+        Returns:
+            any: The output of the pass.
+        """
+
+        kind, constant, params = step
+
+        if kind == "lut": return cv2.LUT(src, constant, dst=dst)
+        if kind == "negative": return cv2.bitwise_not(src, dst=dst)
+        if kind == "sepia": return cv2.transform(src, constant, dst=dst)
+        if kind == "emboss": return cv2.filter2D(src, -1, constant, dst=dst)
+        if kind == "gray": return cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=dst)
+        return cv2.Canny(src, params.get("threshold1", 100), params.get("threshold2", 200), edges=dst)
+
+    def apply(self, frame, dst=None) -> any:
+        """
+        Apply the chain to a frame.
+
+        Parameters:
+            frame (any): The input frame.
+            dst (ndarray, optional): The buffer to write the result to. Default is a buffer owned by the chain,
+                which is overwritten by the next call.
+
+        Returns:
+            any: The processed frame.
+        """
+
+        if not self.steps:
+            if dst is None: return frame.copy()
+            np.copyto(dst, frame)
+            return dst
+
+        current = frame
+        last = len(self.steps) - 1
+
+        for index, step in enumerate(self.steps):
+            shape = self.output_shape(current.shape, step[0])
+
+            if index == last and dst is not None: out = dst
+            else:
+                key = (index, shape)
+                if key not in self.buffers: self.buffers[key] = np.empty(shape, dtype=np.uint8)
+                out = self.buffers[key]
+
+            current = self.run_step(step, current, out)
+
+        return current
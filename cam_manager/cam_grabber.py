@@ -0,0 +1,110 @@
+import time
+
+import cv2
+import mss
+import numpy as np
+
+class ScreenGrabber:
+    """
+    A long-lived screen grabber for a fake cam window, reusing its mss context and output buffer.
+
+    The window geometry is cached and only re-read every rect_interval seconds; buffers are reallocated only
+    when the window actually changed size. Grabbing must happen on the thread that created the grabber.
+
+    Attributes:
+        window (any): The window being grabbed (a pygetwindow window or an Xlib window).
+        output (str): The output format, 'bgr' for a converted frame or 'bgra' for the raw grab without a copy.
+        rect_interval (float): The time in seconds between window geometry checks.
+        monitor (dict): The cached region of the screen covered by the window.
+        buffer (ndarray or None): The reusable BGR output buffer.
+    """
+
+    def __init__(self, window, output: str = "bgr", rect_interval: float = 0.25) -> None:
+        """
+        Initialize the ScreenGrabber class.
+
+        Parameters:
+            window (any): The window to grab.
+            output (str, optional): The output format, 'bgr' or 'bgra'. Default is 'bgr'.
+            rect_interval (float, optional): The time in seconds between window geometry checks. Default is 0.25.
+        """
+
+        if output not in ("bgr", "bgra"): raise Exception(f"Invalid grab output format [{output}].")
+
+        self.window = window
+        self.output = output
+        self.rect_interval = rect_interval
+
+        self.sct = mss.mss()
+        self.monitor = None
+        self.buffer = None
+        self.rect_time = 0.0
+
+        self.refresh_rect(force=True)
+
+    def get_window_rect(self) -> dict:
+        """
+        Read the current geometry of the window.
+
+        Returns:
+            dict: The region of the screen covered by the window, in mss monitor format.
+        """
+
+        window = self.window
+
+        if hasattr(window, "get_geometry"):
+            geometry = window.get_geometry()
+            origin = geometry.root.translate_coords(window, 0, 0)
+            return {"top": origin.y, "left": origin.x, "width": geometry.width, "height": geometry.height}
+
+        return {"top": window.top, "left": window.left, "width": window.width, "height": window.height}
+
+    def refresh_rect(self, force: bool = False) -> bool:
+        """
+        Re-read the window geometry if the refresh interval has passed.
+
+        Parameters:
+            force (bool, optional): Whether to re-read the geometry regardless of the interval. Default is False.
+
+        Returns:
+            bool: True if the window moved or was resized.
+        """
+
+        now = time.monotonic()
+        if not force and now - self.rect_time < self.rect_interval: return False
+        self.rect_time = now
+
+        monitor = self.get_window_rect()
+        if monitor == self.monitor: return False
+
+        if self.monitor is None or (monitor["width"], monitor["height"]) != (self.monitor["width"], self.monitor["height"]):
+            self.buffer = None
+        self.monitor = monitor
+        return True
+
+    def grab(self) -> any:
+        """
+        Grab the current content of the window.
+
+        The returned array is reused by the next grab in 'bgr' mode, copy it if it must outlive the next call.
+
+        Returns:
+            any: The grabbed frame, in BGR or BGRA depending on the output format.
+        """
+
+        self.refresh_rect()
+
+        shot = self.sct.grab(self.monitor)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        if self.output == "bgra": return bgra
+
+        if self.buffer is None or self.buffer.shape[:2] != bgra.shape[:2]:
+            self.buffer = np.empty((shot.height, shot.width, 3), dtype=np.uint8)
+
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self.buffer)
+
+    def close(self) -> None:
+        """Close the underlying mss context."""
+
+        self.sct.close()
+        self.buffer = None
@@ -0,0 +1,36 @@
+import importlib
+
+class LazyModule:
+    """
+    A stand-in for a module that is only imported when one of its attributes is first used.
+
+    Attributes are cached on the stand-in after their first lookup, so later accesses cost a plain attribute read.
+
+    Attributes:
+        module_name (str): The name of the module to import.
+    """
+
+    def __init__(self, module_name: str) -> None:
+        """
+        Initialize the LazyModule class.
+
+        Parameters:
+            module_name (str): The name of the module to import.
+        """
+
+        self.module_name = module_name
+
+    def __getattr__(self, attr: str) -> any:
+        """
+        Import the module if needed and get one of its attributes.
+
+        Parameters:
+            attr (str): The name of the attribute.
+
+        Returns:
+            any: The attribute of the module.
+        """
+
+        value = getattr(importlib.import_module(self.module_name), attr)
+        setattr(self, attr, value)
+        return value
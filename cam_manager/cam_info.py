@@ -1,8 +1,11 @@
 import platform
+from concurrent.futures import ThreadPoolExecutor
 
-import cv2
-if platform.system() == "Windows":import pygetwindow as gw
-if platform.system() == "Linux": from Xlib import X, display
+from cam_manager.cam_imports import LazyModule
+from cam_manager.cam_devices import CamDiscovery
+
+cv2 = LazyModule("cv2")
+gw = LazyModule("pygetwindow")
 
 class CamInfoMixin:
     """
@@ -12,6 +15,9 @@ class CamInfoMixin:
         user_os (str): The operating system of the user ('Linux' or 'Windows').
         active_cam_id (int or None): The ID of the currently active camera.
         cams (dict): A dictionary to store opened camera objects.
+        cam_discovery (CamDiscovery): The cached V4L2 cam discovery used on Linux.
+        window_index (WindowIndex or None): The X11 window index used on Linux, created on first use.
+        telemetry (Telemetry): The latency histograms and counters of get_frame, capture_image, the effects and the AI modes.
     """
 
     def __init__(self):
@@ -22,32 +28,72 @@ class CamInfoMixin:
         if platform.system() == "Windows":
             self.user_os = "Windows"
 
-    def get_available_cams(self, capture_method=cv2.CAP_DSHOW) -> list:
+        self.cam_discovery = CamDiscovery()
+        self.window_index = None
+
+    def get_available_cams(self, capture_method=None, max_index: int = 10, refresh: bool = False) -> list:
         """
         Get all available cam devices.
 
+        On Linux the /dev/video* nodes are queried directly and cached until a device is added or removed.
+        Elsewhere every index up to max_index is opened in parallel, so cams after a missing index are found too.
+
         Parameters:
-            capture_method: The method used to capture the video stream. Default is cv2.CAP_DSHOW.
+            capture_method: The method used to capture the video stream. Default is cv2.CAP_DSHOW on Windows.
+            max_index (int, optional): The number of indices opened where device nodes cannot be queried. Default is 10.
+            refresh (bool, optional): Whether to query the devices again even if none was added or removed. Default is False.
 
         Returns:
             list: A list of indices of available cam devices.
         """
 
-        arr = []
-        index = 0
+        if platform.system() == "Linux" and capture_method in (None, cv2.CAP_V4L, cv2.CAP_V4L2):
+            arr = [device["index"] for device in self.get_cam_devices(refresh)]
+        else:
+            if capture_method is None: capture_method = cv2.CAP_DSHOW if platform.system() == "Windows" else cv2.CAP_ANY
 
-        while True:
-            cap = cv2.VideoCapture(index, capture_method)
-            if not cap.isOpened():
-                break
+            def is_available(index):
+                cap = cv2.VideoCapture(index, capture_method)
+                available = cap.isOpened()
+                cap.release()
+                return available
 
-            arr.append(index)
-            cap.release()
-            index += 1
+            with ThreadPoolExecutor(max_index, thread_name_prefix="CamProbe") as pool:
+                arr = [index for index, available in zip(range(max_index), pool.map(is_available, range(max_index))) if available]
 
         if not arr: print("No cams available.")
         return arr
 
+    def get_cam_devices(self, refresh: bool = False) -> list:
+        """
+        Get the cam devices with their names and supported formats (Linux only).
+
+        Parameters:
+            refresh (bool, optional): Whether to query the devices again even if none was added or removed. Default is False.
+
+        Returns:
+            list: The capture devices sorted by index, each a dict with 'index', 'path', 'name', 'driver', 'card',
+                  'bus_info' and 'formats' (a list of dicts with 'fourcc' and 'description') keys.
+        """
+
+        return self.cam_discovery.discover(refresh)
+
+    def get_window_index(self) -> any:
+        """
+        Get the X11 window index, connecting to the display and starting its listener on first use (Linux only).
+
+        Returns:
+            any: The WindowIndex.
+        """
+
+        if self.window_index is None:
+            from cam_manager.cam_windows import WindowIndex
+
+            self.window_index = WindowIndex()
+            self.window_index.start()
+
+        return self.window_index
+
     def get_all_window_titles(self) -> list:
         """
         Get titles of all open windows.
@@ -58,13 +104,7 @@ class CamInfoMixin:
 
         titles = []
         if self.user_os == "Linux":
-            d = display.Display()
-            root = d.screen().root
-            window_ids = root.get_full_property(d.intern_atom('_NET_CLIENT_LIST'), X.AnyPropertyType).value
-
-            for window_id in window_ids:
-                window = d.create_resource_object('window', window_id)
-                titles.append(window.get_wm_name())
+            titles = self.get_window_index().get_titles()
         if self.user_os == "Windows":
             for window in gw.getAllWindows():
                 titles.append(window.title)
@@ -84,14 +124,7 @@ class CamInfoMixin:
         """
 
         if self.user_os == "Linux":
-            d = display.Display()
-            root = d.screen().root
-            window_ids = root.get_full_property(d.intern_atom('_NET_CLIENT_LIST'), X.AnyPropertyType).value
-
-            for window_id in window_ids:
-                window = d.create_resource_object('window', window_id)
-                if window.get_wm_name() == title: return window
-            return None
+            return self.get_window_index().find(title)
         if self.user_os == "Windows":
             return gw.getWindowsWithTitle(title)
 
@@ -130,3 +163,38 @@ class CamInfoMixin:
         if not self.fake_cams:
             print("No fake cams added.")
         return list(self.fake_cams.keys())
+
+    def get_telemetry(self) -> dict:
+        """
+        Get the performance counters of the manager.
+
+        Returns:
+            dict: The count, errors, calls per second and mean, p50, p99 and max latency in milliseconds of every
+                instrumented operation keyed by cam, AI mode or effect, plus the failed reads of the threaded readers,
+                the frames dropped by the recorders and the captures dropped by the encoder queue.
+        """
+
+        stats = self.telemetry.get_stats()
+        stats["failed_reads"] = {cam_id: reader.failed_reads for cam_id, reader in self.readers.items()}
+        stats["recording_drops"] = {key: recorder.dropped for key, recorder in self.recorders.items()}
+        stats["dropped_captures"] = self.dropped_captures
+
+        return stats
+
+    def export_telemetry(self, prefix: str = "cam_manager") -> str:
+        """
+        Export the performance counters of the manager in the Prometheus text exposition format.
+
+        Parameters:
+            prefix (str, optional): The prefix of the metric names. Default is 'cam_manager'.
+
+        Returns:
+            str: The metrics, ready to be served on a /metrics endpoint.
+        """
+
+        counters = {
+            "failed_reads": {cam_id: reader.failed_reads for cam_id, reader in self.readers.items()},
+            "recording_drops": {key: recorder.dropped for key, recorder in self.recorders.items()},
+            "dropped_captures": {"all": self.dropped_captures} }
+
+        return self.telemetry.to_prometheus(prefix, counters)
@@ -1,12 +1,19 @@
+import threading
+
 from cam_manager.cam_info import CamInfoMixin
 from cam_manager.cam_control import CamControlMixin
 from cam_manager.cam_effects import CamEffectsMixin
 from cam_manager.cam_settings import CamSettingsMixin
+from cam_manager.cam_recording import CamRecordingMixin
+from cam_manager.cam_streaming import CamStreamingMixin
+from cam_manager.cam_telemetry import Telemetry
 
-class CamManager(CamInfoMixin, CamControlMixin, CamEffectsMixin, CamSettingsMixin):
-    """A comprehensive class for managing cameras, including AI-based features, control, effects, and settings."""
+class CamManager(CamInfoMixin, CamControlMixin, CamEffectsMixin, CamSettingsMixin, CamRecordingMixin, CamStreamingMixin):
+    """A comprehensive class for managing cameras, including AI-based features, control, effects, settings, recording and streaming."""
 
-    def __init__(self, is_ai=False, ai_mode="detection", load_settings=False):
+    def __init__(self, is_ai=False, ai_mode="detection", load_settings=False, threaded_capture=False, ai_options=None, frame_pool_size=4,
+        process_capture=False, ai_process=False, encoder_workers=2, encoder_queue_size=8,
+        settings_file="cam_settings.json", telemetry=True):
         """
         Initialize the CamManager class.
 
@@ -14,6 +21,15 @@ class CamManager(CamInfoMixin, CamControlMixin, CamEffectsMixin, CamSettingsMixi
             is_ai (bool, optional): Whether to enable AI features. Default is False.
             ai_mode (str, optional): The AI mode to use ('detection', 'segmentation', 'classify', 'pose').
             load_settings (bool, optional): Whether to load camera settings from a file. Default is False.
+            threaded_capture (bool, optional): Whether to read each cam on a background thread keeping only the newest frame. Default is False.
+            ai_options (dict, optional): Extra keyword arguments for CamAIMixin, such as draw. Default is None.
+            frame_pool_size (int, optional): The number of buffers kept per cam for borrow_frame. Default is 4.
+            process_capture (bool, optional): Whether to read each cam in its own worker process through shared memory. Default is False.
+            ai_process (bool, optional): Whether to run AI processing in a worker process through shared memory. Default is False.
+            encoder_workers (int, optional): The number of threads saving captured images. Default is 2.
+            encoder_queue_size (int, optional): The number of images that can wait to be saved before captures are dropped. Default is 8.
+            settings_file (str, optional): The settings store shared by all cams. Default is 'cam_settings.json'.
+            telemetry (bool, optional): Whether to record per-cam latency histograms and counters. Default is True.
         """
 
         possible_ai_modes = ["detection", "segmentation", "classify", "pose"]
@@ -26,10 +42,36 @@ class CamManager(CamInfoMixin, CamControlMixin, CamEffectsMixin, CamSettingsMixi
 
         self.cams = {}
         self.fake_cams = {}
+        self.grabbers = {}
         self.active_cam_id = None
         self.load_settings = load_settings
+        self.settings_file = settings_file
+        self.settings_stats = {}
+        self.threaded_capture = threaded_capture
+        self.readers = {}
+        self.retrieve_pool = None
+        self.effect_chains = {}
+        self.effect_lock = threading.Lock()
+        self.frame_pools = {}
+        self.frame_pool_size = frame_pool_size
+        self.process_capture = process_capture
+        self.recorders = {}
+        self.encoder_pool = None
+        self.encoder_lock = threading.Lock()
+        self.encoder_workers = encoder_workers
+        self.encoder_queue_size = encoder_queue_size
+        self.pending_encodes = 0
+        self.dropped_captures = 0
+        self.telemetry = Telemetry(telemetry)
+        self.streams = {}
+        self.stream_server = None
 
-        if is_ai:
+        if is_ai and ai_process:
+            from cam_manager.cam_workers import InferenceWorker
+            self.ai = InferenceWorker(ai_mode, ai_options)
+        elif is_ai:
             from cam_manager.cam_ai import CamAIMixin
-            self.ai = CamAIMixin(ai_mode)
+            self.ai = CamAIMixin(ai_mode, **(ai_options or {}))
         else: self.ai = None
+
+        if self.ai is not None: self.ai.telemetry = self.telemetry
@@ -0,0 +1,181 @@
+import time
+import threading
+
+import numpy as np
+
+class RegisteredModel:
+    """
+    A model shared through the model registry, along with its timing information.
+
+    Attributes:
+        model (YOLO): The loaded model.
+        lock (threading.Lock): The lock serializing calls to the model, which is not thread-safe.
+        load_time (float): The time in seconds taken to load the model.
+        warmup_time (float or None): The time in seconds taken by the last warm-up.
+        first_inference_time (float or None): The time in seconds taken by the first inference after loading.
+        last_used (float): The time.monotonic() value at which the model was last used.
+    """
+
+    def __init__(self, model, load_time: float) -> None:
+        """
+        Initialize the RegisteredModel class.
+
+        Parameters:
+            model (YOLO): The loaded model.
+            load_time (float): The time in seconds taken to load the model.
+        """
+
+        self.model = model
+        self.lock = threading.Lock()
+        self.load_time = load_time
+        self.warmup_time = None
+        self.first_inference_time = None
+        self.last_used = time.monotonic()
+
+class ModelRegistry:
+    """
+    A process-wide registry sharing YOLO models by weights, device and precision.
+
+    Models are loaded on first use, so several CamAIMixin instances of the same mode hold a single copy of the weights.
+
+    Attributes:
+        models (dict): The registered models keyed by (weights, device, precision).
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ModelRegistry class."""
+
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def get(self, weights: str, device: str = None, precision: str = "fp32") -> RegisteredModel:
+        """
+        Get a registered model, loading it if needed.
+
+        Parameters:
+            weights (str): The weights file of the model.
+            device (str, optional): The device to run the model on, such as 'cpu' or 'cuda:0'. Default is automatic.
+            precision (str, optional): The precision to run the model at, 'fp32' or 'fp16'. Default is 'fp32'.
+
+        Returns:
+            RegisteredModel: The registered model.
+        """
+
+        key = (weights, device, precision)
+
+        with self.lock:
+            entry = self.models.get(key)
+
+            if entry is None:
+                from ultralytics import YOLO
+
+                start = time.perf_counter()
+                model = YOLO(weights)
+                if device is not None: model.to(device)
+
+                entry = RegisteredModel(model, time.perf_counter() - start)
+                self.models[key] = entry
+                print(f"Model [{weights}] loaded in {entry.load_time * 1000:.1f} ms.")
+
+            entry.last_used = time.monotonic()
+            return entry
+
+    def predict(self, source, weights: str, device: str = None, precision: str = "fp32", **kwargs) -> list:
+        """
+        Run a registered model on one or several frames.
+
+        Parameters:
+            source (any): The frame or list of frames.
+            weights (str): The weights file of the model.
+            device (str, optional): The device to run the model on. Default is automatic.
+            precision (str, optional): The precision to run the model at, 'fp32' or 'fp16'. Default is 'fp32'.
+            **kwargs: Extra arguments passed to the model call.
+
+        Returns:
+            list: The model results, one per frame.
+        """
+
+        entry = self.get(weights, device, precision)
+        if precision == "fp16": kwargs["half"] = True
+
+        with entry.lock:
+            start = time.perf_counter()
+            results = entry.model(source, stream=False, device=device, verbose=False, **kwargs)
+            if entry.first_inference_time is None: entry.first_inference_time = time.perf_counter() - start
+
+            entry.last_used = time.monotonic()
+            return results
+
+    def warmup(self, weights: str, device: str = None, precision: str = "fp32", shape: tuple = (480, 640, 3), runs: int = 2) -> float:
+        """
+        Run a registered model on dummy frames so later frames do not pay the graph warm-up cost.
+
+        Parameters:
+            weights (str): The weights file of the model.
+            device (str, optional): The device to run the model on. Default is automatic.
+            precision (str, optional): The precision to run the model at, 'fp32' or 'fp16'. Default is 'fp32'.
+            shape (tuple, optional): The shape of the dummy frames. Default is (480, 640, 3).
+            runs (int, optional): The number of dummy inferences. Default is 2.
+
+        Returns:
+            float: The warm-up time in seconds.
+        """
+
+        dummy = np.zeros(shape, dtype=np.uint8)
+
+        start = time.perf_counter()
+        for _ in range(runs): self.predict(dummy, weights, device, precision)
+
+        entry = self.get(weights, device, precision)
+        entry.warmup_time = time.perf_counter() - start
+        print(f"Model [{weights}] warmed up in {entry.warmup_time * 1000:.1f} ms.")
+
+        return entry.warmup_time
+
+    def evict_idle(self, max_idle: float) -> list:
+        """
+        Unload the models that have not been used for a given time.
+
+        Parameters:
+            max_idle (float): The idle time in seconds after which a model is unloaded.
+
+        Returns:
+            list: The keys of the unloaded models.
+        """
+
+        now = time.monotonic()
+
+        with self.lock:
+            evicted = [key for key, entry in self.models.items() if now - entry.last_used > max_idle]
+            for key in evicted: del self.models[key]
+
+        for key in evicted: print(f"Model [{key[0]}] evicted after being idle.")
+        return evicted
+
+    def clear(self) -> None:
+        """Unload all models."""
+
+        with self.lock:
+            self.models.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get the load, warm-up and first inference latency of every registered model.
+
+        Returns:
+            dict: The timings in milliseconds and the idle time in seconds, keyed by (weights, device, precision).
+        """
+
+        now = time.monotonic()
+
+        def to_ms(seconds):
+            return None if seconds is None else seconds * 1000
+
+        with self.lock:
+            return {key: {
+                "load_ms": to_ms(entry.load_time),
+                "warmup_ms": to_ms(entry.warmup_time),
+                "first_inference_ms": to_ms(entry.first_inference_time),
+                "idle_s": now - entry.last_used } for key, entry in self.models.items()}
+
+model_registry = ModelRegistry()
@@ -0,0 +1,145 @@
+import cv2
+
+class MotionGate:
+    """
+    A gate in front of CamAIMixin that skips AI processing while the scene is static.
+
+    A cheap change score is computed on a downscaled grayscale copy of each frame. Below the threshold the AI data of the
+    last processed frame is reused; a refresh is forced after refresh_interval skipped frames. Use one gate per cam.
+
+    Attributes:
+        ai (CamAIMixin): The AI processor being gated.
+        method (str): The change detection method, 'diff' for differencing against the last processed frame
+            or 'background' for MOG2 background subtraction.
+        threshold (float): The fraction of changed pixels at or above which the frame is processed.
+        refresh_interval (int): The number of consecutive skipped frames after which a frame is always processed.
+        scale_width (int): The width of the downscaled frame used for the change score.
+        pixel_threshold (int): The gray level difference at which a pixel counts as changed with the 'diff' method.
+        processed (int): The number of frames passed to the AI processor.
+        skipped (int): The number of frames that reused the last AI data.
+        last_score (float or None): The change score of the last frame.
+    """
+
+    def __init__(self, ai, method: str = "diff", threshold: float = 0.01, refresh_interval: int = 30, scale_width: int = 160, pixel_threshold: int = 25) -> None:
+        """
+        Initialize the MotionGate class.
+
+        Parameters:
+            ai (CamAIMixin): The AI processor to gate.
+            method (str, optional): The change detection method, 'diff' or 'background'. Default is 'diff'.
+            threshold (float, optional): The fraction of changed pixels that triggers processing. Default is 0.01.
+            refresh_interval (int, optional): The consecutive skipped frames after which to force processing. Default is 30.
+            scale_width (int, optional): The width of the downscaled frame used for the change score. Default is 160.
+            pixel_threshold (int, optional): The gray level difference of a changed pixel with 'diff'. Default is 25.
+        """
+
+        if method not in ("diff", "background"): raise Exception(f"Invalid motion gate method [{method}].")
+
+        self.ai = ai
+        self.method = method
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.scale_width = scale_width
+        self.pixel_threshold = pixel_threshold
+
+        self.processed = 0
+        self.skipped = 0
+        self.last_score = None
+
+        self.reference = None
+        self.last_ai_data = None
+        self.since_refresh = 0
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False) if method == "background" else None
+
+    def downscale(self, frame) -> any:
+        """
+        Produce the small grayscale frame used for the change score.
+
+        Parameters:
+            frame (ndarray): The input frame.
+
+        Returns:
+            any: The downscaled grayscale frame.
+        """
+
+        height, width = frame.shape[:2]
+        size = (self.scale_width, max(1, round(height * self.scale_width / width)))
+
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3: small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        return small
+
+    def change_score(self, small) -> float:
+        """
+        Compute the fraction of changed pixels of a downscaled frame.
+
+        Parameters:
+            small (ndarray): The downscaled grayscale frame.
+
+        Returns:
+            float: The fraction of changed pixels, 1.0 if there is nothing to compare against yet.
+        """
+
+        if self.method == "background":
+            foreground = self.subtractor.apply(small)
+            return cv2.countNonZero(foreground) / foreground.size
+
+        if self.reference is None or self.reference.shape != small.shape: return 1.0
+
+        diff = cv2.absdiff(small, self.reference)
+        _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(changed) / changed.size
+
+    def add_ai_to_frame(self, frame) -> tuple:
+        """
+        Add AI processing to the frame, or reuse the last AI data if the scene has not changed.
+
+        Parameters:
+            frame (ndarray): The input frame for processing.
+
+        Returns:
+            tuple: The processed frame and AI data.
+        """
+
+        small = self.downscale(frame)
+        self.last_score = self.change_score(small)
+
+        if self.last_ai_data is not None and self.last_score < self.threshold and self.since_refresh < self.refresh_interval:
+            self.skipped += 1
+            self.since_refresh += 1
+
+            if self.ai.draw: self.ai.draw_ai_data(frame, self.last_ai_data)
+            return frame, self.last_ai_data.copy()
+
+        frame, ai_data = self.ai.add_ai_to_frame(frame)
+
+        self.processed += 1
+        self.since_refresh = 0
+        self.reference = small
+        self.last_ai_data = ai_data
+
+        return frame, ai_data.copy()
+
+    def reset(self) -> None:
+        """Forget the reference frame and the last AI data, so the next frame is always processed."""
+
+        self.reference = None
+        self.last_ai_data = None
+        self.since_refresh = 0
+
+    def get_stats(self) -> dict:
+        """
+        Get the gate counters.
+
+        Returns:
+            dict: The processed and skipped frame counts, the fraction of frames skipped and the last change score.
+        """
+
+        total = self.processed + self.skipped
+
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+            "last_score": self.last_score }
@@ -0,0 +1,211 @@
+import os
+import math
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+worker_ai = None
+
+def init_offline_worker(mode: str, ai_options: dict, threads: int) -> None:
+    """
+    Create the AI processor of an offline worker process.
+
+    Parameters:
+        mode (str): The AI mode.
+        ai_options (dict): Extra keyword arguments for CamAIMixin.
+        threads (int): The number of threads torch and OpenCV may use in the process.
+    """
+
+    global worker_ai
+
+    import torch
+    from cam_manager.cam_ai import CamAIMixin
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+    worker_ai = CamAIMixin(mode, **ai_options)
+
+def process_chunk(path: str, index: int, start: int, end: int, batch_size: int) -> tuple:
+    """
+    Decode a chunk of a video file and run the AI processor of the worker on its frames.
+
+    Parameters:
+        path (str): The path of the video file.
+        index (int): The index of the chunk.
+        start (int): The first frame of the chunk, a keyframe.
+        end (int): The frame after the last frame of the chunk, or None for the end of the file.
+        batch_size (int): The number of frames per model call.
+
+    Returns:
+        tuple: The chunk index, the AI data of each frame and the number of frames decoded.
+    """
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened(): raise Exception(f"Failed to open video [{path}].")
+    if start: cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    worker_ai.frame_index = start
+    ai_data = []
+    batch = []
+    position = start
+
+    while end is None or position < end:
+        ret, frame = cap.read()
+        if not ret: break
+
+        batch.append(frame)
+        position += 1
+
+        if len(batch) >= batch_size:
+            ai_data.extend(data for _, data in (worker_ai.add_ai_to_frames(batch) if batch_size > 1 else [worker_ai.add_ai_to_frame(batch[0])]))
+            batch = []
+
+    if batch: ai_data.extend(data for _, data in worker_ai.add_ai_to_frames(batch))
+
+    cap.release()
+    return index, ai_data, position - start
+
+class VideoBatchProcessor:
+    """
+    Offline AI processing of a video file, split into keyframe-aligned chunks decoded and processed in parallel processes.
+
+    Keyframes are found by reading the undecoded packets of the file, so every chunk starts on a keyframe and each
+    worker can seek to it and decode its chunk independently. Results are merged back in frame order.
+
+    Attributes:
+        path (str): The path of the video file.
+        mode (str): The AI mode.
+        ai_options (dict): Extra keyword arguments for the CamAIMixin of each worker.
+        workers (int): The number of worker processes.
+        chunk_frames (int or None): The minimum number of frames per chunk, or None for about four chunks per worker.
+        batch_size (int): The number of frames per model call.
+        fps (float): The frame rate of the video file.
+        keyframes (list or None): The indices of the keyframes, once scanned.
+        frame_count (int): The number of frames of the video file.
+    """
+
+    def __init__(self, path: str, mode: str = "detection", ai_options: dict = None, workers: int = None, chunk_frames: int = None,
+        batch_size: int = 1, start_method: str = "spawn") -> None:
+        """
+        Initialize the VideoBatchProcessor class.
+
+        Parameters:
+            path (str): The path of the video file.
+            mode (str, optional): The AI mode ('detection', 'segmentation', 'classify', 'pose'). Default is 'detection'.
+            ai_options (dict, optional): Extra keyword arguments for CamAIMixin. Default is no drawing.
+            workers (int, optional): The number of worker processes. Default is the number of CPUs.
+            chunk_frames (int, optional): The minimum number of frames per chunk. Default is about four chunks per worker.
+            batch_size (int, optional): The number of frames per model call. Default is 1.
+            start_method (str, optional): The multiprocessing start method of the workers. Default is 'spawn'.
+        """
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened(): raise Exception(f"Failed to open video [{path}].")
+
+        self.path = path
+        self.mode = mode
+        self.ai_options = {"draw": False, **(ai_options or {})}
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_frames = chunk_frames
+        self.batch_size = batch_size
+        self.start_method = start_method
+
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.keyframes = None
+        cap.release()
+
+    def scan_keyframes(self) -> list:
+        """
+        Find the keyframes and count the frames by reading the packets of the file without decoding them.
+
+        Returns:
+            list: The indices of the keyframes, or [0] if the backend cannot report keyframes.
+        """
+
+        cap = cv2.VideoCapture(self.path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        keyframes = []
+        count = 0
+
+        if cap.isOpened():
+            while cap.grab():
+                if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME) > 0: keyframes.append(count)
+                count += 1
+        cap.release()
+
+        if count: self.frame_count = count
+        if not keyframes or keyframes[0] != 0: keyframes.insert(0, 0)
+        self.keyframes = keyframes
+
+        return keyframes
+
+    def plan_chunks(self) -> list:
+        """
+        Group the frames into chunks starting on keyframes.
+
+        Without keyframe information the frames are split evenly, and workers rely on the backend seeking accurately.
+
+        Returns:
+            list: The (start, end) frame ranges of the chunks, the last end being None for the end of the file.
+        """
+
+        if self.keyframes is None: self.scan_keyframes()
+
+        chunk_frames = self.chunk_frames or max(math.ceil(self.frame_count / (self.workers * 4)), 1)
+        starts = self.keyframes if len(self.keyframes) > 1 else list(range(0, max(self.frame_count, 1), chunk_frames))
+
+        boundaries = [0]
+        for keyframe in starts:
+            if keyframe - boundaries[-1] >= chunk_frames: boundaries.append(keyframe)
+
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:] + [None])]
+
+    def run(self, progress=None) -> dict:
+        """
+        Process the whole video file and merge the results in frame order.
+
+        Parameters:
+            progress (callable, optional): A function called with (frames done, frame count) after each chunk. Default is None.
+
+        Returns:
+            dict: The AI data of each frame in order (an AIResults with the columnar result format), the frames processed,
+                the chunks, the elapsed and video durations in seconds, the frames per second and the speedup over realtime.
+        """
+
+        start_time = time.perf_counter()
+        chunks = self.plan_chunks()
+        workers = min(self.workers, len(chunks))
+        threads = max((os.cpu_count() or 1) // workers, 1)
+
+        chunk_results = [None] * len(chunks)
+        frames = 0
+
+        with ProcessPoolExecutor(workers, mp.get_context(self.start_method), init_offline_worker, (self.mode, self.ai_options, threads)) as pool:
+            futures = [pool.submit(process_chunk, self.path, index, start, end, self.batch_size) for index, (start, end) in enumerate(chunks)]
+
+            for future in futures:
+                index, ai_data, count = future.result()
+                chunk_results[index] = ai_data
+                frames += count
+                if progress is not None: progress(frames, self.frame_count)
+
+        ai_data = [data for chunk in chunk_results for data in chunk]
+        if self.ai_options.get("result_format") == "columnar":
+            from cam_manager.cam_results import AIResults
+            ai_data = AIResults.concatenate(ai_data, self.mode)
+
+        elapsed = time.perf_counter() - start_time
+        video_seconds = frames / self.fps
+        print(f"Processed [{frames}] frames of [{self.path}] in {elapsed:.1f} s, {video_seconds / elapsed:.2f}x realtime.")
+
+        return {
+            "ai_data": ai_data,
+            "frames": frames,
+            "chunks": len(chunks),
+            "workers": workers,
+            "elapsed": elapsed,
+            "video_seconds": video_seconds,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            "speedup": video_seconds / elapsed if elapsed > 0 else 0.0 }
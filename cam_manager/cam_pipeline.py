@@ -0,0 +1,318 @@
+import time
+import queue
+import threading
+from collections import deque
+
+class BoundedQueue:
+    """
+    A bounded queue between pipeline stages with a configurable overflow policy.
+
+    Attributes:
+        maxsize (int): The maximum number of items held.
+        policy (str): 'drop_oldest' to discard the oldest item when full, or 'block' to wait for space.
+        dropped (int): The number of items discarded because the queue was full.
+    """
+
+    def __init__(self, maxsize: int = 2, policy: str = "drop_oldest") -> None:
+        """
+        Initialize the BoundedQueue class.
+
+        Parameters:
+            maxsize (int, optional): The maximum number of items held. Default is 2.
+            policy (str, optional): The overflow policy, 'drop_oldest' or 'block'. Default is 'drop_oldest'.
+        """
+
+        if policy not in ("drop_oldest", "block"): raise Exception(f"Invalid queue policy [{policy}].")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.queue = queue.Queue(maxsize)
+        self.lock = threading.Lock()
+
+    def put(self, item, timeout: float = 0.1) -> bool:
+        """
+        Add an item, dropping the oldest one or waiting depending on the policy.
+
+        Parameters:
+            item (any): The item to add.
+            timeout (float, optional): The time to wait for space with the 'block' policy. Default is 0.1.
+
+        Returns:
+            bool: True if the item was added, False if the wait timed out.
+        """
+
+        if self.policy == "block":
+            try: self.queue.put(item, timeout=timeout)
+            except queue.Full: return False
+            return True
+
+        with self.lock:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty: pass
+
+    def get(self, timeout: float = 0.1) -> any:
+        """
+        Remove and return the oldest item.
+
+        Parameters:
+            timeout (float, optional): The time to wait for an item. Default is 0.1.
+
+        Returns:
+            any: The item, or None if the wait timed out.
+        """
+
+        try: return self.queue.get(timeout=timeout)
+        except queue.Empty: return None
+
+    def qsize(self) -> int:
+        """
+        Get the number of items held.
+
+        Returns:
+            int: The number of items held.
+        """
+
+        return self.queue.qsize()
+
+class StageStats:
+    """
+    Latency and throughput counters of a single pipeline stage.
+
+    Attributes:
+        name (str): The name of the stage.
+        count (int): The number of items processed.
+        latencies (deque): The most recent processing latencies in seconds.
+        start_time (float or None): The time.monotonic() value at which the stage started.
+    """
+
+    def __init__(self, name: str, window: int = 1000) -> None:
+        """
+        Initialize the StageStats class.
+
+        Parameters:
+            name (str): The name of the stage.
+            window (int, optional): The number of recent latencies kept. Default is 1000.
+        """
+
+        self.name = name
+        self.count = 0
+        self.latencies = deque(maxlen=window)
+        self.start_time = None
+
+    def record(self, latency: float) -> None:
+        """
+        Record one processed item.
+
+        Parameters:
+            latency (float): The processing latency in seconds.
+        """
+
+        self.count += 1
+        self.latencies.append(latency)
+
+    def summary(self) -> dict:
+        """
+        Summarize the counters.
+
+        Returns:
+            dict: The item count, the throughput in items per second and the mean, p50 and max latency in milliseconds.
+        """
+
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+        latencies = sorted(self.latencies)
+
+        return {
+            "count": self.count,
+            "fps": self.count / elapsed if elapsed > 0 else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0 }
+
+class CamPipeline:
+    """
+    A pipeline running capture, inference and output of a cam on separate worker threads.
+
+    Stages are connected by bounded queues, so the output rate is set by the slowest stage rather than the sum of all stages.
+    Each item passed between stages is a dict with 'seq', 'timestamp', 'frame' and 'ai_data' keys.
+
+    Attributes:
+        manager (CamManager): The manager providing the frames and the AI processor.
+        cam_id (int or str or None): The ID of the cam to capture from.
+        fake_window_title (str or None): The title of the fake cam to capture from.
+        output (callable or None): The function called with each finished item, for annotation, display or storage.
+        queues (dict): The queues feeding the 'infer' and 'output' stages.
+        stats (dict): The StageStats of each stage, plus end-to-end latency under 'total'.
+        grabber (ScreenGrabber or None): The screen grabber of the fake cam, owned by the capture thread.
+    """
+
+    def __init__(self, manager, cam_id=None, fake_window_title: str = None, output=None, queue_size: int = 2, policy: str = "drop_oldest") -> None:
+        """
+        Initialize the CamPipeline class.
+
+        Parameters:
+            manager (CamManager): The manager providing the frames and the AI processor.
+            cam_id (int or str, optional): The ID of the cam to capture from. Default is the active cam.
+            fake_window_title (str, optional): The title of the fake cam to capture from. Default is None.
+            output (callable, optional): The function called with each finished item. Default is None.
+            queue_size (int, optional): The capacity of each queue between stages. Default is 2.
+            policy (str, optional): The overflow policy of the queues, 'drop_oldest' or 'block'. Default is 'drop_oldest'.
+        """
+
+        if cam_id is None and fake_window_title is None:
+            if manager.active_cam_id in manager.fake_cams: fake_window_title = manager.active_cam_id
+            else: cam_id = manager.active_cam_id
+
+        self.manager = manager
+        self.cam_id = cam_id
+        self.fake_window_title = fake_window_title
+        self.output = output
+
+        self.queues = {
+            "infer": BoundedQueue(queue_size, policy),
+            "output": BoundedQueue(queue_size, policy) }
+
+        self.stats = {name: StageStats(name) for name in ("capture", "infer", "output", "total")}
+
+        self.grabber = None
+        self.running = False
+        self.threads = []
+
+    def capture(self) -> dict:
+        """
+        Capture the next frame.
+
+        Fake cams are grabbed with a grabber of the capture thread, since screen grabbers are bound to the thread
+        that created them. Frames of cams read by a background thread are copied, so later stages may draw on them.
+
+        Returns:
+            dict: The new pipeline item.
+        """
+
+        if self.fake_window_title is not None:
+            if self.fake_window_title not in self.manager.fake_cams: raise Exception(f"Fake cam [{self.fake_window_title}] does not exist.")
+
+            if self.grabber is None:
+                from cam_manager.cam_grabber import ScreenGrabber
+                self.grabber = ScreenGrabber(self.manager.fake_cams[self.fake_window_title], self.manager.grabbers[self.fake_window_title].output)
+
+            frame = self.grabber.grab().copy()
+            if self.manager.recorders: self.manager.record_frame(self.fake_window_title, frame)
+            if self.manager.streams: self.manager.publish_frame(self.fake_window_title, frame)
+        else:
+            frame = self.manager.wait_for_next_frame(self.cam_id)
+            if self.cam_id in self.manager.readers: frame = frame.copy()
+
+        return {"seq": self.stats["capture"].count + 1, "timestamp": time.monotonic(), "frame": frame, "ai_data": None}
+
+    def infer(self, item: dict) -> dict:
+        """
+        Run AI processing on the frame of an item, if the manager has AI enabled.
+
+        Parameters:
+            item (dict): The pipeline item.
+
+        Returns:
+            dict: The pipeline item with its AI data filled in.
+        """
+
+        if self.manager.ai is not None:
+            item["frame"], item["ai_data"] = self.manager.ai.add_ai_to_frame(item["frame"])
+        return item
+
+    def emit(self, item: dict) -> dict:
+        """
+        Pass a finished item to the output function.
+
+        Parameters:
+            item (dict): The pipeline item.
+
+        Returns:
+            dict: The pipeline item.
+        """
+
+        if self.output is not None: self.output(item)
+        return item
+
+    def run_stage(self, name: str, func, in_queue: BoundedQueue = None, out_queue: BoundedQueue = None) -> None:
+        """
+        Run a stage until the pipeline stops.
+
+        Parameters:
+            name (str): The name of the stage.
+            func (callable): The stage function, taking an item (or nothing for the first stage) and returning an item.
+            in_queue (BoundedQueue, optional): The queue to take items from. Default is None.
+            out_queue (BoundedQueue, optional): The queue to put items into. Default is None.
+        """
+
+        stats = self.stats[name]
+        stats.start_time = time.monotonic()
+
+        while self.running:
+            if in_queue is not None:
+                item = in_queue.get()
+                if item is None: continue
+
+            start = time.monotonic()
+            try: item = func(item) if in_queue is not None else func()
+            except Exception as e:
+                print(f"Pipeline stage [{name}] failed - {e}")
+                self.running = False
+                break
+            stats.record(time.monotonic() - start)
+
+            if out_queue is not None:
+                while self.running and not out_queue.put(item): pass
+            else: self.stats["total"].record(time.monotonic() - item["timestamp"])
+
+        if name == "capture" and self.grabber is not None:
+            self.grabber.close()
+            self.grabber = None
+
+    def start(self) -> None:
+        """Start the stage threads."""
+
+        if self.running: return
+
+        self.running = True
+        self.stats["total"].start_time = time.monotonic()
+
+        stages = [
+            ("capture", self.capture, None, self.queues["infer"]),
+            ("infer", self.infer, self.queues["infer"], self.queues["output"]),
+            ("output", self.emit, self.queues["output"], None) ]
+
+        self.threads = [threading.Thread(target=self.run_stage, args=stage, name=f"CamPipeline-{stage[0]}", daemon=True) for stage in stages]
+        for thread in self.threads: thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Stop the stage threads.
+
+        Parameters:
+            timeout (float, optional): The time to wait for each thread to exit. Default is 2.0.
+        """
+
+        self.running = False
+        for thread in self.threads: thread.join(timeout)
+        self.threads = []
+
+    def get_stats(self) -> dict:
+        """
+        Get the latency and throughput of every stage.
+
+        Returns:
+            dict: The summary of each stage and the end-to-end 'total', plus the items dropped by each queue.
+        """
+
+        stats = {name: stage.summary() for name, stage in self.stats.items()}
+        stats["dropped"] = {name: q.dropped for name, q in self.queues.items()}
+
+        return stats
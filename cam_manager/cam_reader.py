@@ -0,0 +1,125 @@
+import time
+import threading
+
+class CamReader:
+    """
+    A background reader that keeps only the newest frame of a capture object.
+
+    Attributes:
+        cap (cv2.VideoCapture): The capture object being read.
+        cam_id (int or str): The ID of the cam being read.
+        frame (ndarray or None): The newest frame read.
+        seq (int): The sequence number of the newest frame, starting at 1.
+        timestamp (float or None): The time.monotonic() value at which the newest frame was read.
+        failed_reads (int): The total number of failed reads.
+        max_failed_reads (int): The number of consecutive failed reads after which the reader stops.
+    """
+
+    def __init__(self, cap, cam_id=None, max_failed_reads: int = 30) -> None:
+        """
+        Initialize the CamReader class.
+
+        Parameters:
+            cap (cv2.VideoCapture): The capture object to read from.
+            cam_id (int or str, optional): The ID of the cam being read. Default is None.
+            max_failed_reads (int, optional): The consecutive failed reads after which to stop. Default is 30.
+        """
+
+        self.cap = cap
+        self.cam_id = cam_id
+        self.max_failed_reads = max_failed_reads
+
+        self.frame = None
+        self.seq = 0
+        self.timestamp = None
+        self.failed_reads = 0
+
+        self.running = False
+        self.thread = None
+        self.condition = threading.Condition()
+
+    def start(self) -> None:
+        """Start the reader thread."""
+
+        if self.running: return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"CamReader-{self.cam_id}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """
+        Stop the reader thread and wake up any waiting consumers.
+
+        Parameters:
+            timeout (float, optional): The time to wait for the thread to exit. Default is 1.0.
+        """
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def run(self) -> None:
+        """Read frames until stopped, keeping only the newest one."""
+
+        consecutive_failures = 0
+
+        while self.running:
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+
+            if not ret:
+                self.failed_reads += 1
+                consecutive_failures += 1
+
+                if consecutive_failures >= self.max_failed_reads:
+                    print(f"Reader for cam [{self.cam_id}] stopped after {consecutive_failures} failed reads.")
+                    break
+
+                time.sleep(0.005)
+                continue
+
+            consecutive_failures = 0
+            with self.condition:
+                self.frame = frame
+                self.seq += 1
+                self.timestamp = timestamp
+                self.condition.notify_all()
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def latest(self) -> tuple:
+        """
+        Get the newest frame without blocking.
+
+        Returns:
+            tuple: The frame, its sequence number and its timestamp. The frame is None if nothing was read yet.
+        """
+
+        with self.condition:
+            return self.frame, self.seq, self.timestamp
+
+    def wait_for_next(self, seq: int = None, timeout: float = 1.0) -> tuple:
+        """
+        Block until a frame newer than the given sequence number is available.
+
+        Parameters:
+            seq (int, optional): The sequence number to wait past. Default is the current one.
+            timeout (float, optional): The maximum time to wait in seconds. Default is 1.0.
+
+        Returns:
+            tuple: The frame, its sequence number and its timestamp, or (None, seq, None) on timeout.
+        """
+
+        with self.condition:
+            if seq is None: seq = self.seq
+
+            self.condition.wait_for(lambda: self.seq > seq or not self.running, timeout)
+            if self.seq > seq: return self.frame, self.seq, self.timestamp
+            return None, self.seq, None
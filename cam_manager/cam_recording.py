@@ -0,0 +1,356 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cam_manager.cam_imports import LazyModule
+from cam_manager.cam_pipeline import BoundedQueue
+
+cv2 = LazyModule("cv2")
+
+class VideoRecorder:
+    """
+    A recorder writing frames to video files with cv2.VideoWriter on a dedicated thread.
+
+    Frames wait in a bounded queue, so a slow disk never blocks the capture loop. When the queue is full the oldest
+    frame is dropped and counted. Recordings rotate into a new segment file every segment_seconds of video.
+
+    Attributes:
+        filename (str): The file name pattern of the segments, formatted with the segment index as 'segment'.
+        fps (float): The frame rate of the video files.
+        fourcc (str): The four character code of the video codec.
+        segment_seconds (float or None): The length of a segment in seconds of video, or None for a single file.
+        queue (BoundedQueue): The frames waiting to be written.
+        frames_written (int): The number of frames written.
+        frames_lost (int): The number of frames discarded because writing failed.
+        segments (list): The file names of the segments written so far.
+        error (str or None): The reason writing failed, or None.
+    """
+
+    def __init__(self, filename: str = "recording_{segment:03d}.mp4", fps: float = 30.0, fourcc: str = "mp4v", segment_seconds: float = None,
+        queue_size: int = 64) -> None:
+        """
+        Initialize the VideoRecorder class.
+
+        Parameters:
+            filename (str, optional): The file name pattern of the segments. Default is 'recording_{segment:03d}.mp4'.
+            fps (float, optional): The frame rate of the video files. Default is 30.0.
+            fourcc (str, optional): The four character code of the video codec. Default is 'mp4v'.
+            segment_seconds (float, optional): The length of a segment in seconds of video, or None for a single file. Default is None.
+            queue_size (int, optional): The number of frames that can wait to be written. Default is 64.
+        """
+
+        self.filename = filename
+        self.fps = fps
+        self.fourcc = fourcc
+        self.segment_seconds = segment_seconds
+        self.queue = BoundedQueue(queue_size, "drop_oldest")
+
+        self.writer = None
+        self.segment_frames = 0
+        self.frames_written = 0
+        self.frames_lost = 0
+        self.segments = []
+        self.error = None
+
+        self.running = False
+        self.thread = None
+
+    @property
+    def dropped(self) -> int:
+        """
+        Get the number of frames dropped because the queue was full or writing failed.
+
+        Returns:
+            int: The number of dropped frames.
+        """
+
+        return self.queue.dropped + self.frames_lost
+
+    def start(self) -> None:
+        """Start the writer thread."""
+
+        if self.running: return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"VideoRecorder-{self.filename}", daemon=True)
+        self.thread.start()
+
+    def write(self, frame) -> None:
+        """
+        Queue a frame for writing.
+
+        Parameters:
+            frame (ndarray): The frame, which must not be modified afterwards.
+        """
+
+        if self.running: self.queue.put(frame)
+        elif self.error is not None: self.frames_lost += 1
+
+    def open_segment(self, frame) -> None:
+        """
+        Close the current segment and open the next one for the shape of a frame.
+
+        Parameters:
+            frame (ndarray): The first frame of the segment.
+        """
+
+        if self.writer is not None: self.writer.release()
+
+        filename = self.filename.format(segment=len(self.segments))
+        height, width = frame.shape[:2]
+
+        self.writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height), frame.ndim == 3)
+        if not self.writer.isOpened(): raise Exception(f"Failed to open video writer [{filename}].")
+
+        self.segments.append(filename)
+        self.segment_frames = 0
+
+    def write_frame(self, frame) -> None:
+        """
+        Write a frame to the current segment, rotating segments as needed.
+
+        Parameters:
+            frame (ndarray): The frame to write.
+        """
+
+        if frame.ndim == 3 and frame.shape[2] == 4: frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+
+        if self.writer is None or (self.segment_seconds is not None and self.segment_frames >= self.segment_seconds * self.fps):
+            self.open_segment(frame)
+
+        self.writer.write(frame)
+        self.segment_frames += 1
+        self.frames_written += 1
+
+    def run(self) -> None:
+        """Write queued frames until the recorder stops and the queue is drained."""
+
+        try:
+            while self.running or self.queue.qsize():
+                frame = self.queue.get()
+                if frame is not None: self.write_frame(frame)
+        except Exception as e:
+            print(f"Recording [{self.filename}] failed - {e}")
+            self.error = str(e)
+            self.running = False
+            self.frames_lost += 1
+
+            while self.queue.qsize():
+                if self.queue.get() is not None: self.frames_lost += 1
+        finally:
+            if self.writer is not None: self.writer.release()
+            self.writer = None
+
+    def stop(self, timeout: float = 10.0) -> dict:
+        """
+        Stop the recorder after writing the queued frames.
+
+        Parameters:
+            timeout (float, optional): The time to wait for the queued frames to be written. Default is 10.0.
+
+        Returns:
+            dict: The recording stats.
+        """
+
+        self.running = False
+        if self.thread is not None: self.thread.join(timeout)
+
+        if self.dropped: print(f"Recording [{self.filename}] dropped [{self.dropped}] frames.")
+        return self.get_stats()
+
+    def get_stats(self) -> dict:
+        """
+        Get the recording counters.
+
+        Returns:
+            dict: The frames written and dropped, the queued frames, the segment file names and the error, if writing failed.
+        """
+
+        return {
+            "frames_written": self.frames_written,
+            "dropped": self.dropped,
+            "queued": self.queue.qsize(),
+            "segments": list(self.segments),
+            "error": self.error }
+
+class CamRecordingMixin:
+    """
+    A mixin class for saving images on a background encoder pool and recording cams to video files.
+
+    Attributes:
+        recorders (dict): A dictionary to store the video recorders of the cams and fake cams being recorded.
+        encoder_pool (ThreadPoolExecutor or None): The thread pool encoding captured images.
+        encoder_workers (int): The number of encoder threads.
+        encoder_queue_size (int): The maximum number of images waiting to be encoded.
+        pending_encodes (int): The number of images waiting to be encoded.
+        dropped_captures (int): The number of captures dropped because the encoder queue was full.
+    """
+
+    def encode_image(self, frame, filename: str) -> str:
+        """
+        Encode a frame and save it to a file.
+
+        Parameters:
+            frame (ndarray): The frame to save.
+            filename (str): The name of the file.
+
+        Returns:
+            str: The name of the file.
+        """
+
+        try:
+            if not cv2.imwrite(filename, frame): raise Exception(f"Failed to save image [{filename}].")
+        finally:
+            with self.encoder_lock: self.pending_encodes -= 1
+
+        return filename
+
+    def submit_image(self, frame, filename: str) -> any:
+        """
+        Queue a frame for encoding on the encoder pool.
+
+        Parameters:
+            frame (ndarray): The frame to save, which must not be modified afterwards.
+            filename (str): The name of the file.
+
+        Returns:
+            any: A Future resolving to the file name, or None if the encoder queue was full and the capture was dropped.
+        """
+
+        with self.encoder_lock:
+            if self.pending_encodes >= self.encoder_queue_size:
+                self.dropped_captures += 1
+                print(f"Encoder queue full, capture [{filename}] dropped ({self.dropped_captures} dropped so far).")
+                return None
+
+            self.pending_encodes += 1
+            if self.encoder_pool is None: self.encoder_pool = ThreadPoolExecutor(self.encoder_workers, thread_name_prefix="CamEncoder")
+
+        return self.encoder_pool.submit(self.encode_image, frame, filename)
+
+    def capture_image_async(self, cam_id: int = None, fake_window_title: str = None, filename: str = "capture.jpg") -> any:
+        """
+        Capture an image from a specific cam or fake cam and save it to a file on the encoder pool.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to capture the image from. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window to capture the image from. Default is None.
+            filename (str, optional): The name of the file to save the captured image. Default is "capture.jpg".
+
+        Returns:
+            any: A Future resolving to the file name, or None if the encoder queue was full and the capture was dropped.
+        """
+
+        frame = self.get_frame(cam_id, fake_window_title)
+        if frame is None: raise Exception("Failed to capture image from cam.")
+
+        if fake_window_title or (cam_id is None and self.active_cam_id in self.fake_cams): frame = frame.copy()
+        return self.submit_image(frame, filename)
+
+    def capture_burst(self, count: int, cam_id: int = None, fake_window_title: str = None, filename: str = "burst_{index:03d}.jpg",
+        interval: float = 0.0) -> list:
+        """
+        Capture several consecutive images and save them on the encoder pool.
+
+        Parameters:
+            count (int): The number of images to capture.
+            cam_id (int, optional): The ID of the cam to capture the images from. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window to capture the images from. Default is None.
+            filename (str, optional): The file name pattern, formatted with the image index as 'index'. Default is "burst_{index:03d}.jpg".
+            interval (float, optional): The minimum time in seconds between two captures. Default is 0.0.
+
+        Returns:
+            list: A Future (or None for a dropped capture) per image.
+        """
+
+        if cam_id is None and fake_window_title is None and self.active_cam_id in self.cams: cam_id = self.active_cam_id
+
+        futures = []
+        next_time = time.monotonic()
+
+        for index in range(count):
+            delay = next_time - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            next_time += interval
+
+            if cam_id in self.readers: frame = self.wait_for_next_frame(cam_id)
+            else: frame = self.get_frame(cam_id, fake_window_title)
+            if frame is None: raise Exception("Failed to capture image from cam.")
+
+            if cam_id not in self.cams: frame = frame.copy()
+            futures.append(self.submit_image(frame, filename.format(index=index)))
+
+        return futures
+
+    def start_recording(self, cam_id: int = None, fake_window_title: str = None, filename: str = None, fps: float = None,
+        fourcc: str = "mp4v", segment_seconds: float = None, queue_size: int = 64) -> VideoRecorder:
+        """
+        Start recording the frames read with get_frame from a cam or fake cam.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to record. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window to record. Default is None.
+            filename (str, optional): The file name pattern of the segments. Default is 'recording_<cam>_{segment:03d}.mp4'.
+            fps (float, optional): The frame rate of the video files. Default is the cam frame rate, or 30.
+            fourcc (str, optional): The four character code of the video codec. Default is 'mp4v'.
+            segment_seconds (float, optional): The length of a segment in seconds of video, or None for a single file. Default is None.
+            queue_size (int, optional): The number of frames that can wait to be written. Default is 64.
+
+        Returns:
+            VideoRecorder: The recorder.
+        """
+
+        key = fake_window_title or (self.active_cam_id if cam_id is None else cam_id)
+        if key not in self.cams and key not in self.fake_cams: raise Exception(f"Cam [{key}] does not exist.")
+        if key in self.recorders: raise Exception(f"Cam [{key}] is already being recorded.")
+
+        if fps is None: fps = (self.cams[key].get(cv2.CAP_PROP_FPS) if key in self.cams else 0) or 30.0
+        if filename is None: filename = f"recording_{key}_{{segment:03d}}.mp4"
+
+        recorder = VideoRecorder(filename, fps, fourcc, segment_seconds, queue_size)
+        recorder.start()
+        self.recorders[key] = recorder
+        print(f"Recording cam [{key}] to [{filename}].")
+
+        return recorder
+
+    def record_frame(self, key, frame) -> None:
+        """
+        Queue a frame read from a cam or fake cam for recording, if the cam is being recorded.
+
+        Parameters:
+            key (int or str): The ID of the cam or the title of the fake cam.
+            frame (ndarray): The frame read.
+        """
+
+        if key in self.recorders: self.recorders[key].write(frame.copy())
+
+    def stop_recording(self, cam_id: int = None, fake_window_title: str = None) -> dict:
+        """
+        Stop recording a cam or fake cam after writing the queued frames.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam being recorded. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window being recorded. Default is None.
+
+        Returns:
+            dict: The frames written and dropped, the queued frames, the segment file names and the error, if writing failed.
+        """
+
+        key = fake_window_title or (self.active_cam_id if cam_id is None else cam_id)
+        if key not in self.recorders: raise Exception(f"Cam [{key}] is not being recorded.")
+
+        stats = self.recorders.pop(key).stop()
+        if stats["error"] is not None: print(f"Recording of cam [{key}] failed after {stats['frames_written']} frames, {stats['dropped']} dropped - {stats['error']}")
+        else: print(f"Recording of cam [{key}] stopped, {stats['frames_written']} frames written to {len(stats['segments'])} segment(s).")
+
+        return stats
+
+    def wait_for_captures(self) -> None:
+        """Wait until every queued image is saved and shut the encoder pool down."""
+
+        with self.encoder_lock:
+            pool = self.encoder_pool
+            self.encoder_pool = None
+
+        if pool is not None: pool.shutdown(wait=True)
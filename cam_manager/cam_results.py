@@ -0,0 +1,317 @@
+import os
+
+from cam_manager.cam_imports import LazyModule
+
+np = LazyModule("numpy")
+
+COLUMNS = ("classes", "confidences", "boxes", "keypoints", "frame_index", "timestamps", "rois")
+
+class AIResults:
+    """
+    Columnar AI results, with one row per detected object (or per kept class for classification).
+
+    Rows of several frames can be concatenated and saved in bulk, without building a dict per object.
+
+    Attributes:
+        mode (str): The AI mode the results come from ('detection', 'segmentation', 'classify', 'pose').
+        classes (ndarray): The class of each row, as int32.
+        confidences (ndarray): The confidence of each row, as float32.
+        boxes (ndarray): The (x1, y1, x2, y2) frame coordinates of each row as float32, NaN for classification.
+        keypoints (ndarray or None): The (x, y) frame coordinates of the keypoints of each row as float32 with shape
+            (rows, keypoints, 2), (0, 0) for missing keypoints, or None outside the pose mode.
+        frame_index (ndarray): The index of the frame of each row, as int64.
+        timestamps (ndarray): The time.time() value at which the frame of each row was processed, as float64.
+        rois (ndarray): The index of the region of interest of each row as int16, -1 for the whole frame.
+    """
+
+    def __init__(self, mode: str, classes, confidences, boxes=None, keypoints=None, frame_index=None, timestamps=None, rois=None) -> None:
+        """
+        Initialize the AIResults class.
+
+        Parameters:
+            mode (str): The AI mode the results come from.
+            classes (ndarray): The class of each row.
+            confidences (ndarray): The confidence of each row.
+            boxes (ndarray, optional): The (x1, y1, x2, y2) boxes of each row. Default is NaN boxes.
+            keypoints (ndarray, optional): The keypoints of each row, with shape (rows, keypoints, 2). Default is None.
+            frame_index (ndarray, optional): The index of the frame of each row. Default is 0 for all rows.
+            timestamps (ndarray, optional): The time at which the frame of each row was processed. Default is NaN.
+            rois (ndarray, optional): The index of the region of interest of each row. Default is -1 for all rows.
+        """
+
+        self.mode = mode
+        self.classes = np.asarray(classes, dtype=np.int32)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        rows = len(self.classes)
+
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(rows, 4) if boxes is not None else np.full((rows, 4), np.nan, np.float32)
+        self.keypoints = np.asarray(keypoints, dtype=np.float32) if keypoints is not None else None
+        if self.keypoints is not None and self.keypoints.ndim != 3: self.keypoints = self.keypoints.reshape(rows, -1, 2)
+        self.frame_index = np.asarray(frame_index, dtype=np.int64) if frame_index is not None else np.zeros(rows, np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64) if timestamps is not None else np.full(rows, np.nan)
+        self.rois = np.asarray(rois, dtype=np.int16) if rois is not None else np.full(rows, -1, np.int16)
+
+    def __len__(self) -> int:
+        """
+        Get the number of rows.
+
+        Returns:
+            int: The number of rows.
+        """
+
+        return len(self.classes)
+
+    def __getitem__(self, index) -> "AIResults":
+        """
+        Select rows, such as a boolean filter on the confidences.
+
+        Parameters:
+            index (any): A NumPy index of the rows.
+
+        Returns:
+            AIResults: The selected rows.
+        """
+
+        return AIResults(self.mode, self.classes[index], self.confidences[index], self.boxes[index],
+            self.keypoints[index] if self.keypoints is not None else None, self.frame_index[index], self.timestamps[index], self.rois[index])
+
+    @classmethod
+    def empty(cls, mode: str) -> "AIResults":
+        """
+        Create results without rows.
+
+        Parameters:
+            mode (str): The AI mode.
+
+        Returns:
+            AIResults: The empty results.
+        """
+
+        return cls(mode, np.empty(0, np.int32), np.empty(0, np.float32), keypoints=np.empty((0, 0, 2), np.float32) if mode == "pose" else None)
+
+    @classmethod
+    def concatenate(cls, results: list, mode: str = None) -> "AIResults":
+        """
+        Concatenate the rows of several results, such as those of consecutive frames or of the tiles of a frame.
+
+        Parameters:
+            results (list): The results, all of the same mode.
+            mode (str, optional): The mode of the results when the list is empty. Default is None.
+
+        Returns:
+            AIResults: The concatenated rows, or the only results themselves if the list has one element.
+        """
+
+        if not results: return cls.empty(mode)
+        if len(results) == 1: return results[0]
+
+        mode = results[0].mode
+        if any(result.mode != mode for result in results): raise Exception("Cannot concatenate results of different AI modes.")
+
+        keypoints = None
+        if all(result.keypoints is not None for result in results):
+            counts = {result.keypoints.shape[1] for result in results if len(result)}
+            if len(counts) > 1: raise Exception("Cannot concatenate results with different keypoint counts.")
+
+            count = counts.pop() if counts else 0
+            keypoints = np.concatenate([result.keypoints.reshape(len(result), count, 2) for result in results])
+
+        return cls(mode,
+            np.concatenate([result.classes for result in results]),
+            np.concatenate([result.confidences for result in results]),
+            np.concatenate([result.boxes for result in results]),
+            keypoints,
+            np.concatenate([result.frame_index for result in results]),
+            np.concatenate([result.timestamps for result in results]),
+            np.concatenate([result.rois for result in results]))
+
+    def copy(self) -> "AIResults":
+        """
+        Copy the results.
+
+        Returns:
+            AIResults: The results with copied columns.
+        """
+
+        return self[np.arange(len(self))]
+
+    def to_columns(self) -> dict:
+        """
+        Get the columns.
+
+        Returns:
+            dict: The column arrays keyed by name, without 'keypoints' outside the pose mode.
+        """
+
+        columns = {name: getattr(self, name) for name in COLUMNS}
+        if self.keypoints is None: del columns["keypoints"]
+
+        return columns
+
+    def to_records(self) -> list:
+        """
+        Convert the rows to dicts, for code expecting the dict result format.
+
+        Returns:
+            list: A dict per row with 'class', 'confidence', 'frame_index', 'timestamp' and, when available, 'box',
+                'pose' and 'roi' keys.
+        """
+
+        records = [{
+            "class": cls,
+            "confidence": confidence,
+            "frame_index": frame_index,
+            "timestamp": timestamp } for cls, confidence, frame_index, timestamp in
+            zip(self.classes.tolist(), self.confidences.tolist(), self.frame_index.tolist(), self.timestamps.tolist())]
+
+        if self.mode != "classify":
+            for record, box in zip(records, self.boxes.tolist()): record["box"] = box
+        if self.keypoints is not None:
+            for record, keypoints in zip(records, self.keypoints.tolist()): record["pose"] = keypoints
+        for record, roi in zip(records, self.rois.tolist()):
+            if roi >= 0: record["roi"] = roi
+
+        return records
+
+    def save_npz(self, filename: str, compressed: bool = False) -> str:
+        """
+        Save the columns to a NumPy .npz file.
+
+        Parameters:
+            filename (str): The name of the file.
+            compressed (bool, optional): Whether to compress the file. Default is False.
+
+        Returns:
+            str: The name of the file.
+        """
+
+        save = np.savez_compressed if compressed else np.savez
+        with open(filename, "wb") as f: save(f, mode=np.array(self.mode), **self.to_columns())
+
+        return filename
+
+    @classmethod
+    def load_npz(cls, filename: str) -> "AIResults":
+        """
+        Load results saved with save_npz.
+
+        Parameters:
+            filename (str): The name of the file.
+
+        Returns:
+            AIResults: The loaded results.
+        """
+
+        with np.load(filename) as data:
+            columns = {name: data[name] for name in COLUMNS if name in data}
+            return cls(str(data["mode"]), **columns)
+
+    def save_parquet(self, filename: str) -> str:
+        """
+        Save the rows to a Parquet file, with boxes and keypoints as list columns. Requires pyarrow.
+
+        Parameters:
+            filename (str): The name of the file.
+
+        Returns:
+            str: The name of the file.
+        """
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e: raise Exception("Saving results to Parquet requires pyarrow.") from e
+
+        table = {name: pa.array(values) for name, values in self.to_columns().items() if values.ndim == 1}
+        table["boxes"] = pa.FixedSizeListArray.from_arrays(pa.array(self.boxes.ravel()), 4)
+        if self.keypoints is not None:
+            points = pa.FixedSizeListArray.from_arrays(pa.array(self.keypoints.ravel()), 2)
+            table["keypoints"] = pa.FixedSizeListArray.from_arrays(points, self.keypoints.shape[1]) if self.keypoints.shape[1] else pa.nulls(len(self))
+
+        pq.write_table(pa.table(table, metadata={"mode": self.mode}), filename)
+        return filename
+
+class AIResultLog:
+    """
+    A writer logging columnar AI results at a high rate, in files of a fixed number of rows.
+
+    Attributes:
+        filename (str): The file name pattern of the chunks, formatted with the chunk index as 'chunk'.
+        rows_per_file (int): The number of rows after which a chunk is written.
+        file_format (str): The file format of the chunks ('npz', 'npz_compressed', 'parquet').
+        pending (list): The results waiting to be written.
+        pending_rows (int): The number of rows waiting to be written.
+        files (list): The file names of the chunks written so far.
+        rows_written (int): The number of rows written.
+    """
+
+    def __init__(self, filename: str = "ai_results_{chunk:05d}.npz", rows_per_file: int = 100000, file_format: str = "npz") -> None:
+        """
+        Initialize the AIResultLog class.
+
+        Parameters:
+            filename (str, optional): The file name pattern of the chunks. Default is 'ai_results_{chunk:05d}.npz'.
+            rows_per_file (int, optional): The number of rows after which a chunk is written. Default is 100000.
+            file_format (str, optional): The file format of the chunks, 'npz', 'npz_compressed' or 'parquet'. Default is 'npz'.
+        """
+
+        if file_format not in ("npz", "npz_compressed", "parquet"): raise Exception(f"Invalid result log format [{file_format}].")
+
+        self.filename = filename
+        self.rows_per_file = rows_per_file
+        self.file_format = file_format
+
+        self.pending = []
+        self.pending_rows = 0
+        self.files = []
+        self.rows_written = 0
+
+    def append(self, results: AIResults) -> None:
+        """
+        Queue results for writing, writing a chunk when enough rows are queued.
+
+        Parameters:
+            results (AIResults): The results, which must not be modified afterwards.
+        """
+
+        if not len(results): return
+
+        self.pending.append(results)
+        self.pending_rows += len(results)
+        if self.pending_rows >= self.rows_per_file: self.flush()
+
+    def flush(self) -> any:
+        """
+        Write the queued rows to a new chunk.
+
+        Returns:
+            any: The file name of the chunk, or None if no rows were queued.
+        """
+
+        if not self.pending: return None
+
+        results = AIResults.concatenate(self.pending)
+        filename = self.filename.format(chunk=len(self.files))
+        directory = os.path.dirname(filename)
+        if directory: os.makedirs(directory, exist_ok=True)
+
+        if self.file_format == "parquet": results.save_parquet(filename)
+        else: results.save_npz(filename, self.file_format == "npz_compressed")
+
+        self.files.append(filename)
+        self.rows_written += len(results)
+        self.pending = []
+        self.pending_rows = 0
+
+        return filename
+
+    def close(self) -> list:
+        """
+        Write the remaining rows.
+
+        Returns:
+            list: The file names of all chunks written.
+        """
+
+        self.flush()
+        return list(self.files)
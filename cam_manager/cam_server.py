@@ -0,0 +1,209 @@
+import json
+import socket
+import threading
+from urllib.parse import quote, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOUNDARY = "frame"
+SEND_BUFFER_SIZE = 64 * 1024
+
+class MJPEGRequestHandler(BaseHTTPRequestHandler):
+    """
+    The request handler of MJPEGServer.
+
+    Routes:
+        /stream/<name>: The stream as multipart/x-mixed-replace MJPEG.
+        /snapshot/<name>: The next frame of the stream as a single JPEG.
+        /stats: The stream counters as JSON.
+        /metrics: The manager telemetry in the Prometheus text format, if available.
+    """
+
+    timeout = 10.0
+
+    def setup(self) -> None:
+        """Shrink the send buffer so a slow client falls behind the stream and skips frames instead of queueing them."""
+
+        super().setup()
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+
+    def do_GET(self) -> None:
+        """Route a GET request."""
+
+        path = self.path.split("?", 1)[0]
+        route, _, name = path.strip("/").partition("/")
+        server = self.server.mjpeg_server
+
+        if route == "stream" and name: self.send_stream(server.get_stream(unquote(name)))
+        elif route == "snapshot" and name: self.send_snapshot(server.get_stream(unquote(name)))
+        elif route == "stats": self.send_body(json.dumps(server.get_stats()).encode(), "application/json")
+        elif route == "metrics" and server.metrics is not None: self.send_body(server.metrics().encode(), "text/plain; version=0.0.4")
+        else: self.send_error(404)
+
+    def send_body(self, body: bytes, content_type: str) -> None:
+        """
+        Send a complete response.
+
+        Parameters:
+            body (bytes): The response body.
+            content_type (str): The content type of the body.
+        """
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_snapshot(self, stream) -> None:
+        """
+        Send the next frame of a stream as a single JPEG.
+
+        Parameters:
+            stream (MJPEGStream or None): The stream, or None if it does not exist.
+        """
+
+        if stream is None: return self.send_error(404)
+
+        stream.add_client()
+        try: jpeg, _ = stream.wait_for_jpeg(stream.seq, 5.0)
+        finally: stream.remove_client()
+
+        if jpeg is None: return self.send_error(503)
+        self.send_body(jpeg, "image/jpeg")
+
+    def send_stream(self, stream) -> None:
+        """
+        Send the frames of a stream until the client disconnects or the stream stops.
+
+        Parameters:
+            stream (MJPEGStream or None): The stream, or None if it does not exist.
+        """
+
+        if stream is None: return self.send_error(404)
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        seq = 0
+        stream.add_client()
+        try:
+            while stream.running:
+                jpeg, seq = stream.wait_for_jpeg(seq)
+                if jpeg is None: continue
+
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode())
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                self.wfile.flush()
+                stream.bytes_sent += len(jpeg)
+        except (BrokenPipeError, ConnectionResetError, TimeoutError): pass
+        finally: stream.remove_client()
+
+    def log_message(self, format: str, *args) -> None:
+        """Silence the per-request log lines."""
+
+class MJPEGServer:
+    """
+    An HTTP server serving MJPEG streams, with a thread per client.
+
+    Attributes:
+        host (str): The address the server listens on.
+        port (int): The port the server listens on.
+        streams (dict): The served streams keyed by name.
+        metrics (callable or None): The function returning the Prometheus metrics served at /metrics.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, metrics=None) -> None:
+        """
+        Initialize the MJPEGServer class and bind its socket.
+
+        Parameters:
+            host (str, optional): The address to listen on. Default is '127.0.0.1'.
+            port (int, optional): The port to listen on, 0 for any free port. Default is 8080.
+            metrics (callable, optional): The function returning the Prometheus metrics served at /metrics. Default is None.
+        """
+
+        self.httpd = ThreadingHTTPServer((host, port), MJPEGRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mjpeg_server = self
+
+        self.host = host
+        self.port = self.httpd.server_address[1]
+        self.streams = {}
+        self.metrics = metrics
+        self.thread = None
+
+    def start(self) -> None:
+        """Start serving on a background thread."""
+
+        if self.thread is not None: return
+
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name=f"MJPEGServer-{self.port}", daemon=True)
+        self.thread.start()
+
+    def add_stream(self, stream) -> None:
+        """
+        Serve a stream.
+
+        Parameters:
+            stream (MJPEGStream): The stream.
+        """
+
+        self.streams[stream.name] = stream
+
+    def remove_stream(self, name: str) -> None:
+        """
+        Stop serving a stream.
+
+        Parameters:
+            name (str): The name of the stream.
+        """
+
+        self.streams.pop(name, None)
+
+    def get_stream(self, name: str) -> any:
+        """
+        Get a stream by its name.
+
+        Parameters:
+            name (str): The name of the stream.
+
+        Returns:
+            any: The stream, or None if it does not exist.
+        """
+
+        return self.streams.get(name)
+
+    def get_url(self, name: str) -> str:
+        """
+        Get the URL of a stream.
+
+        Parameters:
+            name (str): The name of the stream.
+
+        Returns:
+            str: The URL of the stream.
+        """
+
+        return f"http://{self.host}:{self.port}/stream/{quote(name, safe='')}"
+
+    def get_stats(self) -> dict:
+        """
+        Get the counters of every stream.
+
+        Returns:
+            dict: The stream counters keyed by stream name.
+        """
+
+        return {name: stream.get_stats() for name, stream in list(self.streams.items())}
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread = None
+        self.httpd.server_close()
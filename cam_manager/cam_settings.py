@@ -1,25 +1,45 @@
 import os
-import cv2
 import json
+import time
+import tempfile
+import threading
+
+from cam_manager.cam_imports import LazyModule
+
+cv2 = LazyModule("cv2")
+
+STORE_LOCK = threading.Lock()
 
 class CamSettingsMixin:
     """
     A mixin class for managing camera settings, including saving and loading settings from a file.
 
+    With a cam_id, the settings file is a store shared by all cams, holding the settings of each cam under its ID.
+    Writes to the file are atomic, so a crash never leaves a truncated store.
+
     Attributes:
         settings_file (str): The file path for saving and loading settings.
+        cam_id (int or str or None): The ID of the cam in the shared store, or None for a file holding a single cam.
         settings (dict): A dictionary mapping property names to OpenCV property IDs.
+        last_apply (dict or None): The counts and timing of the last settings apply.
     """
 
-    def __init__(self, settings_file):
+    restart_settings = ("CAP_PROP_FOURCC", "CAP_PROP_FRAME_WIDTH", "CAP_PROP_FRAME_HEIGHT", "CAP_PROP_FPS")
+    auto_settings = ("CAP_PROP_AUTO_EXPOSURE", "CAP_PROP_AUTOFOCUS")
+    read_only_settings = ("CAP_PROP_SETTINGS", "CAP_PROP_FRAME_COUNT", "CAP_PROP_GUID")
+
+    def __init__(self, settings_file, cam_id=None):
         """
         Initialize the CamSettingsMixin class.
 
         Parameters:
             settings_file (str): The file path for saving and loading settings.
+            cam_id (int or str, optional): The ID of the cam in a settings store shared by all cams. Default is None.
         """
 
         self.settings_file = settings_file
+        self.cam_id = cam_id
+        self.last_apply = None
         self.settings = {
             "CAP_PROP_SETTINGS": cv2.CAP_PROP_SETTINGS,
 
@@ -62,6 +82,60 @@ class CamSettingsMixin:
             "CAP_PROP_WHITE_BALANCE_RED_V": cv2.CAP_PROP_WHITE_BALANCE_RED_V,
             "CAP_PROP_WHITE_BALANCE_BLUE_U": cv2.CAP_PROP_WHITE_BALANCE_BLUE_U }
 
+    def read_store(self) -> dict:
+        """
+        Read the settings of the cam from the settings file.
+
+        With a cam_id and no entry for it in the shared store, a legacy cam_settings_<cam_id>.json file next to the
+        store is read instead.
+
+        Returns:
+            dict or None: The stored settings, or None if there are none.
+        """
+
+        store = None
+        if os.path.exists(self.settings_file):
+            with open(self.settings_file, 'r') as f:
+                store = json.load(f)
+
+        if self.cam_id is None: return store
+        if store and str(self.cam_id) in store: return store[str(self.cam_id)]
+
+        legacy_file = os.path.join(os.path.dirname(self.settings_file), f"cam_settings_{self.cam_id}.json")
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r') as f:
+                return json.load(f)
+        return None
+
+    def write_store(self, settings_data: dict) -> None:
+        """
+        Write the settings of the cam to the settings file atomically, keeping the entries of the other cams.
+
+        Parameters:
+            settings_data (dict): The settings to store.
+        """
+
+        with STORE_LOCK:
+            store = settings_data
+            if self.cam_id is not None:
+                store = {}
+                if os.path.exists(self.settings_file):
+                    with open(self.settings_file, 'r') as f:
+                        store = json.load(f)
+                store[str(self.cam_id)] = settings_data
+
+            directory = os.path.dirname(os.path.abspath(self.settings_file))
+            fd, temp_file = tempfile.mkstemp(prefix=".cam_settings_", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(store, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.settings_file)
+            except BaseException:
+                os.unlink(temp_file)
+                raise
+
     def save_settings(self, cap) -> None:
         """
         Save the current settings of the camera to a file.
@@ -71,13 +145,63 @@ class CamSettingsMixin:
         """
 
         settings_data = {prop: cap.get(prop_id) for prop, prop_id in self.settings.items()}
-        with open(self.settings_file, 'w') as f:
-            json.dump(settings_data, f, indent=4)
+        self.write_store(settings_data)
         print(f"Settings saved to {self.settings_file}")
 
+    def order_settings(self, props: list) -> list:
+        """
+        Order properties for applying, with the properties forcing a stream restart first and auto modes before the
+        manual values they control.
+
+        Parameters:
+            props (list): The property names.
+
+        Returns:
+            list: The property names in apply order.
+        """
+
+        def rank(prop):
+            if prop in self.restart_settings: return (0, self.restart_settings.index(prop))
+            if prop in self.auto_settings: return (1, self.auto_settings.index(prop))
+            return (2, 0)
+
+        return sorted(props, key=rank)
+
+    def apply_settings(self, cap, settings_data: dict) -> dict:
+        """
+        Apply settings to the camera, only setting the values that differ from the current ones.
+
+        Parameters:
+            cap (cv2.VideoCapture): The video capture object to which to apply settings.
+            settings_data (dict): The settings to apply, keyed by property name.
+
+        Returns:
+            dict: The applied, unchanged and failed property names and the time of the apply step in milliseconds.
+        """
+
+        start = time.perf_counter()
+        stats = {"applied": [], "unchanged": [], "failed": [], "restart": False}
+
+        for prop in self.order_settings([prop for prop in settings_data if prop in self.settings and prop not in self.read_only_settings]):
+            prop_id = self.settings[prop]
+            value = settings_data[prop]
+
+            if abs(cap.get(prop_id) - value) < 1e-6:
+                stats["unchanged"].append(prop)
+            elif cap.set(prop_id, value):
+                stats["applied"].append(prop)
+                if prop in self.restart_settings: stats["restart"] = True
+            else:
+                stats["failed"].append(prop)
+                print(f"Failed to set {prop} to {value}")
+
+        stats["apply_ms"] = (time.perf_counter() - start) * 1000
+        self.last_apply = stats
+        return stats
+
     def load_settings(self, cap) -> dict:
         """
-        Load settings from a file and apply them to the camera.
+        Load settings from a file and apply them to the camera, skipping values that are already set.
 
         Parameters:
             cap (cv2.VideoCapture): The video capture object to which to apply settings.
@@ -86,19 +210,14 @@ class CamSettingsMixin:
             dict: The loaded settings.
         """
 
-        settings_data = {}
-        if os.path.exists(self.settings_file):
-            with open(self.settings_file, 'r') as f:
-                settings_data = json.load(f)
-
-            for prop, value in settings_data.items():
-                prop_id = self.settings.get(prop)
-                if prop_id is not None and prop_id != cv2.CAP_PROP_SETTINGS:
-                    if not cap.set(prop_id, value):
-                        print(f"Failed to set {prop} to {value}")
-            print(f"Settings loaded from {self.settings_file}")
+        settings_data = self.read_store()
+        if settings_data is not None:
+            stats = self.apply_settings(cap, settings_data)
+            print(f"Settings loaded from {self.settings_file} ({len(stats['applied'])} applied, {len(stats['unchanged'])} unchanged) "
+                f"in {stats['apply_ms']:.1f} ms")
         else:
-            print("No settings file found. Using default settings.")
+            settings_data = {}
+            print(f"No settings found in {self.settings_file}. Using default settings.")
             self.save_settings(cap)
         return settings_data
 
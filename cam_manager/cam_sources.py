@@ -0,0 +1,311 @@
+import time
+
+import cv2
+import numpy as np
+
+class SyntheticCapture:
+    """
+    A cv2.VideoCapture compatible source that generates frames, used in place of a physical cam.
+
+    Attributes:
+        width (int): The width of the generated frames.
+        height (int): The height of the generated frames.
+        fps (float): The rate at which frames are produced.
+        frame_count (int or None): The number of frames to produce before reads fail, or None for endless.
+        realtime (bool): Whether reads block until the next frame interval like a real sensor.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, frame_count: int = None, realtime: bool = True) -> None:
+        """
+        Initialize the SyntheticCapture class.
+
+        Parameters:
+            width (int, optional): The width of the generated frames. Default is 640.
+            height (int, optional): The height of the generated frames. Default is 480.
+            fps (float, optional): The rate at which frames are produced. Default is 30.0.
+            frame_count (int, optional): The number of frames to produce, or None for endless. Default is None.
+            realtime (bool, optional): Whether reads are paced to the frame rate. Default is True.
+        """
+
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self.realtime = realtime
+
+        self.index = 0
+        self.opened = True
+        self.next_time = time.monotonic()
+
+        ramp = np.linspace(0, 255, width, dtype=np.uint8)
+        self.base = np.empty((height, width, 3), dtype=np.uint8)
+        self.base[:] = ramp[None, :, None]
+
+        self.grabbed = False
+
+    def isOpened(self) -> bool:
+        """
+        Check whether the source is open.
+
+        Returns:
+            bool: True if the source is open.
+        """
+
+        return self.opened
+
+    def grab(self) -> bool:
+        """
+        Advance to the next frame without producing pixels.
+
+        Returns:
+            bool: True if a frame was grabbed.
+        """
+
+        if not self.opened: return False
+        if self.frame_count is not None and self.index >= self.frame_count: return False
+
+        if self.realtime:
+            delay = self.next_time - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            self.next_time = max(self.next_time, time.monotonic() - 1.0 / self.fps) + 1.0 / self.fps
+
+        self.index += 1
+        self.grabbed = True
+        return True
+
+    def retrieve(self, image=None) -> tuple:
+        """
+        Produce the pixels of the last grabbed frame.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to fill in place. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        if not self.grabbed: return False, None
+        self.grabbed = False
+
+        if image is None or image.shape != self.base.shape or image.dtype != self.base.dtype:
+            image = np.empty_like(self.base)
+        np.copyto(image, self.base)
+
+        bar = max(self.width // 16, 1)
+        x = (self.index * 8) % max(self.width - bar, 1)
+        image[:, x:x + bar] = 255
+        cv2.putText(image, str(self.index), (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+
+        return True, image
+
+    def read(self, image=None) -> tuple:
+        """
+        Grab and retrieve the next frame.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to fill in place. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        if not self.grab(): return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        """
+        Get a capture property.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+
+        Returns:
+            float: The property value, or 0.0 if unsupported.
+        """
+
+        prop_map = {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_POS_FRAMES: self.index,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count or 0 }
+
+        return float(prop_map.get(prop_id, 0.0))
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """
+        Set a capture property.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+            value (float): The value to set.
+
+        Returns:
+            bool: True if the property is supported.
+        """
+
+        if prop_id == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = value
+            return True
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.index = int(value)
+            return True
+        return False
+
+    def release(self) -> None:
+        """Release the source."""
+
+        self.opened = False
+
+class FileCapture:
+    """
+    A cv2.VideoCapture compatible source reading a video file, optionally looping and paced like a live cam.
+
+    Attributes:
+        path (str): The path of the video file.
+        loop (bool): Whether to restart from the first frame at the end of the file.
+        realtime (bool): Whether reads block until the next frame interval of the file frame rate.
+        fps (float): The frame rate used for pacing.
+        loops (int): The number of times the file was restarted.
+    """
+
+    def __init__(self, path: str, loop: bool = True, realtime: bool = False, fps: float = None) -> None:
+        """
+        Initialize the FileCapture class.
+
+        Parameters:
+            path (str): The path of the video file.
+            loop (bool, optional): Whether to restart at the end of the file. Default is True.
+            realtime (bool, optional): Whether reads are paced to the frame rate. Default is False.
+            fps (float, optional): The frame rate used for pacing. Default is the frame rate of the file, or 30.
+        """
+
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.loops = 0
+
+        self.cap = cv2.VideoCapture(path)
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.next_time = time.monotonic()
+
+    def isOpened(self) -> bool:
+        """
+        Check whether the file is open.
+
+        Returns:
+            bool: True if the file is open.
+        """
+
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        """
+        Advance to the next frame, restarting the file at its end when looping.
+
+        Returns:
+            bool: True if a frame was grabbed.
+        """
+
+        if self.realtime:
+            delay = self.next_time - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            self.next_time = max(self.next_time, time.monotonic() - 1.0 / self.fps) + 1.0 / self.fps
+
+        if self.cap.grab(): return True
+        if not self.loop: return False
+
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.loops += 1
+        return self.cap.grab()
+
+    def retrieve(self, image=None) -> tuple:
+        """
+        Decode the last grabbed frame.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to decode into. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        return self.cap.retrieve(image)
+
+    def read(self, image=None) -> tuple:
+        """
+        Grab and decode the next frame.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to decode into. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        if not self.grab(): return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        """
+        Get a capture property of the file.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+
+        Returns:
+            float: The property value.
+        """
+
+        if prop_id == cv2.CAP_PROP_FPS: return float(self.fps)
+        return self.cap.get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """
+        Set a capture property of the file.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+            value (float): The value to set.
+
+        Returns:
+            bool: True if the property was set.
+        """
+
+        if prop_id == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = value
+            return True
+        return self.cap.set(prop_id, value)
+
+    def release(self) -> None:
+        """Release the file."""
+
+        self.cap.release()
+
+def write_synthetic_video(path: str, frame_count: int = 120, width: int = 640, height: int = 480, fps: float = 30.0, fourcc: str = "MJPG") -> str:
+    """
+    Write frames of a SyntheticCapture to a video file, for a reproducible file-backed source.
+
+    Parameters:
+        path (str): The path of the video file.
+        frame_count (int, optional): The number of frames. Default is 120.
+        width (int, optional): The width of the frames. Default is 640.
+        height (int, optional): The height of the frames. Default is 480.
+        fps (float, optional): The frame rate of the file. Default is 30.0.
+        fourcc (str, optional): The four character code of the codec. Default is 'MJPG'.
+
+    Returns:
+        str: The path of the video file.
+    """
+
+    source = SyntheticCapture(width, height, fps, frame_count, realtime=False)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened(): raise Exception(f"Failed to open video writer [{path}].")
+
+    while True:
+        ret, frame = source.read()
+        if not ret: break
+        writer.write(frame)
+
+    writer.release()
+    return path
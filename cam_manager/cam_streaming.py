@@ -0,0 +1,351 @@
+import time
+import threading
+
+from cam_manager.cam_imports import LazyModule
+from cam_manager.cam_telemetry import LatencyHistogram
+
+cv2 = LazyModule("cv2")
+
+class MJPEGStream:
+    """
+    A frame stream encoded to JPEG once per tick and shared by all of its clients.
+
+    Frames are either published by the capture loop or pulled from a source function on the stream thread, which
+    applies the processing, encodes the newest frame and wakes the clients. Publishing only replaces the pending
+    frame, so the capture loop never waits for encoding or for clients. A client slower than the stream simply
+    skips to the newest JPEG, and the frames it missed are counted as dropped. Nothing is processed or encoded
+    while no client is connected.
+
+    Attributes:
+        name (str): The name of the stream in the server URLs.
+        key (int or str): The ID of the cam or the title of the fake cam the stream shows.
+        source (callable or None): The function returning the next frame, or None if frames are published.
+        process (callable or None): The function applied to each frame before encoding, such as effects or AI.
+        fps (float or None): The maximum number of frames encoded per second, or None for every frame.
+        quality (int): The JPEG quality between 0 and 100.
+        jpeg (bytes or None): The newest encoded frame.
+        seq (int): The sequence number of the newest encoded frame, starting at 1.
+        clients (int): The number of connected clients.
+        encode_times (LatencyHistogram): The JPEG encoding times.
+        process_times (LatencyHistogram): The processing times.
+        skipped (int): The published frames replaced before the stream thread took them.
+        client_drops (int): The encoded frames that clients missed because they were too slow.
+    """
+
+    def __init__(self, name: str, key=None, source=None, process=None, fps: float = None, quality: int = 80, telemetry=None) -> None:
+        """
+        Initialize the MJPEGStream class.
+
+        Parameters:
+            name (str): The name of the stream in the server URLs.
+            key (int or str, optional): The ID of the cam or the title of the fake cam the stream shows. Default is None.
+            source (callable, optional): The function returning the next frame or None on timeout. Default is None, frames are published.
+            process (callable, optional): The function applied to each frame before encoding. Default is None.
+            fps (float, optional): The maximum number of frames encoded per second. Default is None, for every frame.
+            quality (int, optional): The JPEG quality between 0 and 100. Default is 80.
+            telemetry (Telemetry, optional): The telemetry recording the encoding times as 'stream_encode'. Default is None.
+        """
+
+        self.name = name
+        self.key = key
+        self.source = source
+        self.process = process
+        self.fps = fps
+        self.quality = quality
+        self.telemetry = telemetry
+
+        self.pending = None
+        self.published = 0
+        self.skipped = 0
+        self.frame_ready = threading.Condition()
+
+        self.jpeg = None
+        self.seq = 0
+        self.clients = 0
+        self.client_drops = 0
+        self.bytes_sent = 0
+        self.condition = threading.Condition()
+
+        self.encode_times = LatencyHistogram()
+        self.process_times = LatencyHistogram()
+
+        self.running = False
+        self.thread = None
+
+    def start(self) -> None:
+        """Start the stream thread."""
+
+        if self.running: return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"MJPEGStream-{self.name}", daemon=True)
+        self.thread.start()
+
+    def publish(self, frame) -> None:
+        """
+        Hand a frame to the stream, replacing the pending one if the stream thread has not taken it yet.
+
+        Parameters:
+            frame (ndarray): The frame, which must not be modified afterwards.
+        """
+
+        with self.frame_ready:
+            if self.pending is not None: self.skipped += 1
+            self.pending = frame
+            self.published += 1
+            self.frame_ready.notify()
+
+    def next_frame(self, timeout: float = 0.5) -> any:
+        """
+        Get the next frame to encode.
+
+        Parameters:
+            timeout (float, optional): The maximum time to wait in seconds. Default is 0.5.
+
+        Returns:
+            any: The frame, or None on timeout.
+        """
+
+        if self.source is not None: return self.source()
+
+        with self.frame_ready:
+            self.frame_ready.wait_for(lambda: self.pending is not None or not self.running, timeout)
+            frame, self.pending = self.pending, None
+
+        return frame
+
+    def encode(self, frame) -> None:
+        """
+        Process and encode a frame and wake the clients.
+
+        Parameters:
+            frame (ndarray): The frame to encode.
+        """
+
+        if self.process is not None:
+            start = time.perf_counter()
+            frame = self.process(frame)
+            self.process_times.observe(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ret, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ret: raise Exception(f"Failed to encode frame of stream [{self.name}].")
+        elapsed = time.perf_counter() - start
+
+        self.encode_times.observe(elapsed)
+        if self.telemetry is not None and self.telemetry.enabled: self.telemetry.observe("stream_encode", self.name, elapsed)
+
+        with self.condition:
+            self.jpeg = buffer.tobytes()
+            self.seq += 1
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        """Encode frames while clients are connected, until the stream stops."""
+
+        next_time = time.monotonic()
+
+        while self.running:
+            with self.condition:
+                if not self.condition.wait_for(lambda: self.clients or not self.running, 0.5): continue
+            if not self.running: break
+
+            try:
+                frame = self.next_frame()
+                if frame is None: continue
+
+                self.encode(frame)
+            except Exception as e:
+                print(f"Stream [{self.name}] failed - {e}")
+                time.sleep(0.5)
+                continue
+
+            if self.fps:
+                next_time = max(next_time + 1 / self.fps, time.monotonic())
+                time.sleep(max(next_time - time.monotonic(), 0))
+
+        with self.condition: self.condition.notify_all()
+
+    def add_client(self) -> None:
+        """Register a client, which starts encoding if it is the first one."""
+
+        with self.condition:
+            self.clients += 1
+            self.condition.notify_all()
+
+    def remove_client(self) -> None:
+        """Unregister a client."""
+
+        with self.condition: self.clients -= 1
+
+    def wait_for_jpeg(self, seq: int, timeout: float = 1.0) -> tuple:
+        """
+        Block until a JPEG newer than a sequence number is encoded, counting the JPEGs skipped since.
+
+        Parameters:
+            seq (int): The sequence number of the last JPEG the client got, or 0 for none.
+            timeout (float, optional): The maximum time to wait in seconds. Default is 1.0.
+
+        Returns:
+            tuple: The newest JPEG and its sequence number, or (None, seq) on timeout or when the stream stops.
+        """
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq > seq or not self.running, timeout)
+            if self.seq <= seq: return None, seq
+
+            if seq: self.client_drops += self.seq - seq - 1
+            return self.jpeg, self.seq
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Stop the stream thread and disconnect the clients.
+
+        Parameters:
+            timeout (float, optional): The time to wait for the stream thread. Default is 2.0.
+        """
+
+        self.running = False
+        with self.frame_ready: self.frame_ready.notify_all()
+        with self.condition: self.condition.notify_all()
+
+        if self.thread is not None: self.thread.join(timeout)
+        self.thread = None
+
+    def get_stats(self) -> dict:
+        """
+        Get the stream counters.
+
+        Returns:
+            dict: The clients, the frames encoded, skipped and dropped for clients, the bytes sent and the mean and max
+                encoding and processing times in milliseconds.
+        """
+
+        return {
+            "clients": self.clients,
+            "frames_encoded": self.seq,
+            "skipped": self.skipped,
+            "client_drops": self.client_drops,
+            "bytes_sent": self.bytes_sent,
+            "encode_ms": self.encode_times.total / self.encode_times.count * 1000 if self.encode_times.count else 0.0,
+            "encode_max_ms": self.encode_times.max * 1000,
+            "process_ms": self.process_times.total / self.process_times.count * 1000 if self.process_times.count else 0.0 }
+
+class CamStreamingMixin:
+    """
+    A mixin class for serving cams as MJPEG over HTTP, with effects or AI annotation applied.
+
+    Attributes:
+        streams (dict): The MJPEG streams keyed by name.
+        stream_server (MJPEGServer or None): The HTTP server of the streams, started with the first stream.
+    """
+
+    def start_streaming(self, cam_id: int = None, fake_window_title: str = None, name: str = None, effects: list = None, ai: bool = False,
+        fps: float = None, quality: int = 80, host: str = "127.0.0.1", port: int = 8080) -> str:
+        """
+        Start serving a cam or fake cam as an MJPEG stream.
+
+        Frames read with get_frame are streamed, so the cam must be read in a loop. Cams read by a background
+        thread are read by the stream itself. Each frame is encoded once for all clients of the stream.
+
+        Parameters:
+            cam_id (int, optional): The ID of the cam to stream. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window to stream. Default is None.
+            name (str, optional): The name of the stream in the URLs. Default is the cam ID or fake cam title.
+            effects (list, optional): The effects to apply, as names or (name, parameters dict) tuples. Default is None.
+            ai (bool, optional): Whether to stream the AI annotated frames, run on the stream thread. Default is False.
+            fps (float, optional): The maximum number of frames encoded per second. Default is None, for every frame.
+            quality (int, optional): The JPEG quality between 0 and 100. Default is 80.
+            host (str, optional): The address the server listens on, when it is not started yet. Default is '127.0.0.1'.
+            port (int, optional): The port the server listens on, when it is not started yet, 0 for any. Default is 8080.
+
+        Returns:
+            str: The URL of the stream.
+        """
+
+        key = fake_window_title or (self.active_cam_id if cam_id is None else cam_id)
+        if key not in self.cams and key not in self.fake_cams: raise Exception(f"Cam [{key}] does not exist.")
+        if ai and self.ai is None: raise Exception("AI is not enabled.")
+
+        name = str(key if name is None else name)
+        if name in self.streams: raise Exception(f"Stream [{name}] already exists.")
+
+        steps = []
+        if effects: steps.append(self.create_effect_chain(effects).apply)
+        if ai: steps.append(lambda frame: self.ai.add_ai_to_frame(frame.copy())[0])
+
+        def process(frame):
+            for step in steps: frame = step(frame)
+            return frame
+
+        source = None
+        if key in self.readers:
+            reader = self.readers[key]
+            source = lambda: reader.wait_for_next(timeout=0.5)[0]
+
+        if self.stream_server is None:
+            from cam_manager.cam_server import MJPEGServer
+            self.stream_server = MJPEGServer(host, port, self.export_telemetry)
+            self.stream_server.start()
+
+        stream = MJPEGStream(name, key, source, process if steps else None, fps, quality, self.telemetry)
+        stream.start()
+        self.streams[name] = stream
+        self.stream_server.add_stream(stream)
+
+        url = self.stream_server.get_url(name)
+        print(f"Streaming cam [{key}] at [{url}].")
+
+        return url
+
+    def publish_frame(self, key, frame) -> None:
+        """
+        Hand a frame read from a cam or fake cam to its streams that have clients, copied once for all of them.
+
+        Parameters:
+            key (int or str): The ID of the cam or the title of the fake cam.
+            frame (ndarray): The frame read.
+        """
+
+        copy = None
+        for stream in self.streams.values():
+            if stream.key == key and stream.source is None and stream.clients:
+                if copy is None: copy = frame.copy()
+                stream.publish(copy)
+
+    def stop_streaming(self, name: str = None, cam_id: int = None, fake_window_title: str = None) -> None:
+        """
+        Stop a stream by its name, or every stream of a cam or fake cam.
+
+        Parameters:
+            name (str, optional): The name of the stream. Default is None.
+            cam_id (int, optional): The ID of the cam whose streams to stop. Default is None.
+            fake_window_title (str, optional): The title of the fake cam window whose streams to stop. Default is None.
+        """
+
+        if name is not None:
+            if name not in self.streams: raise Exception(f"Stream [{name}] does not exist.")
+            names = [name]
+        else:
+            key = fake_window_title or (self.active_cam_id if cam_id is None else cam_id)
+            names = [stream_name for stream_name, stream in self.streams.items() if stream.key == key]
+
+        for stream_name in names:
+            stream = self.streams.pop(stream_name)
+            self.stream_server.remove_stream(stream_name)
+            stream.stop()
+            print(f"Stream [{stream_name}] stopped.")
+
+        if not self.streams and self.stream_server is not None:
+            self.stream_server.stop()
+            self.stream_server = None
+
+    def get_streaming_stats(self) -> dict:
+        """
+        Get the counters of every stream.
+
+        Returns:
+            dict: The clients, frames encoded, skipped and dropped, bytes sent and encoding times keyed by stream name.
+        """
+
+        return {name: stream.get_stats() for name, stream in self.streams.items()}
@@ -0,0 +1,311 @@
+import time
+import bisect
+import threading
+import functools
+
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class LatencyHistogram:
+    """
+    A fixed-bucket latency histogram with Prometheus-compatible buckets.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the buckets in seconds, the last bucket being unbounded.
+        counts (list): The number of observations per bucket, not cumulative.
+        count (int): The number of observations.
+        total (float): The sum of the observations in seconds.
+        max (float): The largest observation in seconds.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the LatencyHistogram class.
+
+        Parameters:
+            buckets (tuple, optional): The upper bounds of the buckets in seconds. Default is DEFAULT_BUCKETS.
+        """
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record one observation.
+
+        Parameters:
+            seconds (float): The latency in seconds.
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile by interpolating within its bucket.
+
+        Parameters:
+            q (float): The percentile between 0 and 100.
+
+        Returns:
+            float: The estimated latency in seconds.
+        """
+
+        if not self.count: return 0.0
+
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+
+        return self.max
+
+class OperationStats:
+    """
+    The counters of one instrumented operation for one cam, AI mode or effect.
+
+    Attributes:
+        histogram (LatencyHistogram): The latencies of the successful calls.
+        errors (int): The number of calls that raised.
+        first_time (float or None): The time.perf_counter() value of the first call.
+        last_time (float or None): The time.perf_counter() value of the last call.
+    """
+
+    def __init__(self, buckets: tuple) -> None:
+        """
+        Initialize the OperationStats class.
+
+        Parameters:
+            buckets (tuple): The upper bounds of the histogram buckets in seconds.
+        """
+
+        self.histogram = LatencyHistogram(buckets)
+        self.errors = 0
+        self.first_time = None
+        self.last_time = None
+
+    def summary(self) -> dict:
+        """
+        Summarize the counters.
+
+        Returns:
+            dict: The call and error counts, the calls per second and the mean, p50, p99 and max latency in milliseconds.
+        """
+
+        histogram = self.histogram
+        elapsed = self.last_time - self.first_time if self.first_time is not None else 0.0
+
+        return {
+            "count": histogram.count,
+            "errors": self.errors,
+            "fps": (histogram.count - 1) / elapsed if elapsed > 0 else 0.0,
+            "mean_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+            "p50_ms": histogram.percentile(50) * 1000,
+            "p99_ms": histogram.percentile(99) * 1000,
+            "max_ms": histogram.max * 1000 }
+
+class Telemetry:
+    """
+    Low-overhead counters and latency histograms of the instrumented operations, per cam, AI mode or effect.
+
+    Attributes:
+        enabled (bool): Whether observations are recorded.
+        buckets (tuple): The upper bounds of the histogram buckets in seconds.
+        operations (dict): The OperationStats of every operation, keyed by operation name and then by key.
+        slow_frame_hook (callable or None): The function called with (operation, key, seconds, result) for slow calls.
+        slow_threshold (float): The latency in seconds above which a call is slow.
+        slow_interval (float): The minimum time in seconds between two slow call samples of the same operation.
+    """
+
+    label_names = {
+        "get_frame": "cam",
+        "capture_image": "cam",
+        "add_ai_to_frame": "mode",
+        "effect": "effect",
+        "stream_encode": "stream" }
+
+    def __init__(self, enabled: bool = True, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        """
+        Initialize the Telemetry class.
+
+        Parameters:
+            enabled (bool, optional): Whether observations are recorded. Default is True.
+            buckets (tuple, optional): The upper bounds of the histogram buckets in seconds. Default is DEFAULT_BUCKETS.
+        """
+
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.operations = {}
+        self.lock = threading.Lock()
+
+        self.slow_frame_hook = None
+        self.slow_threshold = 0.1
+        self.slow_interval = 1.0
+        self.slow_sample_times = {}
+
+    def observe(self, operation: str, key, seconds: float, error: bool = False, result=None) -> None:
+        """
+        Record one call of an operation.
+
+        Parameters:
+            operation (str): The name of the operation.
+            key (any): The cam ID, AI mode or effect name the call belongs to.
+            seconds (float): The latency of the call in seconds.
+            error (bool, optional): Whether the call raised. Default is False.
+            result (any, optional): The result of the call, passed to the slow frame hook. Default is None.
+        """
+
+        now = time.perf_counter()
+
+        with self.lock:
+            stats = self.operations.setdefault(operation, {}).get(key)
+            if stats is None: stats = self.operations[operation][key] = OperationStats(self.buckets)
+
+            if stats.first_time is None: stats.first_time = now
+            stats.last_time = now
+
+            if error: stats.errors += 1
+            else: stats.histogram.observe(seconds)
+
+            sample = self.slow_frame_hook is not None and seconds >= self.slow_threshold and \
+                now - self.slow_sample_times.get(operation, float("-inf")) >= self.slow_interval
+            if sample: self.slow_sample_times[operation] = now
+
+        if sample:
+            try: self.slow_frame_hook(operation, key, seconds, result)
+            except Exception as e: print(f"Slow frame hook failed - {e}")
+
+    def set_slow_frame_hook(self, hook, threshold_ms: float = 100.0, min_interval: float = 1.0) -> None:
+        """
+        Set a function sampling slow calls, for example to log, profile or save the offending frame.
+
+        Parameters:
+            hook (callable or None): The function called with (operation, key, seconds, result), or None to remove it.
+            threshold_ms (float, optional): The latency in milliseconds above which a call is slow. Default is 100.0.
+            min_interval (float, optional): The minimum time in seconds between two samples of the same operation. Default is 1.0.
+        """
+
+        self.slow_frame_hook = hook
+        self.slow_threshold = threshold_ms / 1000
+        self.slow_interval = min_interval
+        self.slow_sample_times = {}
+
+    def get_stats(self) -> dict:
+        """
+        Get the summary of every operation.
+
+        Returns:
+            dict: The summaries keyed by operation name and then by cam ID, AI mode or effect name.
+        """
+
+        with self.lock:
+            return {operation: {key: stats.summary() for key, stats in keys.items()} for operation, keys in self.operations.items()}
+
+    def to_prometheus(self, prefix: str = "cam_manager", counters: dict = None) -> str:
+        """
+        Export the counters in the Prometheus text exposition format.
+
+        Parameters:
+            prefix (str, optional): The prefix of the metric names. Default is 'cam_manager'.
+            counters (dict, optional): Extra counters to export, as {name: {cam: value}}. Default is None.
+
+        Returns:
+            str: The metrics, one histogram and one error counter per operation, then the extra counters.
+        """
+
+        def label(name, value):
+            value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            return f'{name}="{value}"'
+
+        lines = []
+        with self.lock:
+            for operation, keys in sorted(self.operations.items()):
+                name = f"{prefix}_{operation}"
+                label_name = self.label_names.get(operation, "key")
+
+                lines.append(f"# HELP {name}_seconds Latency of {operation} calls.")
+                lines.append(f"# TYPE {name}_seconds histogram")
+                for key, stats in keys.items():
+                    labels = label(label_name, key)
+                    cumulative = 0
+                    for bound, bucket_count in zip(stats.histogram.buckets + ("+Inf",), stats.histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_seconds_sum{{{labels}}} {stats.histogram.total}")
+                    lines.append(f"{name}_seconds_count{{{labels}}} {stats.histogram.count}")
+
+                lines.append(f"# HELP {name}_errors_total Failed {operation} calls.")
+                lines.append(f"# TYPE {name}_errors_total counter")
+                for key, stats in keys.items():
+                    lines.append(f"{name}_errors_total{{{label(label_name, key)}}} {stats.errors}")
+
+        for counter, values in sorted((counters or {}).items()):
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            for key, value in values.items(): lines.append(f"{prefix}_{counter}_total{{{label('cam', key)}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all counters."""
+
+        with self.lock:
+            self.operations = {}
+            self.slow_sample_times = {}
+
+def cam_key(self, cam_id=None, fake_window_title: str = None, *args, **kwargs) -> any:
+    """
+    Get the telemetry key of a call taking a cam ID and a fake cam title, falling back to the active cam.
+
+    Parameters:
+        self (CamManager): The manager.
+        cam_id (int, optional): The ID of the cam. Default is None.
+        fake_window_title (str, optional): The title of the fake cam. Default is None.
+
+    Returns:
+        any: The cam ID or fake cam title.
+    """
+
+    return fake_window_title or (self.active_cam_id if cam_id is None else cam_id)
+
+def instrumented(operation: str, key=None):
+    """
+    Decorate a method so its calls are recorded in the telemetry of its object, if it has one.
+
+    Parameters:
+        operation (str): The name of the operation.
+        key (any, optional): The key of the calls, or a function taking the method arguments and returning it.
+            Default is the 'mode' attribute of the object.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            telemetry = getattr(self, "telemetry", None)
+            if telemetry is None or not telemetry.enabled: return method(self, *args, **kwargs)
+
+            if callable(key): call_key = key(self, *args, **kwargs)
+            else: call_key = key if key is not None else getattr(self, "mode", None)
+
+            start = time.perf_counter()
+            try: result = method(self, *args, **kwargs)
+            except Exception:
+                telemetry.observe(operation, call_key, time.perf_counter() - start, error=True)
+                raise
+
+            telemetry.observe(operation, call_key, time.perf_counter() - start, result=result)
+            return result
+
+        return wrapper
+
+    return decorator
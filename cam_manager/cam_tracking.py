@@ -0,0 +1,313 @@
+import time
+
+import numpy as np
+
+def box_iou(boxes_a, boxes_b) -> any:
+    """
+    Compute the pairwise intersection over union of two sets of boxes.
+
+    Parameters:
+        boxes_a (ndarray): The first boxes as an (N, 4) array of x1, y1, x2, y2.
+        boxes_b (ndarray): The second boxes as an (M, 4) array of x1, y1, x2, y2.
+
+    Returns:
+        any: The (N, M) IoU matrix.
+    """
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+class Track:
+    """
+    A tracked object with a constant-velocity motion model.
+
+    Attributes:
+        track_id (int): The stable ID of the track.
+        box (ndarray): The current box as x1, y1, x2, y2.
+        velocity (ndarray): The box motion per frame.
+        entry (dict): The AI data entry of the last detection of the object.
+        frames_since_update (int): The number of frames since the last detection was matched.
+        missed (int): The number of consecutive keyframes without a matching detection.
+    """
+
+    def __init__(self, track_id: int, box, entry: dict) -> None:
+        """
+        Initialize the Track class.
+
+        Parameters:
+            track_id (int): The stable ID of the track.
+            box (ndarray): The detected box as x1, y1, x2, y2.
+            entry (dict): The AI data entry of the detection.
+        """
+
+        self.track_id = track_id
+        self.box = box.astype(np.float64)
+        self.velocity = np.zeros(4)
+        self.entry = entry
+        self.frames_since_update = 0
+        self.missed = 0
+
+    def predict(self) -> None:
+        """Advance the box by one frame."""
+
+        self.box = self.box + self.velocity
+        self.frames_since_update += 1
+
+    def update(self, box, entry: dict, smoothing: float = 0.5) -> None:
+        """
+        Correct the track with a matched detection.
+
+        Parameters:
+            box (ndarray): The detected box as x1, y1, x2, y2.
+            entry (dict): The AI data entry of the detection.
+            smoothing (float, optional): The weight of the newly measured velocity. Default is 0.5.
+        """
+
+        frames = max(self.frames_since_update, 1)
+        origin = self.box - self.velocity * self.frames_since_update
+        measured = (box - origin) / frames
+
+        self.velocity = (1 - smoothing) * self.velocity + smoothing * measured
+        self.box = box.astype(np.float64)
+        self.entry = entry
+        self.frames_since_update = 0
+        self.missed = 0
+
+    def offset(self) -> any:
+        """
+        Get the motion of the box center since the last detection.
+
+        Returns:
+            any: The x and y offset.
+        """
+
+        delta = self.velocity * self.frames_since_update
+        return np.array([(delta[0] + delta[2]) / 2, (delta[1] + delta[3]) / 2])
+
+class IoUTracker:
+    """
+    A greedy IoU tracker propagating detection and pose boxes between keyframes with a constant-velocity model.
+
+    Attributes:
+        iou_threshold (float): The minimum IoU between a predicted track and a detection to match them.
+        max_missed (int): The number of consecutive keyframes a track may go unmatched before it is dropped.
+        tracks (list): The active tracks.
+        next_id (int): The ID given to the next new track.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 1) -> None:
+        """
+        Initialize the IoUTracker class.
+
+        Parameters:
+            iou_threshold (float, optional): The minimum IoU to match a track and a detection. Default is 0.3.
+            max_missed (int, optional): The unmatched keyframes after which a track is dropped. Default is 1.
+        """
+
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_id = 1
+
+    def entry_box(self, entry: dict) -> any:
+        """
+        Get the box of an AI data entry, deriving it from the keypoints for pose entries.
+
+        Parameters:
+            entry (dict): The AI data entry.
+
+        Returns:
+            any: The box as x1, y1, x2, y2, or None if the entry has no location.
+        """
+
+        if "box" in entry: return np.asarray(entry["box"], dtype=np.float64)
+
+        if "pose" in entry:
+            points = np.asarray(entry["pose"], dtype=np.float64).reshape(-1, 2)
+            points = points[(points[:, 0] > 0) | (points[:, 1] > 0)]
+            if len(points): return np.concatenate([points.min(axis=0), points.max(axis=0)])
+
+        return None
+
+    def update(self, ai_data: list) -> list:
+        """
+        Match the AI data of a keyframe to the tracks and tag each entry with its track ID.
+
+        Parameters:
+            ai_data (list): The AI data of the keyframe.
+
+        Returns:
+            list: All AI data entries in their order, each with a 'track_id' key, None for entries without a location.
+        """
+
+        for track in self.tracks: track.predict()
+
+        entries = []
+        boxes = []
+        for entry in ai_data:
+            box = self.entry_box(entry)
+            if box is not None:
+                entries.append(entry)
+                boxes.append(box)
+            else: entry["track_id"] = None
+
+        unmatched_tracks = set(range(len(self.tracks)))
+        unmatched_entries = set(range(len(entries)))
+
+        if self.tracks and entries:
+            iou = box_iou(np.array([track.box for track in self.tracks]), np.array(boxes))
+
+            for index in np.argsort(iou, axis=None)[::-1]:
+                t, e = np.unravel_index(index, iou.shape)
+                if iou[t, e] < self.iou_threshold: break
+                if t not in unmatched_tracks or e not in unmatched_entries: continue
+                if entries[e].get("class") != self.tracks[t].entry.get("class"): continue
+
+                self.tracks[t].update(boxes[e], entries[e])
+                entries[e]["track_id"] = self.tracks[t].track_id
+                unmatched_tracks.discard(t)
+                unmatched_entries.discard(e)
+
+        for t in unmatched_tracks: self.tracks[t].missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        for e in sorted(unmatched_entries):
+            track = Track(self.next_id, boxes[e], entries[e])
+            entries[e]["track_id"] = track.track_id
+            self.tracks.append(track)
+            self.next_id += 1
+
+        return list(ai_data)
+
+    def propagate(self) -> list:
+        """
+        Advance every track by one frame and produce AI data for the predicted positions.
+
+        Returns:
+            list: The predicted AI data entries, each with 'track_id' and 'predicted' keys.
+        """
+
+        ai_data = []
+
+        for track in self.tracks:
+            track.predict()
+            if track.missed: continue
+
+            entry = {key: value for key, value in track.entry.items() if key != "pose"}
+            entry["predicted"] = True
+            if "box" in track.entry: entry["box"] = np.round(track.box).astype(int).tolist()
+            if "pose" in track.entry:
+                offset = track.offset()
+                entry["pose"] = [[x + offset[0], y + offset[1]] if x > 0 or y > 0 else [x, y] for x, y in track.entry["pose"]]
+
+            ai_data.append(entry)
+
+        return ai_data
+
+class KeyframeScheduler:
+    """
+    A wrapper around CamAIMixin running full inference only on keyframes and tracking objects in between.
+
+    Keyframes are taken every keyframe_interval frames or, with a latency budget, whenever the budget saved on the frames
+    since the last keyframe covers the cost of an inference. Supports the detection and pose modes. Use one per cam.
+
+    Attributes:
+        ai (CamAIMixin): The AI processor.
+        tracker (IoUTracker): The tracker propagating results between keyframes.
+        keyframe_interval (int): The number of frames between keyframes when no latency budget is set.
+        latency_budget (float or None): The processing time per output frame in seconds the scheduler aims for.
+        frames (int): The number of frames processed.
+        keyframes (int): The number of frames on which full inference ran.
+    """
+
+    def __init__(self, ai, keyframe_interval: int = 5, latency_budget: float = None, tracker: IoUTracker = None) -> None:
+        """
+        Initialize the KeyframeScheduler class.
+
+        Parameters:
+            ai (CamAIMixin): The AI processor.
+            keyframe_interval (int, optional): The number of frames between keyframes. Default is 5.
+            latency_budget (float, optional): The target processing time per output frame in seconds. Default is None.
+            tracker (IoUTracker, optional): The tracker to use. Default is a new IoUTracker.
+        """
+
+        if ai.mode not in ("detection", "pose"): raise Exception(f"Keyframe scheduling does not support AI mode [{ai.mode}].")
+        if getattr(ai, "result_format", "dicts") != "dicts": raise Exception("Keyframe scheduling requires the 'dicts' result format.")
+
+        self.ai = ai
+        self.tracker = tracker or IoUTracker()
+        self.keyframe_interval = keyframe_interval
+        self.latency_budget = latency_budget
+
+        self.frames = 0
+        self.keyframes = 0
+        self.credit = 0.0
+        self.inference_time = 0.0
+        self.start_time = None
+
+    def is_keyframe(self) -> bool:
+        """
+        Decide whether the next frame is a keyframe.
+
+        Returns:
+            bool: True if full inference should run on the next frame.
+        """
+
+        if self.keyframes == 0: return True
+        if self.latency_budget is not None: return self.credit >= self.inference_time
+
+        return self.frames % self.keyframe_interval == 0
+
+    def add_ai_to_frame(self, frame) -> tuple:
+        """
+        Add AI processing to the frame, running the model on keyframes and the tracker on other frames.
+
+        Parameters:
+            frame (ndarray): The input frame for processing.
+
+        Returns:
+            tuple: The processed frame and AI data, where every entry carries a 'track_id', None if it has no location.
+        """
+
+        if self.start_time is None: self.start_time = time.monotonic()
+
+        if self.is_keyframe():
+            start = time.perf_counter()
+            frame, ai_data = self.ai.add_ai_to_frame(frame)
+            self.inference_time = time.perf_counter() - start
+
+            ai_data = self.tracker.update(ai_data)
+            self.keyframes += 1
+            self.credit = 0.0
+        else:
+            ai_data = self.tracker.propagate()
+            if self.ai.draw: self.ai.draw_ai_data(frame, ai_data)
+            if self.latency_budget is not None: self.credit += self.latency_budget
+
+        self.frames += 1
+        return frame, ai_data
+
+    def get_stats(self) -> dict:
+        """
+        Get the output and effective detection rates.
+
+        Returns:
+            dict: The frame and keyframe counts, the output and model rates per second and the last inference time in milliseconds.
+        """
+
+        elapsed = time.monotonic() - self.start_time if self.start_time else 0.0
+
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "output_fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "detection_fps": self.keyframes / elapsed if elapsed > 0 else 0.0,
+            "inference_ms": self.inference_time * 1000 }
@@ -0,0 +1,196 @@
+import select
+import threading
+
+import Xlib.threaded # pylint: disable=unused-import
+from Xlib import X, display, error
+
+class WindowIndex:
+    """
+    A title to window index of the X11 client windows, kept up to date by a listener thread.
+
+    The listener watches the _NET_CLIENT_LIST property of the root window and the name properties of every client,
+    so lookups are answered from memory without any round trip to the X server. Windows are returned on a persistent
+    display connection shared by all lookups.
+
+    Attributes:
+        display (Xlib.display.Display): The connection the returned windows belong to.
+        events (Xlib.display.Display): The connection the listener thread reads events from.
+        root (any): The root window.
+        titles (dict): The title of every client window, keyed by window ID.
+        order (list): The client window IDs in _NET_CLIENT_LIST order.
+        windows_by_title (dict): The ID of the first client window with each title.
+        poll_interval (float): The time in seconds the listener waits for events before checking whether to stop.
+    """
+
+    def __init__(self, display_name: str = None, poll_interval: float = 0.2) -> None:
+        """
+        Initialize the WindowIndex class and build the index.
+
+        Parameters:
+            display_name (str, optional): The X display to connect to. Default is the DISPLAY environment variable.
+            poll_interval (float, optional): The time in seconds the listener waits for events per loop. Default is 0.2.
+        """
+
+        self.display = display.Display(display_name)
+        self.events = display.Display(display_name)
+        self.root = self.events.screen().root
+        self.poll_interval = poll_interval
+
+        self.atoms = {name: self.events.intern_atom(name) for name in ("_NET_CLIENT_LIST", "_NET_WM_NAME", "WM_NAME", "UTF8_STRING")}
+        self.name_atoms = (self.atoms["_NET_WM_NAME"], self.atoms["WM_NAME"])
+
+        self.titles = {}
+        self.order = []
+        self.windows_by_title = {}
+        self.lock = threading.Lock()
+
+        self.running = False
+        self.thread = None
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self.sync_clients()
+
+    def read_client_list(self) -> list:
+        """
+        Read the client window IDs from the root window.
+
+        Returns:
+            list: The client window IDs, empty if no window manager publishes _NET_CLIENT_LIST.
+        """
+
+        prop = self.root.get_full_property(self.atoms["_NET_CLIENT_LIST"], X.AnyPropertyType)
+        return list(prop.value) if prop else []
+
+    def read_title(self, window_id: int) -> any:
+        """
+        Read the title of a window, preferring the UTF-8 _NET_WM_NAME over WM_NAME.
+
+        Parameters:
+            window_id (int): The ID of the window.
+
+        Returns:
+            any: The title, or None if the window has no title or no longer exists.
+        """
+
+        window = self.events.create_resource_object("window", window_id)
+
+        try:
+            prop = window.get_full_property(self.atoms["_NET_WM_NAME"], self.atoms["UTF8_STRING"])
+            if prop and prop.value: return prop.value.decode(errors="replace") if isinstance(prop.value, bytes) else str(prop.value)
+
+            title = window.get_wm_name()
+            return title.decode(errors="replace") if isinstance(title, bytes) else title
+        except error.XError: return None
+
+    def rebuild_lookup(self) -> None:
+        """Rebuild the title lookup from the titles, keeping the first window of each title. Must hold the lock."""
+
+        self.windows_by_title = {}
+        for window_id in self.order:
+            title = self.titles.get(window_id)
+            if title and title not in self.windows_by_title: self.windows_by_title[title] = window_id
+
+    def sync_clients(self) -> None:
+        """Re-read the client list, reading the titles of new windows and dropping closed ones."""
+
+        order = self.read_client_list()
+        catcher = error.CatchError(error.BadWindow)
+
+        new_titles = {}
+        for window_id in order:
+            if window_id in self.titles: continue
+
+            window = self.events.create_resource_object("window", window_id)
+            window.change_attributes(event_mask=X.PropertyChangeMask, onerror=catcher)
+            new_titles[window_id] = self.read_title(window_id)
+
+        with self.lock:
+            self.titles = {window_id: new_titles[window_id] if window_id in new_titles else self.titles[window_id] for window_id in order}
+            self.order = order
+            self.rebuild_lookup()
+
+    def update_title(self, window_id: int) -> None:
+        """
+        Re-read the title of a client window after its name changed.
+
+        Parameters:
+            window_id (int): The ID of the window.
+        """
+
+        if window_id not in self.titles: return
+
+        title = self.read_title(window_id)
+        with self.lock:
+            if window_id not in self.titles: return
+            self.titles[window_id] = title
+            self.rebuild_lookup()
+
+    def handle_event(self, event) -> None:
+        """
+        Update the index for a single X event.
+
+        Parameters:
+            event (any): The X event.
+        """
+
+        if event.type != X.PropertyNotify: return
+
+        if event.window.id == self.root.id:
+            if event.atom == self.atoms["_NET_CLIENT_LIST"]: self.sync_clients()
+        elif event.atom in self.name_atoms: self.update_title(event.window.id)
+
+    def run(self) -> None:
+        """Process X events until the index is closed."""
+
+        fd = self.events.fileno()
+
+        while self.running:
+            if not self.events.pending_events(): select.select([fd], [], [], self.poll_interval)
+
+            while self.running and self.events.pending_events():
+                try: self.handle_event(self.events.next_event())
+                except error.XError as e: print(f"Window index failed to handle an event - {e}")
+
+    def start(self) -> None:
+        """Start the listener thread."""
+
+        if self.running: return
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="WindowIndex", daemon=True)
+        self.thread.start()
+
+    def get_titles(self) -> list:
+        """
+        Get the titles of all client windows.
+
+        Returns:
+            list: The non-empty titles in _NET_CLIENT_LIST order.
+        """
+
+        with self.lock: return [self.titles[window_id] for window_id in self.order if self.titles.get(window_id)]
+
+    def find(self, title: str) -> any:
+        """
+        Get a window by its title.
+
+        Parameters:
+            title (str): The title of the window.
+
+        Returns:
+            any: The Xlib window, or None if no client window has the title.
+        """
+
+        with self.lock: window_id = self.windows_by_title.get(title)
+        if window_id is None: return None
+
+        return self.display.create_resource_object("window", window_id)
+
+    def close(self) -> None:
+        """Stop the listener thread and close the display connections."""
+
+        self.running = False
+        if self.thread is not None: self.thread.join(self.poll_interval * 5)
+
+        self.events.close()
+        self.display.close()
@@ -0,0 +1,688 @@
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+
+import cv2
+import numpy as np
+
+from cam_manager.cam_telemetry import instrumented
+
+HEADER_LATEST = 0
+HEADER_STOPPED = 1
+HEADER_FIELDS = 2
+
+SHAPE_PROPERTIES = (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FOURCC, cv2.CAP_PROP_FORMAT, cv2.CAP_PROP_CONVERT_RGB)
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory block without taking over its cleanup, which stays with the parent process.
+
+    Before Python 3.13 the block is registered again with the resource tracker of the parent, which workers share since
+    the parent starts it before them.
+
+    Parameters:
+        name (str): The name of the block.
+
+    Returns:
+        shared_memory.SharedMemory: The attached block.
+    """
+
+    try: return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: return shared_memory.SharedMemory(name=name)
+
+class FrameRing:
+    """
+    A view of the shared memory ring buffer holding the frames of a camera worker.
+
+    The block starts with an int64 header (latest sequence number, stopped flag, then the sequence number and
+    time.monotonic_ns() timestamp of every slot) followed by the frame slots. A slot's sequence number is -1 while it is
+    being written, so readers can detect torn frames.
+
+    Attributes:
+        shm (shared_memory.SharedMemory): The shared memory block.
+        slots (int): The number of frame slots.
+        header (ndarray): The header fields.
+        slot_seqs (ndarray): The sequence number of the frame held by each slot.
+        slot_times (ndarray): The capture timestamp in nanoseconds of the frame held by each slot.
+        frames (ndarray): The frame slots.
+    """
+
+    def __init__(self, shm, shape: tuple, dtype: str, slots: int) -> None:
+        """
+        Initialize the FrameRing class.
+
+        Parameters:
+            shm (shared_memory.SharedMemory): The shared memory block.
+            shape (tuple): The shape of a frame.
+            dtype (str): The data type of a frame.
+            slots (int): The number of frame slots.
+        """
+
+        self.shm = shm
+        self.slots = slots
+
+        header_size = HEADER_FIELDS + 2 * slots
+        header = np.ndarray((header_size,), dtype=np.int64, buffer=shm.buf)
+
+        self.header = header[:HEADER_FIELDS]
+        self.slot_seqs = header[HEADER_FIELDS:HEADER_FIELDS + slots]
+        self.slot_times = header[HEADER_FIELDS + slots:]
+        self.frames = np.ndarray((slots, *shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=header_size * 8)
+
+    @staticmethod
+    def size(shape: tuple, dtype: str, slots: int) -> int:
+        """
+        Get the size of the shared memory block needed for a ring.
+
+        Parameters:
+            shape (tuple): The shape of a frame.
+            dtype (str): The data type of a frame.
+            slots (int): The number of frame slots.
+
+        Returns:
+            int: The size in bytes.
+        """
+
+        return (HEADER_FIELDS + 2 * slots) * 8 + slots * int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    def release(self) -> None:
+        """Drop the array views and close the shared memory handle."""
+
+        self.header = self.slot_seqs = self.slot_times = self.frames = None
+        self.shm.close()
+
+def open_source(source, capture_method=None) -> any:
+    """
+    Open a capture source.
+
+    Parameters:
+        source (any): A cam index, a video path or URL, or a picklable callable returning a capture object.
+        capture_method (optional): The method used to capture the video stream. Default is None.
+
+    Returns:
+        any: The capture object.
+    """
+
+    if callable(source): return source()
+    if capture_method is None: return cv2.VideoCapture(source)
+    return cv2.VideoCapture(source, capture_method)
+
+def run_cam_worker(source, capture_method, conn, condition, stop_event) -> None:
+    """
+    Read frames from a source in a worker process and publish them into a shared memory ring.
+
+    Parameters:
+        source (any): A cam index, a video path or URL, or a picklable callable returning a capture object.
+        capture_method (optional): The method used to capture the video stream.
+        conn (multiprocessing.connection.Connection): The command pipe to the parent process.
+        condition (multiprocessing.Condition): The condition notified after each published frame.
+        stop_event (multiprocessing.Event): The event set by the parent to stop the worker.
+    """
+
+    cap = open_source(source, capture_method)
+    if not cap.isOpened():
+        conn.send(("error", f"Failed to open cam [{source}]."))
+        return
+
+    ret, frame = cap.read()
+    if not ret:
+        conn.send(("error", f"Failed to read frame from cam [{source}]."))
+        return
+
+    conn.send(("shape", frame.shape, frame.dtype.str))
+    message = conn.recv()
+    if message[0] != "shm": return
+
+    _, name, slots = message
+    ring = FrameRing(attach_shared_memory(name), frame.shape, frame.dtype.str, slots)
+    conn.send(("ready",))
+
+    seq = 0
+    try:
+        while not stop_event.is_set():
+            while conn.poll():
+                command = conn.recv()
+                if command[0] == "get": conn.send(("value", command[1], cap.get(command[2])))
+                elif command[0] == "set": conn.send(("value", command[1], cap.set(command[2], command[3])))
+
+            if seq > 0:
+                slot = (seq + 1) % slots
+                ring.slot_seqs[slot] = -1
+                ret, read = cap.read(ring.frames[slot])
+                if not ret: break
+                if read is not ring.frames[slot]:
+                    if read.shape != frame.shape:
+                        conn.send(("error", f"Frame shape of cam [{source}] changed from {frame.shape} to {read.shape}."))
+                        break
+                    ring.frames[slot][...] = read
+            else:
+                slot = 1 % slots
+                ring.frames[slot][...] = frame
+
+            seq += 1
+            ring.slot_times[slot] = time.monotonic_ns()
+            ring.slot_seqs[slot] = seq
+            ring.header[HEADER_LATEST] = seq
+
+            with condition: condition.notify_all()
+    finally:
+        ring.header[HEADER_STOPPED] = 1
+        with condition: condition.notify_all()
+
+        cap.release()
+        ring.release()
+
+class ProcessCapture:
+    """
+    A cv2.VideoCapture compatible proxy for a camera read by a worker process.
+
+    Frames travel through a shared memory ring buffer, so only small commands are pickled between processes.
+    read() returns a frame newer than the last one returned, copying it out of the ring.
+
+    Attributes:
+        source (any): The cam index, video path or capture factory read by the worker.
+        slots (int): The number of frame slots in the ring.
+        shape (tuple): The shape of the frames.
+        last_seq (int): The sequence number of the last frame returned.
+        last_timestamp (float or None): The time.monotonic() capture time of the last frame returned.
+        timeout (float): The maximum time in seconds to wait for a frame.
+        error (str or None): The error the worker stopped with, or None.
+        lock (threading.RLock): The lock pairing each command with its reply when several threads use the capture.
+    """
+
+    def __init__(self, source, capture_method=None, slots: int = 4, timeout: float = 5.0, start_method: str = "spawn") -> None:
+        """
+        Initialize the ProcessCapture class and start its worker process.
+
+        Parameters:
+            source (any): A cam index, a video path or URL, or a picklable callable returning a capture object.
+            capture_method (optional): The method used to capture the video stream. Default is None.
+            slots (int, optional): The number of frame slots in the ring. Default is 4.
+            timeout (float, optional): The maximum time in seconds to wait for a frame. Default is 5.0.
+            start_method (str, optional): The multiprocessing start method of the worker. Default is 'spawn'.
+        """
+
+        self.source = source
+        self.slots = slots
+        self.timeout = timeout
+        self.shape = None
+        self.ring = None
+        self.shm = None
+
+        self.last_seq = 0
+        self.last_timestamp = None
+        self.grabbed_seq = None
+        self.command_id = 0
+        self.error = None
+        self.lock = threading.RLock()
+
+        resource_tracker.ensure_running()
+        context = mp.get_context(start_method)
+        self.conn, child_conn = context.Pipe()
+        self.condition = context.Condition()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=run_cam_worker, args=(source, capture_method, child_conn, self.condition, self.stop_event),
+            name=f"CamWorker-{source}", daemon=True)
+        self.process.start()
+
+        try: self.attach()
+        except Exception:
+            self.release()
+            raise
+
+    def attach(self) -> None:
+        """Create the shared memory ring once the worker reported the frame shape."""
+
+        if not self.conn.poll(self.timeout): raise Exception(f"Worker for cam [{self.source}] did not start.")
+
+        message = self.conn.recv()
+        if message[0] == "error": raise Exception(message[1])
+
+        _, shape, dtype = message
+        self.shape = shape
+        self.shm = shared_memory.SharedMemory(create=True, size=FrameRing.size(shape, dtype, self.slots))
+        self.ring = FrameRing(self.shm, shape, dtype, self.slots)
+        self.ring.header[:] = 0
+        self.ring.slot_seqs[:] = 0
+
+        self.conn.send(("shm", self.shm.name, self.slots))
+        if not self.conn.poll(self.timeout) or self.conn.recv()[0] != "ready":
+            raise Exception(f"Worker for cam [{self.source}] did not attach to its frame ring.")
+
+    def isOpened(self) -> bool:
+        """
+        Check whether the worker is running.
+
+        Returns:
+            bool: True if frames can be read.
+        """
+
+        return self.ring is not None and self.process.is_alive() and not self.ring.header[HEADER_STOPPED]
+
+    def wait(self, seq: int, timeout: float) -> bool:
+        """
+        Wait for a frame newer than a sequence number.
+
+        Parameters:
+            seq (int): The sequence number to wait past.
+            timeout (float): The maximum time to wait in seconds.
+
+        Returns:
+            bool: True if a newer frame is available.
+        """
+
+        header = self.ring.header
+        with self.condition:
+            self.condition.wait_for(lambda: header[HEADER_LATEST] > seq or header[HEADER_STOPPED] or not self.process.is_alive(), timeout)
+
+        return header[HEADER_LATEST] > seq
+
+    def copy_latest(self, image=None) -> tuple:
+        """
+        Copy the newest frame out of the ring, retrying if the worker overwrote it during the copy.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to copy into. Default is None.
+
+        Returns:
+            tuple: The frame, its sequence number and its time.monotonic() timestamp.
+        """
+
+        if image is None or image.shape != self.ring.frames.shape[1:]: image = np.empty_like(self.ring.frames[0])
+
+        while True:
+            seq = int(self.ring.header[HEADER_LATEST])
+            slot = seq % self.slots
+
+            timestamp = int(self.ring.slot_times[slot])
+            np.copyto(image, self.ring.frames[slot])
+            if self.ring.slot_seqs[slot] == seq: return image, seq, timestamp / 1e9
+
+    def grab(self) -> bool:
+        """
+        Wait for a frame newer than the last one returned.
+
+        Returns:
+            bool: True if a frame is available.
+        """
+
+        if self.ring is None or not self.wait(self.last_seq, self.timeout):
+            if self.ring is not None and self.error is None and not self.isOpened(): self.read_messages()
+            return False
+
+        self.grabbed_seq = int(self.ring.header[HEADER_LATEST])
+        return True
+
+    def retrieve(self, image=None) -> tuple:
+        """
+        Copy the grabbed frame out of the ring.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to copy into. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        if self.grabbed_seq is None: return False, None
+        self.grabbed_seq = None
+
+        frame, self.last_seq, self.last_timestamp = self.copy_latest(image)
+        return True, frame
+
+    def read(self, image=None) -> tuple:
+        """
+        Wait for and copy a frame newer than the last one returned.
+
+        Parameters:
+            image (ndarray, optional): A buffer of the frame shape to copy into. Default is None.
+
+        Returns:
+            tuple: A success flag and the frame.
+        """
+
+        if not self.grab(): return False, None
+        return self.retrieve(image)
+
+    def read_messages(self, command_id: int = None, timeout: float = 0.0) -> any:
+        """
+        Read the messages of the worker until the reply to a command, skipping replies to commands given up on.
+
+        An error message is kept in error and printed.
+
+        Parameters:
+            command_id (int, optional): The ID of the command to wait for. Default is None, to only read pending messages.
+            timeout (float, optional): The maximum time to wait for the reply in seconds. Default is 0.0.
+
+        Returns:
+            any: The reply value, or None if the worker did not answer.
+        """
+
+        with self.lock:
+            deadline = time.monotonic() + timeout
+
+            while self.conn.poll(max(deadline - time.monotonic(), 0)):
+                try: message = self.conn.recv()
+                except (EOFError, OSError): return None
+
+                if message[0] == "error":
+                    self.error = message[1]
+                    print(f"Worker for cam [{self.source}] stopped - {self.error}")
+                elif command_id is not None and message[1] == command_id: return message[2]
+
+            return None
+
+    def command(self, *command) -> any:
+        """
+        Send a command to the worker and wait for its reply.
+
+        Parameters:
+            *command: The command name and its arguments.
+
+        Returns:
+            any: The reply value, or None if the worker did not answer.
+        """
+
+        if not self.isOpened(): return None
+
+        with self.lock:
+            self.command_id += 1
+            self.conn.send((command[0], self.command_id, *command[1:]))
+            return self.read_messages(self.command_id, self.timeout)
+
+    def get(self, prop_id: int) -> float:
+        """
+        Get a capture property from the worker.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+
+        Returns:
+            float: The property value.
+        """
+
+        value = self.command("get", prop_id)
+        return 0.0 if value is None else value
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """
+        Set a capture property in the worker.
+
+        Properties that change the frame shape (size, FOURCC, format, RGB conversion) are refused, since the frame ring
+        is sized for the first frame.
+
+        Parameters:
+            prop_id (int): The OpenCV property ID.
+            value (float): The value to set.
+
+        Returns:
+            bool: True if the property was set.
+        """
+
+        if prop_id in SHAPE_PROPERTIES: return False
+        return bool(self.command("set", prop_id, value))
+
+    def release(self) -> None:
+        """Stop the worker and free the shared memory ring."""
+
+        self.stop_event.set()
+        with self.condition: self.condition.notify_all()
+
+        self.process.join(self.timeout)
+        if self.process.is_alive(): self.process.terminate()
+
+        if self.ring is not None:
+            self.ring.release()
+            self.ring = None
+        if self.shm is not None:
+            self.shm.unlink()
+            self.shm = None
+
+def run_inference_worker(mode: str, ai_options: dict, conn) -> None:
+    """
+    Run AI processing in a worker process on frames published into a shared memory ring.
+
+    Frames are processed in place, so drawn results are visible to the parent through the ring.
+
+    Parameters:
+        mode (str): The AI mode.
+        ai_options (dict): Extra keyword arguments for CamAIMixin.
+        conn (multiprocessing.connection.Connection): The command pipe to the parent process.
+    """
+
+    from cam_manager.cam_ai import CamAIMixin
+
+    ai = CamAIMixin(mode, **ai_options)
+    ring = None
+    names_sent = False
+
+    try:
+        while True:
+            message = conn.recv()
+
+            if message[0] == "stop": break
+            if message[0] == "shm":
+                if ring is not None: ring.release()
+                _, name, shape, dtype, slots = message
+                ring = FrameRing(attach_shared_memory(name), shape, dtype, slots)
+            elif message[0] == "infer":
+                _, slot, seq = message
+                try:
+                    _, ai_data = ai.add_ai_to_frame(ring.frames[slot])
+                    conn.send(("result", seq, ai_data, None if names_sent else ai.model.names))
+                    names_sent = True
+                except Exception as e: conn.send(("error", seq, str(e)))
+    except EOFError: pass
+    finally:
+        if ring is not None: ring.release()
+
+class InferenceWorker:
+    """
+    AI processing in a worker process, fed through a shared memory ring so only the AI data is pickled.
+
+    Frames can be submitted ahead of collecting their results, up to the number of slots, so several workers
+    (for example one per cam) run their models in parallel.
+
+    Attributes:
+        mode (str): The AI mode of the worker.
+        draw (bool): Whether the worker draws the AI results on the frames.
+        slots (int): The number of frames that can be in flight.
+        timeout (float): The maximum time in seconds to wait for a result.
+        pending (list): The sequence numbers and slots of the submitted frames awaiting their result.
+        restarts (int): The number of times the worker process was restarted after failing to answer.
+        lock (threading.RLock): The lock keeping submit and result of a frame together when several threads share the worker.
+        telemetry (Telemetry or None): The telemetry recording add_ai_to_frame, set by CamManager.
+        names (dict or None): The class names of the model, sent by the worker with its first result.
+        drawer (CamAIMixin or None): The processor drawing AI data in the parent process with the options of the worker, without loading a model.
+    """
+
+    def __init__(self, mode: str = "detection", ai_options: dict = None, slots: int = 2, timeout: float = 30.0, start_method: str = "spawn") -> None:
+        """
+        Initialize the InferenceWorker class and start its worker process.
+
+        Parameters:
+            mode (str, optional): The AI mode ('detection', 'segmentation', 'classify', 'pose'). Default is 'detection'.
+            ai_options (dict, optional): Extra keyword arguments for CamAIMixin, such as draw. Default is None.
+            slots (int, optional): The number of frames that can be in flight. Default is 2.
+            timeout (float, optional): The maximum time in seconds to wait for a result. Default is 30.0.
+            start_method (str, optional): The multiprocessing start method of the worker. Default is 'spawn'.
+        """
+
+        self.mode = mode
+        self.ai_options = dict(ai_options or {})
+        self.draw = self.ai_options.get("draw", True)
+        self.slots = slots
+        self.timeout = timeout
+        self.context = mp.get_context(start_method)
+
+        self.ring = None
+        self.shm = None
+        self.seq = 0
+        self.pending = []
+        self.restarts = 0
+        self.lock = threading.RLock()
+        self.telemetry = None
+        self.names = None
+        self.drawer = None
+
+        resource_tracker.ensure_running()
+        self.start()
+
+    def start(self) -> None:
+        """Start the worker process, attaching it to the current ring if there is one."""
+
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=run_inference_worker, args=(self.mode, self.ai_options, child_conn),
+            name=f"InferenceWorker-{self.mode}", daemon=True)
+        self.process.start()
+
+        if self.ring is not None: self.conn.send(("shm", self.shm.name, self.ring.frames.shape[1:], self.ring.frames.dtype.str, self.slots))
+
+    def stop_process(self) -> None:
+        """Stop the worker process, forgetting the frames in flight."""
+
+        if self.process.is_alive():
+            try: self.conn.send(("stop",))
+            except (BrokenPipeError, OSError): pass
+
+        self.process.join(self.timeout)
+        if self.process.is_alive(): self.process.terminate()
+
+        self.conn.close()
+        self.pending = []
+
+    def restart(self) -> None:
+        """Replace a worker process that failed to answer, so its late replies cannot be taken for those of later frames."""
+
+        self.process.terminate()
+        self.stop_process()
+        self.start()
+        self.restarts += 1
+
+    def prepare_ring(self, frame) -> None:
+        """
+        Create the shared memory ring for the frame shape, replacing a ring of another shape.
+
+        Parameters:
+            frame (ndarray): The frame about to be submitted.
+        """
+
+        if self.ring is not None and self.ring.frames.shape[1:] == frame.shape and self.ring.frames.dtype == frame.dtype: return
+        if self.pending: raise Exception("Cannot change the frame shape while frames are in flight.")
+
+        self.free_ring()
+        self.shm = shared_memory.SharedMemory(create=True, size=FrameRing.size(frame.shape, frame.dtype.str, self.slots))
+        self.ring = FrameRing(self.shm, frame.shape, frame.dtype.str, self.slots)
+        self.conn.send(("shm", self.shm.name, frame.shape, frame.dtype.str, self.slots))
+
+    def submit(self, frame) -> int:
+        """
+        Copy a frame into the ring and queue it for AI processing, starting the worker process again if it was closed.
+
+        Parameters:
+            frame (ndarray): The input frame for processing.
+
+        Returns:
+            int: The sequence number of the submitted frame.
+        """
+
+        with self.lock:
+            if len(self.pending) >= self.slots: raise Exception(f"All [{self.slots}] slots are in flight, collect a result first.")
+            if not self.process.is_alive():
+                self.stop_process()
+                self.start()
+
+            self.prepare_ring(frame)
+
+            self.seq += 1
+            slot = self.seq % self.slots
+            np.copyto(self.ring.frames[slot], frame)
+
+            self.pending.append((self.seq, slot))
+            self.conn.send(("infer", slot, self.seq))
+            return self.seq
+
+    def result(self, frame=None) -> tuple:
+        """
+        Wait for the result of the oldest submitted frame.
+
+        Replies are matched to the frame by sequence number, skipping stale replies. If the worker does not answer in time
+        the frame is given up and the worker is restarted, dropping the other frames in flight.
+
+        Parameters:
+            frame (ndarray, optional): A buffer to copy the processed frame into, needed to get the drawn results. Default is None.
+
+        Returns:
+            tuple: The sequence number and AI data of the frame.
+        """
+
+        with self.lock:
+            if not self.pending: raise Exception("No frame was submitted.")
+
+            seq, slot = self.pending.pop(0)
+            deadline = time.monotonic() + self.timeout
+
+            while True:
+                try: message = self.conn.recv() if self.conn.poll(max(deadline - time.monotonic(), 0)) else None
+                except (EOFError, OSError): message = None
+
+                if message is None:
+                    self.restart()
+                    raise Exception(f"Inference worker [{self.mode}] did not answer frame [{seq}] and was restarted.")
+                if message[1] == seq: break
+
+            if message[0] == "error": raise Exception(f"Error processing AI data - {message[2]}")
+            if message[3] is not None: self.names = message[3]
+
+            if frame is not None and self.draw: np.copyto(frame, self.ring.frames[slot])
+            return seq, message[2]
+
+    @instrumented("add_ai_to_frame")
+    def add_ai_to_frame(self, frame) -> tuple:
+        """
+        Add AI processing to the frame in the worker process and wait for the result.
+
+        Parameters:
+            frame (ndarray): The input frame for processing.
+
+        Returns:
+            tuple: The processed frame and AI data.
+        """
+
+        with self.lock:
+            self.submit(frame)
+            _, ai_data = self.result(frame)
+
+        return frame, ai_data
+
+    def draw_ai_data(self, frame, ai_data: list) -> None:
+        """
+        Draw AI data returned earlier by the worker on a frame, such as results reused for a frame that was not processed.
+
+        Parameters:
+            frame (ndarray): The frame to draw on.
+            ai_data (list or AIResults): The AI data to draw.
+        """
+
+        if self.drawer is None:
+            from cam_manager.cam_ai import CamAIMixin
+            self.drawer = CamAIMixin(self.mode, **self.ai_options)
+
+        self.drawer.draw_ai_data(frame, ai_data, self.names)
+
+    def free_ring(self) -> None:
+        """Free the shared memory ring."""
+
+        if self.ring is not None:
+            self.ring.release()
+            self.ring = None
+        if self.shm is not None:
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self) -> None:
+        """Stop the worker and free the shared memory ring."""
+
+        self.stop_process()
+        self.free_ring()
@@ -15,7 +15,7 @@ setup(
     author_email = "snatev@proton.me",
     url = "https://github.com/snatev/cam-manager",
 
-    packages = find_packages(),
+    packages = find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires = requirements,
 
     classifiers = [